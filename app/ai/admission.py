@@ -0,0 +1,263 @@
+# app/ai/admission.py
+"""
+탐지 요청 승인 제어 (admission control)
+
+트래픽이 몰리면 요청이 모델 뒤에 무한정 쌓여 클라이언트가 타임아웃되므로,
+탐지기 앞에서 다음을 적용한다.
+
+- 동시 실행 슬롯 제한 + 레인별 크기 제한 대기열
+- 우선순위 레인: interactive(게이트웨이 실시간 검사)가 bulk(일괄/스트리밍)보다 먼저 슬롯을 받음
+- 클라이언트 IP별 토큰 버킷 속도 제한
+- 예상 대기 시간이 레인의 최대 대기 시간을 넘으면 기다리지 않고 즉시 거절
+
+거절은 `AdmissionRejected`(retry_after 초 포함)로 알리며, 라우터가 429 + Retry-After로 변환한다.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+LANES = ("interactive", "bulk")
+
+
+class AdmissionRejected(Exception):
+    """요청을 지금 처리할 수 없음 (429로 응답)"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        """Retry-After 헤더 값 (정수 초, 최소 1)"""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+@dataclass
+class LaneConfig:
+    queue_depth: int
+    max_wait_ms: float
+    max_concurrency: int
+
+
+class AdmissionController:
+    """우선순위 레인 대기열 + IP별 토큰 버킷 (단일 이벤트 루프에서 사용)"""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        lanes: Dict[str, LaneConfig],
+        rate_per_second: float = 0.0,
+        burst: int = 0,
+        max_tracked_clients: int = 10000,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.lanes = lanes
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.max_tracked_clients = max_tracked_clients
+
+        self.in_flight = 0
+        self._in_flight_by_lane = {lane: 0 for lane in lanes}
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in lanes}
+        # client ip -> (남은 토큰, 마지막 갱신 시각)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+        self.avg_service_ms = 50.0  # 슬롯 점유 시간 EWMA (예상 대기 시간 계산용)
+        self.rate_limited = 0
+        self._lane_stats = {
+            lane: {"admitted": 0, "rejected_queue_full": 0, "rejected_overloaded": 0, "rejected_timeout": 0,
+                   "avg_wait_ms": 0.0, "max_wait_ms": 0.0}
+            for lane in lanes
+        }
+
+    # ------------------------------------------------------------------
+    # 속도 제한
+    # ------------------------------------------------------------------
+    def check_rate(self, client_ip: Optional[str], cost: float = 1.0) -> None:
+        """클라이언트 IP의 토큰 버킷에서 cost만큼 차감 (부족하면 AdmissionRejected)"""
+        if self.rate_per_second <= 0 or not client_ip:
+            return
+        now = time.monotonic()
+        tokens, last = self._buckets.get(client_ip, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - last) * self.rate_per_second)
+        cost = min(cost, float(self.burst))
+        if tokens < cost:
+            self._buckets[client_ip] = (tokens, now)
+            self.rate_limited += 1
+            raise AdmissionRejected("rate_limited", (cost - tokens) / self.rate_per_second)
+        self._buckets[client_ip] = (tokens - cost, now)
+        if len(self._buckets) > self.max_tracked_clients:
+            self._prune_buckets(now)
+
+    def _prune_buckets(self, now: float) -> None:
+        """버킷이 가득 찬(오래 요청이 없던) 클라이언트 정리"""
+        full_after = self.burst / self.rate_per_second
+        self._buckets = {ip: v for ip, v in self._buckets.items() if now - v[1] < full_after}
+
+    # ------------------------------------------------------------------
+    # 슬롯 / 대기열
+    # ------------------------------------------------------------------
+    @asynccontextmanager
+    async def admit(
+        self, lane: str, client_ip: Optional[str] = None, bounded: bool = True, cost: float = 1.0
+    ) -> AsyncIterator[None]:
+        """
+        속도 제한을 확인하고 실행 슬롯을 얻은 동안 블록을 실행
+
+        bounded=False이면 대기열 한도/대기 시간 제한 없이 슬롯을 기다린다
+        (이미 승인된 스트림의 후속 청크 등 backpressure 용도).
+        """
+        self.check_rate(client_ip, cost)
+        started = time.monotonic()
+        await self._acquire(lane, bounded)
+        acquired = time.monotonic()
+        self._record_wait(lane, (acquired - started) * 1000.0)
+        try:
+            yield
+        finally:
+            self.avg_service_ms = 0.9 * self.avg_service_ms + 0.1 * (time.monotonic() - acquired) * 1000.0
+            self._release(lane)
+
+    def check_capacity(self, lane: str) -> None:
+        """대기열이 가득 찼거나 예상 대기 시간이 레인 한도를 넘으면 AdmissionRejected"""
+        config = self.lanes[lane]
+        estimate = self.estimated_wait_ms(lane)
+        if len(self._waiters[lane]) >= config.queue_depth:
+            self._lane_stats[lane]["rejected_queue_full"] += 1
+            raise AdmissionRejected("queue_full", estimate / 1000.0)
+        if estimate > config.max_wait_ms:
+            self._lane_stats[lane]["rejected_overloaded"] += 1
+            raise AdmissionRejected("overloaded", estimate / 1000.0)
+
+    def estimated_wait_ms(self, lane: str) -> float:
+        """
+        지금 대기열에 들어가면 예상되는 대기 시간
+
+        같은 레인의 대기자는 레인 동시 실행 한도(전체 한도보다 작을 수 있음)만큼씩,
+        앞선 interactive 대기자는 전체 슬롯만큼씩 빠진다고 본다.
+        """
+        lane_concurrency = min(self.max_concurrency, self.lanes[lane].max_concurrency)
+        wait_ms = (len(self._waiters[lane]) + 1) * self.avg_service_ms / max(1, lane_concurrency)
+        if lane != "interactive":
+            wait_ms += len(self._waiters.get("interactive", ())) * self.avg_service_ms / self.max_concurrency
+        return wait_ms
+
+    def _can_run(self, lane: str) -> bool:
+        return (
+            self.in_flight < self.max_concurrency
+            and self._in_flight_by_lane[lane] < self.lanes[lane].max_concurrency
+        )
+
+    def _take(self, lane: str) -> None:
+        self.in_flight += 1
+        self._in_flight_by_lane[lane] += 1
+
+    async def _acquire(self, lane: str, bounded: bool) -> None:
+        config = self.lanes[lane]
+        # 앞선 대기자가 없고 슬롯이 남으면 바로 실행 (bulk는 interactive 대기자가 없을 때만)
+        higher_waiting = lane != "interactive" and bool(self._waiters.get("interactive"))
+        if not self._waiters[lane] and not higher_waiting and self._can_run(lane):
+            self._take(lane)
+            return
+
+        if bounded:
+            self.check_capacity(lane)
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(future)
+        try:
+            if bounded:
+                await asyncio.wait_for(future, timeout=config.max_wait_ms / 1000.0)
+            else:
+                await future
+        except asyncio.TimeoutError:
+            self._lane_stats[lane]["rejected_timeout"] += 1
+            raise AdmissionRejected("timeout", self.estimated_wait_ms(lane) / 1000.0)
+        except asyncio.CancelledError:
+            # 취소와 슬롯 배정이 겹치면 받은 슬롯을 돌려줌
+            if future.done() and not future.cancelled():
+                self._release(lane)
+            raise
+        finally:
+            if future in self._waiters[lane]:
+                self._waiters[lane].remove(future)
+
+    def _release(self, lane: str) -> None:
+        self.in_flight -= 1
+        self._in_flight_by_lane[lane] -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """빈 슬롯을 우선순위 순서(LANES)대로 대기자에게 넘김"""
+        for lane in LANES:
+            if lane not in self._waiters:
+                continue
+            waiters = self._waiters[lane]
+            while waiters and self._can_run(lane):
+                future = waiters.popleft()
+                if future.done():
+                    continue  # 타임아웃/취소된 대기자
+                self._take(lane)
+                future.set_result(None)
+            if waiters and self.in_flight >= self.max_concurrency:
+                return  # 상위 레인 대기자가 남아 있으면 하위 레인은 기다림
+
+    def _record_wait(self, lane: str, wait_ms: float) -> None:
+        stats = self._lane_stats[lane]
+        stats["admitted"] += 1
+        stats["avg_wait_ms"] = 0.9 * stats["avg_wait_ms"] + 0.1 * wait_ms
+        stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "avg_service_ms": self.avg_service_ms,
+            "rate_limit_per_second": self.rate_per_second,
+            "rate_limited": self.rate_limited,
+            "tracked_clients": len(self._buckets),
+            "lanes": {
+                lane: {
+                    "queue_depth": len(self._waiters[lane]),
+                    "max_queue_depth": config.queue_depth,
+                    "in_flight": self._in_flight_by_lane[lane],
+                    "estimated_wait_ms": self.estimated_wait_ms(lane),
+                    **self._lane_stats[lane],
+                }
+                for lane, config in self.lanes.items()
+            },
+        }
+
+
+_admission_controller_instance: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """승인 제어기 싱글톤"""
+    global _admission_controller_instance
+    if _admission_controller_instance is None:
+        _admission_controller_instance = AdmissionController(
+            max_concurrency=settings.PII_ADMISSION_MAX_CONCURRENCY,
+            lanes={
+                "interactive": LaneConfig(
+                    queue_depth=settings.PII_ADMISSION_INTERACTIVE_QUEUE_DEPTH,
+                    max_wait_ms=settings.PII_ADMISSION_INTERACTIVE_MAX_WAIT_MS,
+                    max_concurrency=settings.PII_ADMISSION_MAX_CONCURRENCY,
+                ),
+                "bulk": LaneConfig(
+                    queue_depth=settings.PII_ADMISSION_BULK_QUEUE_DEPTH,
+                    max_wait_ms=settings.PII_ADMISSION_BULK_MAX_WAIT_MS,
+                    max_concurrency=settings.PII_ADMISSION_BULK_MAX_CONCURRENCY,
+                ),
+            },
+            rate_per_second=settings.PII_RATE_LIMIT_PER_SECOND,
+            burst=settings.PII_RATE_LIMIT_BURST,
+        )
+    return _admission_controller_instance
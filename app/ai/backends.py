@@ -0,0 +1,265 @@
+# app/ai/backends.py
+"""
+토큰 분류 모델 추론 백엔드
+
+`settings.MODEL_MODE`에 따라 선택된다.
+- LOCAL: PyTorch (transformers) 모델로 직접 추론
+- ONNX: 모델을 한 번 ONNX 그래프로 내보내 디스크에 캐시하고,
+        onnxruntime CPU execution provider + IO binding으로 추론
+
+모든 백엔드는 패딩된 입력을 받아 토큰별 (예측 클래스, 신뢰도) NumPy 배열을 돌려준다.
+"""
+import json
+import logging
+from abc import ABC, abstractmethod
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import numpy as np
+import torch
+from transformers import AutoConfig, AutoModelForTokenClassification
+
+from app.ai.precision import apply_precision
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBackend(ABC):
+    """추론 백엔드 공통 인터페이스"""
+
+    name = "base"
+    precision = "fp32"
+    model = None
+
+    @abstractmethod
+    def forward(
+        self, input_ids: list[list[int]], attention_mask: list[list[int]]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """패딩된 배치를 추론하여 토큰별 (argmax 클래스, softmax 최대 확률) 배열 (batch, seq)을 반환"""
+
+
+class TorchBackend(InferenceBackend):
+    """PyTorch eager 모드 백엔드"""
+
+    name = "torch"
+
+    def __init__(self, model: AutoModelForTokenClassification, precision: str = "fp32"):
+        self.model, self.autocast_dtype = apply_precision(model, precision)
+        self.precision = precision.lower()
+        if self.precision == "bf16" and self.autocast_dtype is None:
+            self.precision = "fp32"  # bf16 미지원 CPU
+        # 추론 전용: 가중치를 고정해 autograd 메타데이터를 만들지 않음
+        for parameter in self.model.parameters():
+            parameter.requires_grad_(False)
+
+    @classmethod
+    def load(cls, model_name: str, precision: str | None = None) -> "TorchBackend":
+        model = load_mmap_model(model_name) if settings.MODEL_MMAP_WEIGHTS else None
+        if model is None:
+            model = AutoModelForTokenClassification.from_pretrained(model_name)
+        return cls(model, precision or settings.MODEL_PRECISION)
+
+    def forward(self, input_ids, attention_mask):
+        with torch.inference_mode(), torch.autocast(
+            "cpu", dtype=self.autocast_dtype or torch.bfloat16, enabled=self.autocast_dtype is not None
+        ):
+            outputs = self.model(
+                input_ids=torch.tensor(input_ids),
+                attention_mask=torch.tensor(attention_mask),
+            )
+            # 신뢰도는 항상 fp32로 계산
+            predictions = torch.nn.functional.softmax(outputs.logits.float(), dim=-1)
+            confidences, predicted_classes = predictions.max(-1)
+        return predicted_classes.numpy(), confidences.numpy()
+
+
+class OnnxBackend(InferenceBackend):
+    """onnxruntime CPU 백엔드 (IO binding 사용)"""
+
+    name = "onnx"
+    precision = "fp32"
+
+    def __init__(self, onnx_path: Path):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError(
+                "MODEL_MODE=ONNX requires onnxruntime (pip install '.[onnx]')"
+            ) from e
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if settings.TORCH_NUM_THREADS > 0:
+            options.intra_op_num_threads = settings.TORCH_NUM_THREADS
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(
+            str(onnx_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    @classmethod
+    def load(cls, model_name: str) -> "OnnxBackend":
+        if settings.MODEL_PRECISION.lower() != "fp32":
+            logger.warning("MODEL_PRECISION is only applied to MODEL_MODE=LOCAL; ONNX runs in fp32")
+        onnx_path = Path(settings.ONNX_CACHE_DIR) / model_name.replace("/", "__") / "model.onnx"
+        if not onnx_path.exists():
+            export_onnx(model_name, onnx_path)
+        else:
+            logger.info(f"Using cached ONNX graph: {onnx_path}")
+        return cls(onnx_path)
+
+    def forward(self, input_ids, attention_mask):
+        binding = self.session.io_binding()
+        binding.bind_cpu_input("input_ids", np.ascontiguousarray(input_ids, dtype=np.int64))
+        binding.bind_cpu_input("attention_mask", np.ascontiguousarray(attention_mask, dtype=np.int64))
+        binding.bind_output("logits")
+        self.session.run_with_iobinding(binding)
+        logits = binding.copy_outputs_to_cpu()[0]
+
+        # softmax (수치 안정화를 위해 최대값을 뺀 뒤 계산)
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=-1, keepdims=True)
+        return probabilities.argmax(-1), probabilities.max(-1)
+
+
+def export_onnx(model_name: str, onnx_path: Path) -> Path:
+    """transformers 모델을 ONNX 그래프로 내보낸다 (임시 파일에 쓴 뒤 원자적으로 교체)"""
+    logger.info(f"Exporting {model_name} to ONNX: {onnx_path}")
+    onnx_path.parent.mkdir(parents=True, exist_ok=True)
+    model = AutoModelForTokenClassification.from_pretrained(model_name)
+    model.eval()
+
+    dummy_ids = torch.ones((1, 8), dtype=torch.long)
+    dummy_mask = torch.ones((1, 8), dtype=torch.long)
+    tmp_path = onnx_path.with_suffix(f".tmp-{os.getpid()}")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (dummy_ids, dummy_mask),
+            str(tmp_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "logits": {0: "batch", 1: "sequence"},
+            },
+            opset_version=17,
+        )
+    os.replace(tmp_path, onnx_path)
+    logger.info("ONNX export completed")
+    return onnx_path
+
+
+_SAFETENSORS_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+
+def mmap_safetensors(path: str) -> dict[str, torch.Tensor]:
+    """
+    safetensors 파일의 텐서를 복사 없이 파일 mmap 위에 만든다
+
+    MAP_PRIVATE(ACCESS_COPY) 매핑이므로 페이지는 OS 페이지 캐시에서 읽히고,
+    같은 파일을 연 모든 프로세스(preload 후 fork된 워커 포함)가 공유한다.
+    실수로 쓰더라도 해당 페이지만 프로세스 전용으로 복사될 뿐 파일은 바뀌지 않는다.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    (header_size,) = struct.unpack("<Q", buffer[:8])
+    header = json.loads(buffer[8:8 + header_size])
+    data_start = 8 + header_size
+
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = _SAFETENSORS_DTYPES[info["dtype"]]
+        begin, end = info["data_offsets"]
+        if end == begin:
+            tensors[name] = torch.empty(info["shape"], dtype=dtype)
+            continue
+        # frombuffer는 mmap 객체를 참조하므로 텐서가 살아 있는 동안 매핑이 유지됨
+        tensor = torch.frombuffer(buffer, dtype=dtype, count=(end - begin) // dtype.itemsize, offset=data_start + begin)
+        tensors[name] = tensor.reshape(info["shape"])
+    return tensors
+
+
+def _safetensors_files(model_name: str) -> list[str] | None:
+    """모델의 safetensors 파일 경로 목록 (단일 파일 또는 샤드 인덱스, 없으면 None)"""
+    from transformers.utils import cached_file
+
+    single = cached_file(model_name, "model.safetensors", _raise_exceptions_for_missing_entries=False)
+    if single:
+        return [single]
+    index_path = cached_file(model_name, "model.safetensors.index.json", _raise_exceptions_for_missing_entries=False)
+    if not index_path:
+        return None
+    with open(index_path, encoding="utf-8") as f:
+        shards = sorted(set(json.load(f)["weight_map"].values()))
+    return [cached_file(model_name, shard) for shard in shards]
+
+
+def load_mmap_model(model_name: str) -> AutoModelForTokenClassification | None:
+    """
+    가중치가 safetensors mmap을 그대로 가리키는 모델 생성
+
+    preload-then-fork 배포(app/launcher.py)에서 워커들이 가중치 페이지를
+    복사하지 않고 공유하게 한다. safetensors가 없거나 키가 맞지 않으면 None
+    (호출자는 일반 from_pretrained로 대체).
+    """
+    try:
+        files = _safetensors_files(model_name)
+        if not files:
+            logger.info(f"No safetensors weights for {model_name}; loading without mmap")
+            return None
+
+        state_dict: dict[str, torch.Tensor] = {}
+        for path in files:
+            state_dict.update(mmap_safetensors(path))
+
+        from transformers.modeling_utils import no_init_weights
+
+        config = AutoConfig.from_pretrained(model_name)
+        # 곧 mmap 텐서로 교체되므로 랜덤 초기화 생략
+        with no_init_weights():
+            model = AutoModelForTokenClassification.from_config(config)
+        # assign=True: 파라미터 저장소를 복사하지 않고 mmap 텐서로 교체
+        missing, unexpected = model.load_state_dict(state_dict, strict=False, assign=True)
+        # 버퍼(position_ids 등)는 생성 시 값이 채워지므로 파라미터 누락만 확인
+        parameter_names = {name for name, _ in model.named_parameters()}
+        missing = [key for key in missing if key in parameter_names]
+        if missing:
+            logger.warning(f"mmap load missing {len(missing)} weights (e.g. {missing[:3]}); loading without mmap")
+            return None
+        if unexpected:
+            logger.info(f"mmap load ignored {len(unexpected)} unexpected weights")
+        model.eval()
+        logger.info(f"Loaded {model_name} weights via mmap ({len(files)} safetensors file(s))")
+        return model
+    except Exception as e:
+        logger.warning(f"mmap weight loading failed ({e}); loading without mmap")
+        return None
+
+
+def create_backend(mode: str, model_name: str) -> InferenceBackend:
+    """MODEL_MODE 값에 맞는 추론 백엔드 생성"""
+    mode = (mode or "LOCAL").upper()
+    if mode == "LOCAL":
+        return TorchBackend.load(model_name)
+    if mode == "ONNX":
+        return OnnxBackend.load(model_name)
+    raise ValueError(f"Unsupported MODEL_MODE: {mode}")
@@ -0,0 +1,150 @@
+# app/ai/batching.py
+"""
+동시 추론 요청을 하나의 배치로 묶는 마이크로 배처
+
+여러 코루틴이 동시에 `submit()`을 호출하면 최대 `max_batch_size`개 또는
+최대 `max_wait_ms` 동안 요청을 모은 뒤, `batch_fn`을 한 번만 호출하여
+결과를 각 호출자에게 순서대로 돌려준다.
+
+`runner`가 주어지면 `batch_fn`은 이벤트 루프 밖(추론 실행기)에서 실행되며,
+동시에 실행 중인 배치는 `max_in_flight`개로 제한된다. 실행 슬롯이 빌 때까지
+다음 배치 수집을 미루므로 부하가 높을수록 배치가 커진다.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+BatchFn = Callable[[List[Any]], List[Any]]
+Runner = Callable[..., Awaitable[Any]]
+
+
+class MicroBatcher:
+    """asyncio 기반 동적 마이크로 배칭 스케줄러"""
+
+    def __init__(
+        self,
+        batch_fn: BatchFn,
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        runner: Optional[Runner] = None,
+        max_in_flight: int = 1,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.runner = runner
+        self.max_in_flight = max(1, max_in_flight)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # 실행 중인 배치 태스크 (참조를 잡아 두지 않으면 GC로 사라질 수 있음)
+        self._tasks: Set[asyncio.Task] = set()
+
+        # 관측용 카운터
+        self.batches_run = 0
+        self.items_processed = 0
+
+    async def submit(self, item: Any) -> Any:
+        """항목을 큐에 넣고 배치 실행 결과를 기다린다"""
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def _ensure_worker(self) -> None:
+        """현재 이벤트 루프에서 워커 태스크가 돌고 있는지 확인"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+            self._worker = loop.create_task(self._run())
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        """첫 항목을 기다린 뒤 마감 시간까지 배치를 채운다"""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            # 이미 대기 중인 항목은 기다리지 않고 바로 가져온다
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        # 이미 취소된 호출자는 배치에서 제외
+        return [(item, future) for item, future in batch if not future.done()]
+
+    async def _run(self) -> None:
+        while True:
+            # 실행 슬롯을 먼저 확보한 뒤 배치를 수집
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            if not batch:
+                self._slots.release()
+                continue
+            task = self._loop.create_task(self._execute(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            if self.runner is not None:
+                results = await self.runner(self.batch_fn, items)
+            else:
+                results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"batch_fn returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as e:
+            logger.error(f"Micro-batch inference failed (size={len(items)}): {e}", exc_info=True)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        self.batches_run += 1
+        self.items_processed += len(items)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict[str, Any]:
+        """배치 처리 통계"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "avg_batch_size": (self.items_processed / self.batches_run) if self.batches_run else 0.0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    def close(self) -> None:
+        """워커 태스크 종료"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        self._worker = None
+        self._queue = None
@@ -0,0 +1,151 @@
+# app/ai/cascade.py
+"""
+트랜스포머 앞단의 캐스케이드 게이트
+
+대부분의 트래픽은 개인정보가 없는 텍스트이므로, 값싼 신호(정규식 결과,
+숫자 밀도, 한국어 이름/주소 패턴, 키워드 사전)로 의심 점수를 매겨 임계값을
+넘는 텍스트만 모델로 보낸다.
+
+- gate: 점수가 임계값 미만이면 모델을 건너뜀
+- strict: 항상 모델 실행 (게이트가 건너뛰었을 건수만 집계)
+"""
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+CASCADE_MODES = ("gate", "strict")
+
+# 한국인 주요 성씨 (상위 빈도)
+_SURNAMES = (
+    "김이박최정강조윤장임한오서신권황안송류전홍고문양손배백허유남심노하곽성차주우구"
+    "민진지엄채원천방공현함변염여추도소석선설마길연위표명기반라왕금옥육인맹제모탁국어은편용예경봉"
+)
+# 성 + 이름 1~2자 뒤에 호칭/직함이 붙는 경우 (강한 신호)
+_NAME_WITH_TITLE = re.compile(
+    rf"[{_SURNAMES}][가-힣]{{1,2}}\s?(?:님|씨|고객|회원|과장|대리|부장|차장|팀장|사원|주임|실장|선생|교수|원장|대표|군|양)"
+)
+# 성 + 이름 1~2자 뒤에 서술/조사가 붙는 경우 (약한 신호)
+_NAME_WITH_PARTICLE = re.compile(rf"(?<![가-힣])[{_SURNAMES}][가-힣]{{1,2}}(?:입니다|이고|이며|이라고|라고|에게|한테)")
+_KEYWORDS = re.compile(
+    r"이름|성명|주소|거주|연락처|전화|휴대폰|핸드폰|번호|주민|생년월일|생일|계좌|은행|카드|"
+    r"여권|면허|이메일|메일|e-?mail|email|phone|address|account|passport",
+    re.IGNORECASE,
+)
+# 행정구역 또는 도로명 + 번지 형태 (주소)
+_ADDRESS = re.compile(r"[가-힣]+(?:시|도)\s[가-힣]+(?:구|군)|[가-힣\d]+(?:로|길)\s?\d+(?:-\d+)?(?![\d가-힣])")
+_DIGIT_RUN = re.compile(r"\d[\d\- .]{4,}\d")
+
+# 신호별 가중치
+WEIGHTS = {
+    "regex": 1.0,
+    "name_title": 1.0,
+    "name_particle": 0.4,
+    "keyword": 0.4,
+    "address": 1.0,
+    "digit_run": 0.5,
+    "digit_density": 0.3,
+}
+
+
+@dataclass
+class GateDecision:
+    """게이트 판정 결과"""
+    score: float
+    run_model: bool
+    signals: Dict[str, int] = field(default_factory=dict)
+
+
+class CascadeGate:
+    """저비용 사전 검사로 모델 실행 여부를 결정"""
+
+    def __init__(self, mode: str = "strict", threshold: float = 1.0):
+        mode = (mode or "strict").lower()
+        if mode not in CASCADE_MODES:
+            raise ValueError(f"Unsupported CASCADE_MODE: {mode} (choose from {CASCADE_MODES})")
+        self.mode = mode
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def score(self, text: str, regex_entities: List[Dict[str, Any]]) -> GateDecision:
+        """텍스트의 의심 점수 계산"""
+        signals = {
+            "regex": len(regex_entities),
+            "name_title": len(_NAME_WITH_TITLE.findall(text)),
+            "name_particle": len(_NAME_WITH_PARTICLE.findall(text)),
+            "keyword": len(_KEYWORDS.findall(text)),
+            "address": len(_ADDRESS.findall(text)),
+            "digit_run": len(_DIGIT_RUN.findall(text)),
+        }
+        digits = sum(ch.isdigit() for ch in text)
+        signals["digit_density"] = int(len(text) > 0 and digits / len(text) >= 0.15)
+
+        # 같은 신호는 최대 2회까지만 가산
+        score = sum(WEIGHTS[name] * min(count, 2) for name, count in signals.items())
+        return GateDecision(score=score, run_model=score >= self.threshold, signals=signals)
+
+    def evaluate(self, text: str, regex_entities: List[Dict[str, Any]]) -> GateDecision:
+        """점수를 계산하고 모드에 따라 모델 실행 여부를 결정 (통계 누적)"""
+        decision = self.score(text, regex_entities)
+        would_skip = not decision.run_model
+        if self.mode == "strict":
+            decision.run_model = True
+
+        with self._lock:
+            self.evaluated += 1
+            if decision.run_model:
+                self.model_runs += 1
+            else:
+                self.skipped += 1
+            if would_skip:
+                self.would_skip += 1
+            for name, count in decision.signals.items():
+                if count:
+                    self.signal_hits[name] = self.signal_hits.get(name, 0) + 1
+        return decision
+
+    def record_model_latency(self, elapsed_ms: float) -> None:
+        """모델 실행 시간을 지수 이동 평균으로 기록 (절약 시간 추정용)"""
+        with self._lock:
+            if self.avg_model_ms is None:
+                self.avg_model_ms = elapsed_ms
+            else:
+                self.avg_model_ms = 0.9 * self.avg_model_ms + 0.1 * elapsed_ms
+
+    def reset_stats(self) -> None:
+        self.evaluated = 0
+        self.model_runs = 0
+        self.skipped = 0
+        self.would_skip = 0
+        self.signal_hits: Dict[str, int] = {}
+        self.avg_model_ms: Optional[float] = None
+
+    def stats(self) -> Dict[str, Any]:
+        """단계별 통과/건너뜀 카운터"""
+        avg_ms = self.avg_model_ms or 0.0
+        return {
+            "mode": self.mode,
+            "threshold": self.threshold,
+            "evaluated": self.evaluated,
+            "model_runs": self.model_runs,
+            "skipped": self.skipped,
+            "would_skip": self.would_skip,
+            "skip_rate": (self.skipped / self.evaluated) if self.evaluated else 0.0,
+            "signal_hits": dict(self.signal_hits),
+            "avg_model_ms": avg_ms,
+            "estimated_model_ms_saved": self.skipped * avg_ms,
+        }
+
+
+_cascade_gate_instance: Optional[CascadeGate] = None
+
+
+def get_cascade_gate() -> CascadeGate:
+    """캐스케이드 게이트 싱글톤"""
+    global _cascade_gate_instance
+    if _cascade_gate_instance is None:
+        _cascade_gate_instance = CascadeGate(settings.CASCADE_MODE, settings.CASCADE_THRESHOLD)
+    return _cascade_gate_instance
@@ -0,0 +1,112 @@
+# app/ai/deadline.py
+"""
+마감 시간(deadline) 기반 탐지 경로 선택
+
+게이트웨이는 검사마다 지연 시간 예산을 준다. 남은 예산으로 모델 추론을
+끝낼 수 없다고 판단되면(현재 대기열 대기 + 입력 길이별 추론 시간 추정)
+정규식 전용 경로로 낮춰서라도 예산 안에 응답한다.
+
+추론 시간은 실제 측정값으로 `ms ≈ a + b·글자수`를 지수 감쇠 가중 최소제곱으로
+계속 맞춰 추정한다. 측정이 없을 때는 roberta-large CPU 기준 사전값을 쓴다.
+"""
+import threading
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+# 측정값이 쌓이기 전 사용할 사전값 (가상 관측 PRIOR_WEIGHT개로 취급)
+PRIOR_BASE_MS = 80.0
+PRIOR_MS_PER_CHAR = 0.5
+PRIOR_WEIGHT = 5.0
+PRIOR_LENGTHS = (50.0, 500.0)
+
+
+class DeadlinePlanner:
+    """입력 길이별 모델 지연 시간 추정 + 경로별 카운터"""
+
+    def __init__(self, safety_margin_ms: float = 10.0, decay: float = 0.98):
+        self.safety_margin_ms = safety_margin_ms
+        self.decay = decay
+        self._lock = threading.Lock()
+        # 가중 회귀 누적합: Σw, Σwx, Σwy, Σwx², Σwxy
+        self._sw = self._sx = self._sy = self._sxx = self._sxy = 0.0
+        for length in PRIOR_LENGTHS:
+            self._add(length, PRIOR_BASE_MS + PRIOR_MS_PER_CHAR * length, PRIOR_WEIGHT / len(PRIOR_LENGTHS))
+        self.observations = 0
+
+        self.requests_with_deadline = 0
+        self.degraded = 0
+        self.paths: Dict[str, int] = {}
+
+    def _add(self, x: float, y: float, weight: float) -> None:
+        self._sw += weight
+        self._sx += weight * x
+        self._sy += weight * y
+        self._sxx += weight * x * x
+        self._sxy += weight * x * y
+
+    def observe(self, text_length: int, elapsed_ms: float) -> None:
+        """모델 추론 실측값 반영 (오래된 관측은 decay로 가중치 감소)"""
+        with self._lock:
+            self._sw *= self.decay
+            self._sx *= self.decay
+            self._sy *= self.decay
+            self._sxx *= self.decay
+            self._sxy *= self.decay
+            self._add(float(text_length), elapsed_ms, 1.0)
+            self.observations += 1
+
+    def coefficients(self) -> tuple[float, float]:
+        """(고정 비용 ms, 글자당 ms)"""
+        with self._lock:
+            mean_x = self._sx / self._sw
+            mean_y = self._sy / self._sw
+            variance = self._sxx / self._sw - mean_x * mean_x
+            if variance <= 1e-9:
+                return mean_y, 0.0
+            slope = max(0.0, (self._sxy / self._sw - mean_x * mean_y) / variance)
+            return max(0.0, mean_y - slope * mean_x), slope
+
+    def estimate_ms(self, text_length: int) -> float:
+        """입력 길이에 대한 모델 추론 예상 시간"""
+        base, per_char = self.coefficients()
+        return base + per_char * text_length
+
+    def fits(self, text_length: int, remaining_ms: float, queue_wait_ms: float = 0.0) -> bool:
+        """남은 예산 안에 대기 + 모델 추론을 끝낼 수 있는지"""
+        return queue_wait_ms + self.estimate_ms(text_length) + self.safety_margin_ms <= remaining_ms
+
+    def record(self, path: str, degraded: bool, with_deadline: bool) -> None:
+        """응답에 사용된 탐지 경로 집계"""
+        with self._lock:
+            self.paths[path] = self.paths.get(path, 0) + 1
+            if with_deadline:
+                self.requests_with_deadline += 1
+            if degraded:
+                self.degraded += 1
+
+    def stats(self) -> Dict[str, Any]:
+        base, per_char = self.coefficients()
+        return {
+            "requests_with_deadline": self.requests_with_deadline,
+            "degraded": self.degraded,
+            "degraded_rate": (self.degraded / self.requests_with_deadline) if self.requests_with_deadline else 0.0,
+            "paths": dict(self.paths),
+            "latency_model": {
+                "base_ms": base,
+                "ms_per_char": per_char,
+                "observations": self.observations,
+            },
+            "safety_margin_ms": self.safety_margin_ms,
+        }
+
+
+_deadline_planner_instance: Optional[DeadlinePlanner] = None
+
+
+def get_deadline_planner() -> DeadlinePlanner:
+    """마감 시간 플래너 싱글톤"""
+    global _deadline_planner_instance
+    if _deadline_planner_instance is None:
+        _deadline_planner_instance = DeadlinePlanner(safety_margin_ms=settings.PII_DEADLINE_SAFETY_MARGIN_MS)
+    return _deadline_planner_instance
@@ -0,0 +1,98 @@
+# app/ai/executor.py
+"""
+모델 추론 전용 실행기
+
+토크나이징/forward pass/softmax는 CPU를 오래 점유하는 동기 작업이므로
+asyncio 이벤트 루프에서 직접 실행하면 같은 워커의 모든 요청(헬스체크,
+로그/대시보드 API 포함)이 멈춘다. 추론은 이 실행기의 전용 스레드 풀에서
+실행하고, 이벤트 루프는 결과만 await 한다.
+"""
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_executor_instance: Optional['InferenceExecutor'] = None
+_executor_lock = threading.Lock()
+
+
+class InferenceExecutor:
+    """torch 스레드 수를 제어하는 추론 전용 스레드 풀"""
+
+    def __init__(self, max_workers: int = 1, torch_threads: int = 0, torch_interop_threads: int = 0):
+        self.max_workers = max(1, max_workers)
+        self._configure_torch(torch_threads, torch_interop_threads)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pii-inference")
+        self._pending = 0
+        self._completed = 0
+
+    @staticmethod
+    def _configure_torch(torch_threads: int, torch_interop_threads: int) -> None:
+        """intra/inter-op 스레드 수 설정 (0이면 torch 기본값 유지)"""
+        import torch
+
+        if torch_threads > 0:
+            torch.set_num_threads(torch_threads)
+        if torch_interop_threads > 0:
+            try:
+                torch.set_num_interop_threads(torch_interop_threads)
+            except RuntimeError as e:
+                # 이미 병렬 작업이 시작된 뒤에는 변경할 수 없음
+                logger.warning(f"Could not set torch inter-op threads: {e}")
+        logger.info(
+            f"Inference executor torch threads: intra={torch.get_num_threads()}, "
+            f"inter={torch.get_num_interop_threads()}"
+        )
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """동기 함수를 추론 스레드 풀에서 실행하고 결과를 기다린다"""
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        try:
+            return await loop.run_in_executor(self._pool, functools.partial(fn, *args))
+        finally:
+            self._pending -= 1
+            self._completed += 1
+
+    def stats(self) -> dict[str, Any]:
+        """실행기 상태"""
+        import torch
+
+        return {
+            "max_workers": self.max_workers,
+            "pending": self._pending,
+            "completed": self._completed,
+            "torch_threads": torch.get_num_threads(),
+        }
+
+    def shutdown(self) -> None:
+        """대기 중인 작업을 취소하고 스레드 풀 종료"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """추론 실행기 싱글톤 인스턴스 반환"""
+    global _executor_instance
+    if _executor_instance is None:
+        with _executor_lock:
+            if _executor_instance is None:
+                _executor_instance = InferenceExecutor(
+                    max_workers=settings.INFERENCE_WORKERS,
+                    torch_threads=settings.TORCH_NUM_THREADS,
+                    torch_interop_threads=settings.TORCH_INTEROP_THREADS,
+                )
+    return _executor_instance
+
+
+def shutdown_inference_executor() -> None:
+    """앱 종료 시 추론 실행기 정리"""
+    global _executor_instance
+    if _executor_instance is not None:
+        _executor_instance.shutdown()
+        _executor_instance = None
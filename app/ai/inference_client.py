@@ -0,0 +1,356 @@
+# app/ai/inference_client.py
+"""
+추론 사이드카 클라이언트
+
+`PII_INFERENCE_SIDECAR_ENABLED=True`이면 API 워커는 모델 가중치를 올리지 않고
+토크나이저/라벨 설정만 가진 `SidecarPIIDetector`를 사용한다. 토큰 예측은
+Unix 소켓으로 사이드카(app/ai/inference_server.py)에 요청하고, BIO 디코딩과
+엔티티 추출은 워커에서 수행한다.
+
+시작 시에는 사이드카 핸드셰이크가 성공할 때까지 백오프하며 재연결하고
+(`wait_for_sidecar`, 그동안 readiness는 loading), 운영 중 연결이 끊기면
+`PII_INFERENCE_SIDECAR_RETRY_SECONDS`마다 재연결을 시도한다. 응답 타임아웃은
+연결이 살아 있으므로 사이드카 장애로 보지 않는다.
+
+`PII_INFERENCE_SIDECAR_FALLBACK=True`(opt-in)이면 사이드카를 쓸 수 없는 동안
+프로세스 내 모델을 로드해 추론하고, 사이드카가 다시 응답하면 해제한다.
+"""
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from transformers import AutoConfig, AutoTokenizer
+
+from app.ai.inference_protocol import (
+    MSG_ERROR,
+    MSG_HELLO,
+    MSG_PREDICT,
+    MSG_RESULT,
+    ProtocolError,
+    decode_predictions,
+    encode_frame,
+    encode_texts,
+    read_frame,
+)
+from app.core.config import settings
+from app.utils.entity_extractor import (
+    BIOLabelTable,
+    TokenPredictions,
+    decode_bio_spans,
+    has_pii_entities,
+    spans_to_entities,
+)
+
+if TYPE_CHECKING:
+    from app.ai.pii_detector import RobertaKoreanPIIDetector
+
+logger = logging.getLogger(__name__)
+
+
+class SidecarUnavailable(Exception):
+    """사이드카에 연결할 수 없거나 연결이 끊김 (프로세스 내 추론으로 대체 가능)"""
+
+
+class SidecarTimeout(RuntimeError):
+    """연결은 살아 있지만 응답이 시간 안에 오지 않음 (대체 추론 대상 아님)"""
+
+
+class InferenceSidecarClient:
+    """하나의 Unix 소켓 연결로 여러 요청을 동시에 보내는 클라이언트 (단일 이벤트 루프에서 사용)"""
+
+    def __init__(self, socket_path: str, timeout_ms: float = 5000.0, max_frame_bytes: int = 16 * 1024 * 1024):
+        self.socket_path = socket_path
+        self.timeout = timeout_ms / 1000.0
+        self.max_frame_bytes = max_frame_bytes
+        self.model_version: Optional[str] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+
+        self.requests = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.connects = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def predict(self, texts: List[str]) -> List[TokenPredictions]:
+        """텍스트 목록의 토큰 예측을 사이드카에 요청"""
+        await self._ensure_connected()
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        request_id = self._next_id
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        self.requests += 1
+        try:
+            self._writer.write(encode_frame(MSG_PREDICT, request_id, encode_texts(texts)))
+            await self._writer.drain()
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # 사이드카가 바쁠 뿐 연결은 유효하므로 끊지 않고 이 요청만 실패
+            self.failures += 1
+            self.timeouts += 1
+            raise SidecarTimeout(f"Inference sidecar did not respond within {self.timeout * 1000:.0f}ms")
+        except ConnectionError as e:
+            self.failures += 1
+            self._disconnect(SidecarUnavailable(str(e)))
+            raise SidecarUnavailable(str(e))
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def connect(self) -> None:
+        """연결되어 있지 않으면 연결 + 핸드셰이크 (실패 시 SidecarUnavailable)"""
+        await self._ensure_connected()
+
+    async def _ensure_connected(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 다른 이벤트 루프에서 만든 연결은 사용할 수 없음
+            self._disconnect(SidecarUnavailable("event loop changed"))
+            self._loop = loop
+            self._connect_lock = asyncio.Lock()
+        if self.connected:
+            return
+        async with self._connect_lock:
+            if self.connected:
+                return
+            await self._connect()
+
+    async def _connect(self) -> None:
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(self.socket_path), timeout=self.timeout
+            )
+            message_type, _, payload = await asyncio.wait_for(
+                read_frame(reader, self.max_frame_bytes), timeout=self.timeout
+            )
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ProtocolError) as e:
+            self.failures += 1
+            raise SidecarUnavailable(f"cannot connect to {self.socket_path}: {e!r}")
+        if message_type != MSG_HELLO:
+            writer.close()
+            raise SidecarUnavailable(f"unexpected handshake message type: {message_type}")
+
+        self.model_version = payload.decode("utf-8")
+        self._reader, self._writer = reader, writer
+        self._reader_task = self._loop.create_task(self._read_responses(reader))
+        self.connects += 1
+        logger.info(f"Connected to inference sidecar {self.socket_path} (model={self.model_version})")
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                message_type, request_id, payload = await read_frame(reader, self.max_frame_bytes)
+                future = self._pending.get(request_id)
+                if future is None or future.done():
+                    continue  # 타임아웃으로 포기한 요청
+                if message_type == MSG_RESULT:
+                    future.set_result(decode_predictions(payload))
+                elif message_type == MSG_ERROR:
+                    future.set_exception(RuntimeError(f"Sidecar inference failed: {payload.decode('utf-8', 'replace')}"))
+                else:
+                    raise ProtocolError(f"unexpected message type: {message_type}")
+        except asyncio.CancelledError:
+            raise
+        except (OSError, asyncio.IncompleteReadError, ProtocolError) as e:
+            logger.warning(f"Inference sidecar connection lost: {e!r}")
+            self._disconnect(SidecarUnavailable("connection lost"))
+
+    def _disconnect(self, error: Exception) -> None:
+        """연결을 닫고 응답을 기다리던 요청을 모두 실패 처리"""
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None and self._reader_task is not asyncio.current_task():
+            self._reader_task.cancel()
+        self._reader = self._writer = self._reader_task = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "socket_path": self.socket_path,
+            "connected": self.connected,
+            "model_version": self.model_version,
+            "requests": self.requests,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "in_flight": len(self._pending),
+        }
+
+    def close(self) -> None:
+        self._disconnect(SidecarUnavailable("client closed"))
+
+
+class SidecarPIIDetector:
+    """
+    사이드카로 추론하는 얇은 PII 탐지기
+
+    RobertaKoreanPIIDetector와 같은 인터페이스(detect_pii, detect_pii_batch,
+    raw_prediction_dicts, model_version)를 제공한다. 모델 가중치는 대체 추론이
+    켜져 있고 사이드카를 쓸 수 없을 때만 프로세스 내에 로드한다.
+    """
+
+    def __init__(self):
+        self.model_name = settings.PII_MODEL_NAME
+        try:
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.config = AutoConfig.from_pretrained(self.model_name)
+        except Exception as e:
+            raise RuntimeError(f"Failed to load PII tokenizer/config: {str(e)}")
+        self.label_table = BIOLabelTable(self.config.id2label)
+        self._revision = getattr(self.config, "_commit_hash", None) or "local"
+
+        self.client = InferenceSidecarClient(
+            settings.PII_INFERENCE_SOCKET_PATH,
+            timeout_ms=settings.PII_INFERENCE_SIDECAR_TIMEOUT_MS,
+            max_frame_bytes=settings.PII_INFERENCE_MAX_FRAME_BYTES,
+        )
+        self.fallback_enabled = settings.PII_INFERENCE_SIDECAR_FALLBACK
+        self.retry_seconds = settings.PII_INFERENCE_SIDECAR_RETRY_SECONDS
+        # 사이드카를 쓸 수 없을 때만 로드하는 프로세스 내 탐지기
+        self.local: Optional["RobertaKoreanPIIDetector"] = None
+        self._local_lock: Optional[asyncio.Lock] = None
+        self._local_in_flight = 0
+        self._retry_at = 0.0
+        self.fallback_requests = 0
+
+    @property
+    def model_version(self) -> str:
+        """캐시 키용 모델 버전 (사이드카 핸드셰이크 값 우선)"""
+        if self.client.model_version is not None:
+            return self.client.model_version
+        if self.local is not None:
+            return self.local.model_version
+        return f"{self.model_name}@{self._revision}:sidecar"
+
+    # 헬스체크/통계 호환 (프로세스 내 모델을 로드한 경우에만 값이 있음)
+    @property
+    def backend(self):
+        return self.local.backend if self.local is not None else None
+
+    @property
+    def executor(self):
+        return self.local.executor if self.local is not None else None
+
+    @property
+    def batcher(self):
+        return self.local.batcher if self.local is not None else None
+
+    async def detect_pii(self, text: str) -> dict[str, any]:
+        """텍스트에서 PII 탐지 (RobertaKoreanPIIDetector.detect_pii와 같은 결과)"""
+        predictions = await self._predict([text])
+        spans = decode_bio_spans(predictions, self.label_table)
+        return self._to_result(text, predictions[0], spans[0])
+
+    async def detect_pii_batch(self, texts: list[str]) -> list[dict[str, any]]:
+        """여러 텍스트를 한 번의 사이드카 요청으로 탐지 (배치 API용)"""
+        if not texts:
+            return []
+        predictions = await self._predict(texts)
+        spans = decode_bio_spans(predictions, self.label_table)
+        return [self._to_result(text, p, s) for text, p, s in zip(texts, predictions, spans)]
+
+    def _to_result(self, text: str, predictions: TokenPredictions, spans) -> dict[str, any]:
+        entities = spans_to_entities(spans, text)
+        return {
+            "has_pii": has_pii_entities(entities),
+            "entities": entities,
+            "raw_predictions": predictions,
+        }
+
+    def raw_prediction_dicts(self, predictions: TokenPredictions, limit: int | None = None) -> list[dict[str, any]]:
+        """원시 예측을 토큰별 dict 목록으로 변환 (디버그 응답용)"""
+        return predictions.to_dicts(self.tokenizer.convert_ids_to_tokens, self.config.id2label, limit)
+
+    async def wait_for_sidecar(self, max_backoff_seconds: float = 10.0) -> None:
+        """사이드카 핸드셰이크가 성공할 때까지 지수 백오프로 재연결 (시작 시 readiness 게이트)"""
+        delay = 0.2
+        attempts = 0
+        while True:
+            try:
+                await self.client.connect()
+                self._retry_at = 0.0
+                return
+            except SidecarUnavailable as e:
+                attempts += 1
+                if attempts == 1 or attempts % 10 == 0:
+                    logger.warning(f"Waiting for inference sidecar (attempt {attempts}): {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_backoff_seconds)
+
+    async def _predict(self, texts: list[str]) -> list[TokenPredictions]:
+        """사이드카로 예측하고, 쓸 수 없으면 (opt-in 시) 프로세스 내 모델로 대체"""
+        if time.monotonic() >= self._retry_at:
+            try:
+                predictions = await self.client.predict(texts)
+            except SidecarUnavailable as e:
+                self._retry_at = time.monotonic() + self.retry_seconds
+                logger.warning(
+                    f"Inference sidecar unavailable ({e}); "
+                    f"{'using in-process model' if self.fallback_enabled else 'no fallback'} "
+                    f"for {self.retry_seconds:.0f}s"
+                )
+                if not self.fallback_enabled:
+                    raise RuntimeError(f"Inference sidecar unavailable: {e}")
+            else:
+                if self.local is not None:
+                    self._release_local()
+                return predictions
+        elif not self.fallback_enabled:
+            raise RuntimeError("Inference sidecar unavailable")
+
+        local = await self._local_detector()
+        self.fallback_requests += 1
+        self._local_in_flight += 1
+        try:
+            return await local.predict_tokens(texts)
+        finally:
+            self._local_in_flight -= 1
+
+    def _release_local(self) -> None:
+        """사이드카가 복구되면 대체용 프로세스 내 모델을 내려 메모리를 돌려줌"""
+        if self._local_in_flight:
+            return  # 대체 경로로 처리 중인 요청이 끝난 뒤 다음 사이드카 응답에서 해제
+        local, self.local = self.local, None
+        if local.batcher is not None:
+            local.batcher.close()
+        logger.info("Inference sidecar is back; released in-process fallback model")
+
+    async def _local_detector(self) -> "RobertaKoreanPIIDetector":
+        if self.local is not None:
+            return self.local
+        # 대체 경로에서만 torch 모델 스택을 불러옴
+        from app.ai.pii_detector import RobertaKoreanPIIDetector
+
+        if self._local_lock is None:
+            self._local_lock = asyncio.Lock()
+        async with self._local_lock:
+            if self.local is None:
+                logger.warning("Loading in-process PII model as sidecar fallback...")
+                # 모델 로딩은 수 초가 걸리므로 이벤트 루프 밖에서 수행
+                self.local = await asyncio.to_thread(RobertaKoreanPIIDetector)
+        return self.local
+
+    def sidecar_stats(self) -> Dict[str, Any]:
+        return {
+            **self.client.stats(),
+            "fallback_enabled": self.fallback_enabled,
+            "fallback_loaded": self.local is not None,
+            "fallback_requests": self.fallback_requests,
+        }
+
+    def close(self) -> None:
+        self.client.close()
+        if self.local is not None and self.local.batcher is not None:
+            self.local.batcher.close()
@@ -0,0 +1,125 @@
+# app/ai/inference_protocol.py
+"""
+추론 사이드카 Unix 소켓 프레이밍
+
+프레임 = 헤더(9바이트, big-endian) + 페이로드
+    payload_length: u32 | message_type: u8 | request_id: u32
+
+한 연결에서 여러 요청을 동시에 보낼 수 있으며 응답은 request_id로 짝을 맞춘다.
+
+- HELLO   (서버 → 클라이언트, 연결 직후): UTF-8 모델 버전 문자열
+- PREDICT (클라이언트 → 서버): u32 텍스트 수 + (u32 바이트 길이 + UTF-8 텍스트) 반복
+- RESULT  (서버 → 클라이언트): u32 결과 수 + 텍스트별 TokenPredictions
+          (u32 토큰 수 n + input_ids i32[n] + label_ids u16[n] + confidences f32[n]
+           + offsets i32[n, 2] + valid u8[n], 배열은 little-endian)
+- ERROR   (서버 → 클라이언트): UTF-8 오류 메시지
+
+JSON 대신 배열을 그대로 싣기 때문에 인코딩/디코딩이 토큰 수에 비례하는 memcpy 수준이다.
+"""
+import asyncio
+import struct
+from typing import List, Tuple
+
+import numpy as np
+
+from app.utils.entity_extractor import TokenPredictions
+
+HEADER = struct.Struct("!IBI")
+U32 = struct.Struct("!I")
+
+MSG_HELLO = 1
+MSG_PREDICT = 2
+MSG_RESULT = 3
+MSG_ERROR = 4
+
+# TokenPredictions 필드별 (dtype, 토큰당 원소 수)
+_ARRAY_LAYOUT = (
+    ("input_ids", np.dtype("<i4"), 1),
+    ("label_ids", np.dtype("<u2"), 1),
+    ("confidences", np.dtype("<f4"), 1),
+    ("offsets", np.dtype("<i4"), 2),
+    ("valid", np.dtype("u1"), 1),
+)
+
+
+class ProtocolError(Exception):
+    """잘못된 프레임 (연결을 끊어야 함)"""
+
+
+def encode_frame(message_type: int, request_id: int, payload: bytes = b"") -> bytes:
+    return HEADER.pack(len(payload), message_type, request_id) + payload
+
+
+async def read_frame(reader: asyncio.StreamReader, max_frame_bytes: int) -> Tuple[int, int, bytes]:
+    """프레임 하나를 읽어 (message_type, request_id, payload) 반환 (EOF면 IncompleteReadError)"""
+    header = await reader.readexactly(HEADER.size)
+    length, message_type, request_id = HEADER.unpack(header)
+    if length > max_frame_bytes:
+        raise ProtocolError(f"frame too large: {length} bytes")
+    payload = await reader.readexactly(length) if length else b""
+    return message_type, request_id, payload
+
+
+def encode_texts(texts: List[str]) -> bytes:
+    parts = [U32.pack(len(texts))]
+    for text in texts:
+        data = text.encode("utf-8")
+        parts.append(U32.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def decode_texts(payload: bytes) -> List[str]:
+    view = memoryview(payload)
+    try:
+        (count,) = U32.unpack_from(view, 0)
+        position = U32.size
+        texts = []
+        for _ in range(count):
+            (length,) = U32.unpack_from(view, position)
+            position += U32.size
+            if position + length > len(view):
+                raise ProtocolError("truncated text")
+            texts.append(bytes(view[position:position + length]).decode("utf-8"))
+            position += length
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ProtocolError(f"invalid PREDICT payload: {e}")
+    return texts
+
+
+def encode_predictions(predictions: List[TokenPredictions]) -> bytes:
+    parts = [U32.pack(len(predictions))]
+    for prediction in predictions:
+        parts.append(U32.pack(len(prediction.input_ids)))
+        for field, dtype, _ in _ARRAY_LAYOUT:
+            parts.append(np.ascontiguousarray(getattr(prediction, field), dtype=dtype).tobytes())
+    return b"".join(parts)
+
+
+def decode_predictions(payload: bytes) -> List[TokenPredictions]:
+    view = memoryview(payload)
+    try:
+        (count,) = U32.unpack_from(view, 0)
+        position = U32.size
+        predictions = []
+        for _ in range(count):
+            (n,) = U32.unpack_from(view, position)
+            position += U32.size
+            arrays = {}
+            for field, dtype, width in _ARRAY_LAYOUT:
+                size = n * width * dtype.itemsize
+                if position + size > len(view):
+                    raise ProtocolError("truncated predictions")
+                array = np.frombuffer(view[position:position + size], dtype=dtype)
+                arrays[field] = array.reshape(n, width) if width > 1 else array
+                position += size
+            predictions.append(TokenPredictions(
+                input_ids=arrays["input_ids"].astype(np.int64),
+                label_ids=arrays["label_ids"].astype(np.int64),
+                confidences=arrays["confidences"].astype(np.float32),
+                offsets=arrays["offsets"].astype(np.int64),
+                valid=arrays["valid"].astype(bool),
+            ))
+    except struct.error as e:
+        raise ProtocolError(f"invalid RESULT payload: {e}")
+    return predictions
@@ -0,0 +1,150 @@
+# app/ai/inference_server.py
+"""
+추론 사이드카 서버
+
+`uvicorn --workers N`으로 띄우면 워커마다 roberta-large를 따로 올려 메모리가 N배가
+되고 CPU 코어를 서로 빼앗는다. 사이드카 모드에서는 이 프로세스 하나만 모델을
+소유하고, API 워커들은 Unix 도메인 소켓으로 추론을 요청하는 얇은 클라이언트가
+된다(`PII_INFERENCE_SIDECAR_ENABLED=True`). 모든 워커의 요청이 하나의 마이크로
+배처로 모이므로 워커 간에도 배치가 구성된다.
+
+    uv run python -m app.ai.inference_server --socket /tmp/dlp-inference.sock
+
+프레이밍은 app/ai/inference_protocol.py 참고.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+from typing import Optional, Set
+
+from app.ai.inference_protocol import (
+    MSG_ERROR,
+    MSG_HELLO,
+    MSG_PREDICT,
+    MSG_RESULT,
+    ProtocolError,
+    decode_texts,
+    encode_frame,
+    encode_predictions,
+    read_frame,
+)
+from app.ai.pii_detector import RobertaKoreanPIIDetector
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceServer:
+    """모델 하나를 여러 API 워커에 제공하는 Unix 소켓 서버"""
+
+    def __init__(self, detector: RobertaKoreanPIIDetector, socket_path: str, max_frame_bytes: int):
+        self.detector = detector
+        self.socket_path = socket_path
+        self.max_frame_bytes = max_frame_bytes
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+        self.connections = 0
+        self.requests = 0
+        self.texts = 0
+        self.errors = 0
+
+    async def start(self) -> None:
+        # 이전 프로세스가 남긴 소켓 파일 정리
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        # 같은 사용자/그룹의 API 워커만 접속
+        os.chmod(self.socket_path, 0o660)
+        logger.info(f"Inference sidecar listening on {self.socket_path} (model={self.detector.model_version})")
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for task in list(self._tasks):
+            task.cancel()
+        # 열린 연결을 닫아 클라이언트가 바로 대체 경로로 넘어가게 함
+        for writer in list(self._writers):
+            writer.close()
+        await asyncio.sleep(0)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        writer.write(encode_frame(MSG_HELLO, 0, self.detector.model_version.encode("utf-8")))
+        try:
+            await writer.drain()
+            while True:
+                message_type, request_id, payload = await read_frame(reader, self.max_frame_bytes)
+                if message_type != MSG_PREDICT:
+                    raise ProtocolError(f"unexpected message type: {message_type}")
+                # 요청마다 태스크로 처리해야 한 연결의 요청들도 배처에서 함께 묶인다
+                task = asyncio.create_task(self._serve(writer, request_id, decode_texts(payload)))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except asyncio.IncompleteReadError:
+            pass  # 클라이언트 종료
+        except (ProtocolError, ConnectionError) as e:
+            logger.warning(f"Closing inference client connection: {e}")
+        finally:
+            self.connections -= 1
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _serve(self, writer: asyncio.StreamWriter, request_id: int, texts: list[str]) -> None:
+        self.requests += 1
+        self.texts += len(texts)
+        try:
+            predictions = await self.detector.predict_tokens(texts) if texts else []
+            frame = encode_frame(MSG_RESULT, request_id, encode_predictions(predictions))
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Sidecar inference failed (texts={len(texts)}): {e}", exc_info=True)
+            frame = encode_frame(MSG_ERROR, request_id, str(e).encode("utf-8"))
+        if writer.is_closing():
+            return
+        writer.write(frame)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "requests": self.requests,
+            "texts": self.texts,
+            "errors": self.errors,
+            "batcher": self.detector.batcher.stats() if self.detector.batcher is not None else None,
+        }
+
+
+async def serve(socket_path: str) -> None:
+    detector = RobertaKoreanPIIDetector()
+    server = InferenceServer(detector, socket_path, settings.PII_INFERENCE_MAX_FRAME_BYTES)
+    await server.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    logger.info(f"Shutting down inference sidecar: {server.stats()}")
+    await server.close()
+    if detector.batcher is not None:
+        detector.batcher.close()
+    detector.executor.shutdown()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="PII 추론 사이드카 서버")
+    parser.add_argument("--socket", default=settings.PII_INFERENCE_SOCKET_PATH, help="Unix 소켓 경로")
+    asyncio.run(serve(parser.parse_args().socket))
@@ -1,16 +1,23 @@
 from functools import lru_cache
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
+import asyncio
 import logging
-
-from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
-import torch
+import time
 
 from app.core.config import settings
+from app.ai.executor import shutdown_inference_executor
+from app.ai.result_cache import invalidate_result_caches
+
+# torch/transformers는 import만으로 수 초가 걸리므로 모델을 만들 때 불러온다
+# (앱 import, alembic, 관리용 라우터는 ML 스택 없이 바로 동작)
+if TYPE_CHECKING:
+    from app.ai.inference_client import SidecarPIIDetector
+    from app.ai.pii_detector import RobertaKoreanPIIDetector
 
 logger = logging.getLogger(__name__)
 
 # 전역 모델 인스턴스 저장소
-_pii_detector_instance: Optional['PIIDetector'] = None
+_pii_detector_instance: Optional["RobertaKoreanPIIDetector | SidecarPIIDetector"] = None
 
 class PIIDetector:
     """PII 탐지 모델을 관리하는 클래스"""
@@ -23,6 +30,9 @@ class PIIDetector:
         self._load_model()
 
     def _load_model(self):
+        from transformers import AutoTokenizer, AutoModelForTokenClassification, pipeline
+        import torch
+
         logger.info(f"Attempting to load tokenizer for {self.model_name}...")
         try:
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
@@ -53,43 +63,167 @@ class PIIDetector:
         return {"has_pii": False, "entities": []}
 
 @lru_cache(maxsize=1)
-def get_pii_detector() -> PIIDetector:
+def get_pii_detector() -> "RobertaKoreanPIIDetector | SidecarPIIDetector":
     """
     PII 탐지 모델을 싱글톤으로 관리
+    사이드카 모드에서는 모델 없이 추론 사이드카에 요청하는 탐지기를 반환
     """
     global _pii_detector_instance
     
     if _pii_detector_instance is None:
         logger.info("Loading PII detection model (singleton initialization)...")
         try:
-            _pii_detector_instance = PIIDetector()
+            if settings.PII_INFERENCE_SIDECAR_ENABLED:
+                from app.ai.inference_client import SidecarPIIDetector
+                _pii_detector_instance = SidecarPIIDetector()
+            else:
+                from app.ai.pii_detector import RobertaKoreanPIIDetector
+                _pii_detector_instance = RobertaKoreanPIIDetector()
+            # 새 모델이 로드되면 이전 모델로 계산한 결과는 모두 무효
+            invalidate_result_caches()
             logger.info("PII detection model loaded successfully")
         except RuntimeError as e:
-            logger.error(f"Failed to initialize PIIDetector: {e}")
+            logger.error(f"Failed to initialize RobertaKoreanPIIDetector: {e}")
             _pii_detector_instance = None # Ensure global is None if init fails
             raise # Re-raise the error
     logger.info(f"DEBUG: get_pii_detector returning instance: {_pii_detector_instance}") # DEBUG PRINT
     return _pii_detector_instance
 
+def get_loaded_pii_detector() -> Optional["RobertaKoreanPIIDetector | SidecarPIIDetector"]:
+    """이미 로드된 탐지기 (로딩 중이면 None, 로딩을 유발하지 않음)"""
+    return _pii_detector_instance
+
+
+class ModelReadiness:
+    """모델 준비 상태 (loading → warming → ready, 실패 시 failed)"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.state = "loading"
+        self.error: Optional[str] = None
+        self.started_at = time.monotonic()
+        self.loaded_ms: Optional[float] = None
+        self.ready_ms: Optional[float] = None
+        self.warmup_runs = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def mark(self, state: str, error: Optional[str] = None) -> None:
+        elapsed_ms = (time.monotonic() - self.started_at) * 1000.0
+        self.state = state
+        self.error = error
+        if state == "warming" or (state == "ready" and self.loaded_ms is None):
+            self.loaded_ms = elapsed_ms
+        if state == "ready":
+            self.ready_ms = elapsed_ms
+        logger.info(f"PII model state: {state} ({elapsed_ms:.0f}ms after loading started)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "load_ms": self.loaded_ms,
+            "ready_ms": self.ready_ms,
+            "warmup_runs": self.warmup_runs,
+        }
+
+
+_model_readiness = ModelReadiness()
+_loading_task: Optional[asyncio.Task] = None
+
+# 워밍업용 문장 (정규식/NER 모두 걸리는 대표 입력)
+_WARMUP_SENTENCE = "홍길동 고객님의 연락처는 010-1234-5678이며 서울특별시 강남구 테헤란로 123에 거주합니다. "
+
+
+def get_model_readiness() -> ModelReadiness:
+    """모델 준비 상태 (readiness probe용)"""
+    return _model_readiness
+
+
+def start_model_loading() -> asyncio.Task:
+    """
+    모델 로딩 + 워밍업을 백그라운드 태스크로 시작하고 바로 반환
+    FastAPI startup event에서 호출 (그동안 모델과 무관한 API는 바로 응답)
+    """
+    global _loading_task
+    if _loading_task is None or _loading_task.done():
+        _model_readiness.reset()
+        _loading_task = asyncio.get_running_loop().create_task(_load_and_warm_up())
+    return _loading_task
+
+
+async def _load_and_warm_up() -> None:
+    try:
+        # torch/transformers import와 가중치 로딩은 이벤트 루프 밖에서 수행
+        detector = await asyncio.to_thread(get_pii_detector)
+    except Exception as e:
+        logger.error(f"Failed to load PII detection model in background: {e}")
+        _model_readiness.mark("failed", str(e))
+        return
+
+    if hasattr(detector, "wait_for_sidecar"):
+        # 사이드카 모드: 핸드셰이크가 성공할 때까지 loading 상태 유지
+        await detector.wait_for_sidecar()
+
+    _model_readiness.mark("warming")
+    # 첫 요청이 커널 초기화/메모리 할당 비용을 떠안지 않도록 대표 길이별로 미리 추론
+    for length in settings.PII_WARMUP_TEXT_LENGTHS:
+        text = (_WARMUP_SENTENCE * (length // len(_WARMUP_SENTENCE) + 1))[:length]
+        try:
+            await detector.detect_pii(text)
+            _model_readiness.warmup_runs += 1
+        except Exception as e:
+            logger.warning(f"PII model warm-up failed (length={length}): {e}")
+            break
+    _model_readiness.mark("ready")
+
+
 def preload_models():
     """
-    앱 시작 시 모델을 미리 로딩
-    FastAPI startup event에서 호출
+    앱 시작 시 모델을 미리 로딩 (로딩이 끝날 때까지 대기)
+    PII_BACKGROUND_MODEL_LOADING=False일 때 FastAPI startup event에서 호출
     """
     logger.info("Preloading AI models...")
 
     try:
         # PII 탐지 모델 로딩
-        get_pii_detector()
+        detector = get_pii_detector()
         logger.info("✓ PII detection model loaded")
+        if hasattr(detector, "wait_for_sidecar"):
+            # 사이드카 모드: 핸드셰이크가 성공한 뒤에 ready (이벤트 루프가 있을 때만 대기 가능)
+            _start_sidecar_wait(detector)
+        else:
+            _model_readiness.mark("ready")
 
         logger.info("All AI models preloaded successfully")
 
     except Exception as e:
         logger.error(f"Failed to preload models: {e}")
+        _model_readiness.mark("failed", str(e))
         # 모델 로딩 실패 시에도 서버는 시작하되, 런타임에 에러 발생하도록 함
         raise
 
+def _start_sidecar_wait(detector: "SidecarPIIDetector") -> None:
+    """사이드카 연결을 백그라운드로 기다렸다가 ready로 전환 (그동안 loading)"""
+    global _loading_task
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # 이벤트 루프 밖(런처 마스터)에서는 워커 startup에서 다시 기다림
+        return
+
+    async def _wait() -> None:
+        await detector.wait_for_sidecar()
+        _model_readiness.mark("ready")
+
+    _model_readiness.reset()
+    _loading_task = loop.create_task(_wait())
+
+
 def cleanup_models():
     """
     앱 종료 시 모델 메모리 정리
@@ -99,12 +233,25 @@ def cleanup_models():
 
     logger.info("Cleaning up AI models...")
 
+    # 아직 끝나지 않은 백그라운드 로딩/워밍업 중단
+    if _loading_task is not None and not _loading_task.done():
+        _loading_task.cancel()
+
     # PII 모델 정리
     if _pii_detector_instance is not None:
+        if hasattr(_pii_detector_instance, 'close'):
+            # 사이드카 클라이언트 연결 정리
+            _pii_detector_instance.close()
+        elif getattr(_pii_detector_instance, 'batcher', None) is not None:
+            _pii_detector_instance.batcher.close()
         if hasattr(_pii_detector_instance, 'model') and hasattr(_pii_detector_instance.model, 'cpu'):
             _pii_detector_instance.model.cpu()
         _pii_detector_instance = None
         get_pii_detector.cache_clear()
+        invalidate_result_caches()
         logger.info("✓ PII detection model cleaned up")
 
+    # 추론 실행기 정리
+    shutdown_inference_executor()
+
     logger.info("All AI models cleaned up")
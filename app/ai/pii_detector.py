@@ -1,82 +1,235 @@
 # app/ai/pii_detector.py
-from transformers import AutoTokenizer, AutoModelForTokenClassification
-import torch
-from app.utils.entity_extractor import extract_bio_entities, has_pii_entities
+import numpy as np
+from transformers import AutoConfig, AutoTokenizer, AutoModelForTokenClassification
+from app.ai.backends import InferenceBackend, create_backend
+from app.ai.batching import MicroBatcher
+from app.ai.executor import get_inference_executor
+from app.core.config import settings
+from app.utils.entity_extractor import (
+    BIOLabelTable,
+    TokenPredictions,
+    decode_bio_spans,
+    has_pii_entities,
+    spans_to_entities,
+)
 
 class RobertaKoreanPIIDetector:
     """
     한국어 PII 탐지를 위한 RoBERTa 모델
-    psh3333/roberta-large-korean-pii3 모델 사용
+    psh3333/roberta-large-korean-pii5 모델 사용
     """
-    
+
     def __init__(self):
-        self.model_name = "psh3333/roberta-large-korean-pii5"
+        self.model_name = settings.PII_MODEL_NAME
         self.tokenizer: AutoTokenizer | None = None
         self.model: AutoModelForTokenClassification | None = None
+        self.config: AutoConfig | None = None
+        self.backend: InferenceBackend | None = None
+        self.label_table: BIOLabelTable | None = None
+        self.model_version: str | None = None
         self._load_model()
-    
+
+        # 추론은 이벤트 루프가 아닌 전용 실행기에서 수행
+        self.executor = get_inference_executor()
+
+        # 동시 요청을 하나의 forward pass로 묶는 마이크로 배처
+        self.batcher: MicroBatcher | None = None
+        if settings.PII_BATCHING_ENABLED:
+            self.batcher = MicroBatcher(
+                self._predict_batch,
+                max_batch_size=settings.PII_BATCH_MAX_SIZE,
+                max_wait_ms=settings.PII_BATCH_MAX_WAIT_MS,
+                runner=self.executor.run,
+                max_in_flight=self.executor.max_workers,
+            )
+
     def _load_model(self):
-        """모델과 토크나이저 로드"""
+        """모델과 토크나이저 로드 (MODEL_MODE에 따라 추론 백엔드 선택)"""
         try:
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModelForTokenClassification.from_pretrained(self.model_name)
-            self.model.eval()
+            self.config = AutoConfig.from_pretrained(self.model_name)
+            self.label_table = BIOLabelTable(self.config.id2label)
+            self.backend = create_backend(settings.MODEL_MODE, self.model_name)
+            # ONNX 백엔드에서는 torch 모델을 메모리에 두지 않음
+            self.model = self.backend.model
+            # 캐시 키용 모델 버전 (허브 커밋 해시 + 백엔드/정밀도)
+            revision = getattr(self.config, "_commit_hash", None) or "local"
+            self.model_version = f"{self.model_name}@{revision}:{self.backend.name}/{self.backend.precision}"
         except Exception as e:
             raise RuntimeError(f"Failed to load PII detection model: {str(e)}")
-    
+
     async def detect_pii(self, text: str) -> dict[str, any]:
         """
         텍스트에서 PII 탐지
-        
+
         Returns:
             Dict containing:
             - has_pii: bool
             - entities: List of detected PII entities
-            - raw_predictions: Raw model predictions
+            - raw_predictions: Raw model predictions (TokenPredictions, raw_prediction_dicts로 변환 가능)
         """
-        if not self.model or not self.tokenizer:
+        if not self.backend or not self.tokenizer:
             raise RuntimeError("PII detection model not loaded")
-        
+
         # 토큰화 및 예측
         predictions = await self._predict_tokens(text)
-        
-        # 새로운 엔티티 추출 함수 사용
-        entities = extract_bio_entities(predictions, self.tokenizer, text)
-        
+
+        # 배열 기반 BIO 디코딩 후 원본 텍스트에서 값 추출
+        spans = decode_bio_spans([predictions], self.label_table)[0]
+        return self._to_result(text, predictions, spans)
+
+    async def detect_pii_batch(self, texts: list[str]) -> list[dict[str, any]]:
+        """
+        여러 텍스트를 한 번에 탐지 (배치 API용)
+
+        이미 묶인 요청이므로 마이크로 배처를 거치지 않고 실행기에서 바로
+        `_predict_batch`를 호출한다. 윈도우는 길이별로 정렬되어 가능한 적은
+        패딩으로 forward pass를 구성한다.
+        """
+        if not self.backend or not self.tokenizer:
+            raise RuntimeError("PII detection model not loaded")
+        if not texts:
+            return []
+
+        predictions = await self.executor.run(self._predict_batch, texts)
+        spans = decode_bio_spans(predictions, self.label_table)
+        return [self._to_result(text, p, s) for text, p, s in zip(texts, predictions, spans)]
+
+    def _to_result(self, text: str, predictions: TokenPredictions, spans) -> dict[str, any]:
+        """디코딩된 구간을 탐지 결과 dict로 변환"""
+        entities = spans_to_entities(spans, text)
+
         # PII 존재 여부 확인
         has_pii = has_pii_entities(entities)
-        
+
         return {
             "has_pii": has_pii,
             "entities": entities,
             "raw_predictions": predictions
         }
-    
-    async def _predict_tokens(self, text: str) -> list[dict[str, any]]:
-        """토큰별 PII 라벨 예측"""
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-        
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            predicted_classes = predictions.argmax(-1)
-        
-        tokens = self.tokenizer.convert_ids_to_tokens(inputs["input_ids"][0])
-        predictions_list = predicted_classes[0].tolist()
-        
-        results = []
-        for i, (token, prediction) in enumerate(zip(tokens, predictions_list)):
-            if token in ["[CLS]", "[SEP]", "[PAD]"]:
-                continue
-            
-            label = self.model.config.id2label[prediction]
-            confidence = float(predictions[0][i][prediction])
-            
-            results.append({
-                "token": token,
-                "label": label,
-                "confidence": confidence,
-                "position": i
-            })
-        
-        return results
\ No newline at end of file
+
+    def raw_prediction_dicts(self, predictions: TokenPredictions, limit: int | None = None) -> list[dict[str, any]]:
+        """원시 예측을 토큰별 dict 목록으로 변환 (디버그 응답용)"""
+        return predictions.to_dicts(self.tokenizer.convert_ids_to_tokens, self.config.id2label, limit)
+
+    async def _predict_tokens(self, text: str) -> TokenPredictions:
+        """토큰별 PII 라벨 예측 (배칭이 켜져 있으면 다른 요청과 함께 처리)"""
+        if self.batcher is not None:
+            return await self.batcher.submit(text)
+        results = await self.executor.run(self._predict_batch, [text])
+        return results[0]
+
+    async def predict_tokens(self, texts: list[str]) -> list[TokenPredictions]:
+        """
+        텍스트 목록의 토큰별 예측 (추론 사이드카 서버용)
+
+        한 건이면 마이크로 배처를 거쳐 다른 요청(다른 API 워커 포함)과 묶고,
+        여러 건이면 이미 묶인 요청으로 보고 실행기에서 바로 추론한다.
+        """
+        if len(texts) == 1:
+            return [await self._predict_tokens(texts[0])]
+        return await self.executor.run(self._predict_batch, texts)
+
+    def _predict_batch(self, texts: list[str]) -> list[TokenPredictions]:
+        """
+        여러 텍스트를 예측하여 텍스트별 토큰 예측 배열을 반환
+
+        텍스트는 한 번만 토큰화(offset mapping 포함)하고, 최대 길이를 넘으면
+        겹치는 슬라이딩 윈도우로 나눈다. 모든 텍스트의 윈도우를 하나의
+        패딩된 배치로 추론한 뒤 윈도우 경계를 이어 붙인다.
+        """
+        encodings = self.tokenizer(texts, add_special_tokens=False, return_offsets_mapping=True)
+        all_ids: list[list[int]] = encodings["input_ids"]
+
+        # (텍스트 인덱스, 시작 토큰, 끝 토큰) 윈도우 목록
+        windows = [
+            (row, start, end)
+            for row, ids in enumerate(all_ids)
+            for start, end in self._window_spans(len(ids))
+        ]
+        window_classes, window_confidences = self._forward_windows(
+            [all_ids[row][start:end] for row, start, end in windows]
+        )
+
+        # 토큰마다 가장 문맥이 넉넉한(윈도우 중앙에 가까운) 윈도우의 예측을 채택
+        scores = [np.full(len(ids), -1, dtype=np.int64) for ids in all_ids]
+        label_ids = [np.zeros(len(ids), dtype=np.int64) for ids in all_ids]
+        confidences = [np.zeros(len(ids), dtype=np.float32) for ids in all_ids]
+        for (row, start, end), classes, probs in zip(windows, window_classes, window_confidences):
+            index = np.arange(start, end)
+            score = np.minimum(index - start, end - 1 - index)
+            better = score > scores[row][start:end]
+            chosen = index[better]
+            scores[row][chosen] = score[better]
+            # classes/probs는 윈도우 앞의 [CLS]를 제외한 위치
+            label_ids[row][chosen] = classes[better]
+            confidences[row][chosen] = probs[better]
+
+        special_ids = np.array(self._special_token_ids, dtype=np.int64)
+        batch_results = []
+        for row, ids in enumerate(all_ids):
+            input_ids = np.asarray(ids, dtype=np.int64)
+            # 예측되지 않은(잘린) 위치 및 특수 토큰 제외
+            valid = (scores[row] >= 0) & ~np.isin(input_ids, special_ids)
+            batch_results.append(TokenPredictions(
+                input_ids=input_ids,
+                label_ids=label_ids[row],
+                confidences=confidences[row],
+                offsets=np.asarray(encodings["offset_mapping"][row], dtype=np.int64).reshape(-1, 2),
+                valid=valid,
+            ))
+
+        return batch_results
+
+    @property
+    def _special_token_ids(self) -> list[int]:
+        """예측에서 제외할 특수 토큰 ID ([CLS], [SEP], [PAD])"""
+        return [
+            token_id
+            for token_id in (self.tokenizer.cls_token_id, self.tokenizer.sep_token_id, self.tokenizer.pad_token_id)
+            if token_id is not None
+        ]
+
+    def _window_spans(self, num_tokens: int) -> list[tuple[int, int]]:
+        """토큰 길이에 대한 [start, end) 윈도우 구간 목록"""
+        content_length = settings.PII_MAX_SEQ_LENGTH - 2  # [CLS], [SEP]
+        if num_tokens <= content_length:
+            return [(0, num_tokens)]
+        if not settings.PII_WINDOWED_INFERENCE:
+            # 윈도우 모드가 꺼져 있으면 앞부분만 검사 (기존 truncation 동작)
+            return [(0, content_length)]
+
+        step = max(1, content_length - settings.PII_WINDOW_OVERLAP)
+        spans = []
+        start = 0
+        while start + content_length < num_tokens:
+            spans.append((start, start + content_length))
+            start += step
+        # 마지막 윈도우는 끝에 맞춰 문맥을 최대한 확보
+        spans.append((num_tokens - content_length, num_tokens))
+        return spans
+
+    def _forward_windows(self, windows: list[list[int]]) -> tuple[list[np.ndarray], list[np.ndarray]]:
+        """윈도우 토큰 목록을 패딩 배치로 추론하여 윈도우별 (클래스, 신뢰도) 배열을 반환 ([CLS]/[SEP]/패딩 제외)"""
+        cls_id = self.tokenizer.cls_token_id if self.tokenizer.cls_token_id is not None else self.tokenizer.bos_token_id
+        sep_id = self.tokenizer.sep_token_id if self.tokenizer.sep_token_id is not None else self.tokenizer.eos_token_id
+        pad_id = self.tokenizer.pad_token_id or 0
+
+        all_classes: list[np.ndarray | None] = [None] * len(windows)
+        all_confidences: list[np.ndarray | None] = [None] * len(windows)
+        # 길이 버킷팅: 비슷한 길이의 윈도우끼리 묶어 패딩 토큰을 줄인다
+        order = sorted(range(len(windows)), key=lambda i: len(windows[i]))
+        chunk_size = max(1, settings.PII_MAX_WINDOWS_PER_PASS)
+        for chunk_start in range(0, len(order), chunk_size):
+            chunk = order[chunk_start:chunk_start + chunk_size]
+            sequences = [[cls_id, *windows[i], sep_id] for i in chunk]
+            width = max(len(seq) for seq in sequences)
+            input_ids = [seq + [pad_id] * (width - len(seq)) for seq in sequences]
+            attention_mask = [[1] * len(seq) + [0] * (width - len(seq)) for seq in sequences]
+
+            predicted_classes, confidences = self.backend.forward(input_ids, attention_mask)
+            for k, (i, seq) in enumerate(zip(chunk, sequences)):
+                all_classes[i] = predicted_classes[k, 1:len(seq) - 1]
+                all_confidences[i] = confidences[k, 1:len(seq) - 1]
+
+        return all_classes, all_confidences
@@ -0,0 +1,180 @@
+# app/ai/regex_detector.py
+"""
+정규식 기반 PII 탐지 단계
+
+모든 패턴을 이름 있는 그룹의 단일 alternation으로 컴파일하여 텍스트를
+한 번만 훑는다. 체크섬이 있는 번호(주민/외국인등록번호, 사업자등록번호,
+카드번호)는 검증을 통과한 경우에만 엔티티로 인정한다. 검증에 실패한 구간은
+뒤쪽 패턴(예: 카드번호 → 계좌번호)으로 다시 분류를 시도한다.
+
+결과는 NER 경로와 같은 엔티티 형태(type/value/confidence/token_count/start/end/source)다.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# (엔티티 타입, 신뢰도) 또는 None(거부)
+Classification = Optional[Tuple[str, float]]
+
+_NO_DIGIT_BEFORE = r"(?<![\d-])"
+_NO_DIGIT_AFTER = r"(?![\d-])"
+
+
+def _digits(value: str) -> str:
+    return "".join(ch for ch in value if ch.isdigit())
+
+
+def _classify_resident_id(value: str) -> Classification:
+    """주민등록번호(성별 1-4) / 외국인등록번호(성별 5-8) 체크섬 검증"""
+    digits = [int(d) for d in _digits(value)]
+    if len(digits) != 13:
+        return None
+    weights = (2, 3, 4, 5, 6, 7, 8, 9, 2, 3, 4, 5)
+    total = sum(d * w for d, w in zip(digits, weights))
+    if digits[6] in (1, 2, 3, 4):
+        if (11 - total % 11) % 10 == digits[12]:
+            return "ID_NUM", 0.99
+    elif digits[6] in (5, 6, 7, 8):
+        if (13 - total % 11) % 10 == digits[12]:
+            return "FOREIGNER_ID_NUM", 0.99
+    return None
+
+
+def _classify_business_id(value: str) -> Classification:
+    """사업자등록번호 체크섬 검증"""
+    digits = [int(d) for d in _digits(value)]
+    if len(digits) != 10:
+        return None
+    weights = (1, 3, 7, 1, 3, 7, 1, 3, 5)
+    total = sum(d * w for d, w in zip(digits, weights)) + (digits[8] * 5) // 10
+    if (10 - total % 10) % 10 == digits[9]:
+        return "BUSINESS_ID_NUM", 0.99
+    return None
+
+
+def _classify_card(value: str) -> Classification:
+    """카드번호 Luhn 검증"""
+    digits = [int(d) for d in _digits(value)]
+    if not 13 <= len(digits) <= 19:
+        return None
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        if i % 2 == 1:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    if total % 10 == 0:
+        return "CREDIT_CARD_INFO", 0.97
+    return None
+
+
+def _classify_bank_account(value: str) -> Classification:
+    """하이픈 구분 계좌번호 (은행별 형식 총 10~14자리)"""
+    if 10 <= len(_digits(value)) <= 14:
+        return "BANK_ACCOUNT", 0.8
+    return None
+
+
+def _fixed(entity_type: str, confidence: float) -> Callable[[str], Classification]:
+    return lambda value: (entity_type, confidence)
+
+
+# 순서가 곧 우선순위 (앞쪽 패턴이 같은 위치에서 먼저 매칭됨)
+PATTERNS: List[Tuple[str, str, Callable[[str], Classification]]] = [
+    (
+        "EMAIL",
+        r"(?<![\w.+-])[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}",
+        _fixed("EMAIL", 0.99),
+    ),
+    (
+        "RESIDENT_ID",
+        _NO_DIGIT_BEFORE + r"\d{2}(?:0[1-9]|1[0-2])(?:0[1-9]|[12]\d|3[01])-?[1-8]\d{6}" + _NO_DIGIT_AFTER,
+        _classify_resident_id,
+    ),
+    (
+        "BUSINESS_ID",
+        _NO_DIGIT_BEFORE + r"\d{3}-\d{2}-\d{5}" + _NO_DIGIT_AFTER,
+        _classify_business_id,
+    ),
+    (
+        "PHONE",
+        _NO_DIGIT_BEFORE
+        + r"(?:01[016789][- .]?\d{3,4}[- .]?\d{4}"  # 휴대전화
+        + r"|0(?:2|[3-6][1-5]|70)[- .)]?\d{3,4}[- .]?\d{4}"  # 지역번호/인터넷전화
+        + r"|1[5-9]\d{2}-\d{4})"  # 대표번호
+        + _NO_DIGIT_AFTER,
+        _fixed("PHONE_NUM", 0.95),
+    ),
+    (
+        "CARD",
+        _NO_DIGIT_BEFORE + r"\d{4}(?:[- ]?\d{2,6}){2,4}" + _NO_DIGIT_AFTER,
+        _classify_card,
+    ),
+    (
+        "BANK_ACCOUNT",
+        _NO_DIGIT_BEFORE + r"\d{2,6}-\d{2,6}-\d{2,7}(?:-\d{1,3})?" + _NO_DIGIT_AFTER,
+        _classify_bank_account,
+    ),
+    (
+        "PASSPORT",
+        r"(?<![A-Za-z0-9])[MSRODG](?:\d{8}|\d{3}[A-Z]\d{4})(?![A-Za-z0-9])",
+        _fixed("PASSPORT_NUM", 0.9),
+    ),
+]
+
+
+class RegexPIIDetector:
+    """단일 패스 다중 패턴 정규식 탐지기"""
+
+    def __init__(self, patterns: List[Tuple[str, str, Callable[[str], Classification]]] = PATTERNS):
+        self.patterns = patterns
+        self.combined = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern, _ in patterns))
+        self._order = {name: index for index, (name, _, _) in enumerate(patterns)}
+        self._individual = [(re.compile(pattern), classify) for _, pattern, classify in patterns]
+
+    def detect(self, text: str) -> List[Dict[str, Any]]:
+        """텍스트에서 정규식 PII 엔티티를 찾아 위치 순으로 반환"""
+        # 숫자와 @가 모두 없으면 어떤 패턴도 매칭될 수 없음 (여권번호도 숫자 포함)
+        if "@" not in text and not any(ch.isdigit() for ch in text):
+            return []
+
+        entities = []
+        for match in self.combined.finditer(text):
+            name = match.lastgroup
+            value = match.group()
+            classification = self.patterns[self._order[name]][2](value)
+            if classification is None:
+                classification = self._reclassify(value, self._order[name] + 1)
+                if classification is None:
+                    continue
+            entity_type, confidence = classification
+            entities.append({
+                "type": entity_type,
+                "value": value,
+                "confidence": confidence,
+                "token_count": 1,
+                "start": match.start(),
+                "end": match.end(),
+                "source": "regex",
+            })
+        return entities
+
+    def _reclassify(self, value: str, first: int) -> Classification:
+        """검증에 실패한 구간을 우선순위가 낮은 패턴으로 다시 분류"""
+        for pattern, classify in self._individual[first:]:
+            if pattern.fullmatch(value):
+                classification = classify(value)
+                if classification is not None:
+                    return classification
+        return None
+
+
+_regex_detector_instance: Optional[RegexPIIDetector] = None
+
+
+def get_regex_detector() -> RegexPIIDetector:
+    """정규식 탐지기 싱글톤 (패턴은 한 번만 컴파일)"""
+    global _regex_detector_instance
+    if _regex_detector_instance is None:
+        _regex_detector_instance = RegexPIIDetector()
+    return _regex_detector_instance
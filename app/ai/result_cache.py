@@ -0,0 +1,229 @@
+# app/ai/result_cache.py
+"""
+탐지 결과 캐시 (content-addressed)
+
+게이트웨이는 같은 프롬프트/템플릿(재시도, 시스템 프롬프트, 정형 메시지)을
+반복해서 보내므로, 정규화한 텍스트와 모델 버전/탐지 설정을 해시한 키로
+분석 결과를 재사용한다.
+
+- 크기 제한 LRU (항목 수 + 추정 메모리) 와 TTL 만료
+- single-flight: 같은 키의 동시 요청은 하나의 계산 결과를 함께 기다림
+- 모델이 다시 로드되면 `invalidate()`로 전체 무효화 (키에도 모델 버전 포함)
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+def normalize_text(text: str) -> str:
+    """
+    캐시 키용 텍스트 정규화
+
+    엔티티 start/end가 원문 기준이므로 오프셋을 바꾸지 않는 정규화
+    (끝쪽 공백 제거)만 적용한다.
+    """
+    return text.rstrip()
+
+
+def make_cache_key(text: str, *config_parts: Any) -> str:
+    """정규화한 텍스트 + 모델 버전/설정 값의 SHA-256 키"""
+    digest = hashlib.sha256()
+    for part in config_parts:
+        digest.update(repr(part).encode("utf-8"))
+        digest.update(b"\x00")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DetectionResultCache:
+    """LRU + TTL 결과 캐시 (단일 이벤트 루프에서 사용)"""
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        # key -> (만료 시각, 추정 크기, 값)
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def lookup(self, key: str) -> Optional[Any]:
+        """적중 여부를 통계에 반영하는 조회"""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self.current_bytes += size
+        # 항목 수/메모리 한도를 넘으면 가장 오래 쓰이지 않은 항목부터 제거
+        while len(self._entries) > self.max_entries or self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        size_of: Callable[[Any], int],
+    ) -> Any:
+        """캐시에 있으면 반환하고, 없으면 한 번만 계산하여 저장"""
+        value = self.lookup(key)
+        if value is not None:
+            return value
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            # 같은 키를 계산 중인 요청이 있으면 그 결과를 기다림
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # 계산은 별도 태스크에서 실행: 먼저 온 요청이 취소되어도 함께 기다리는 요청은 결과를 받음
+            task = asyncio.get_running_loop().create_task(self._compute_and_store(key, compute, size_of))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+        # 취소된 호출자는 기다림만 멈추고 계산 태스크는 계속 진행
+        return await asyncio.shield(task)
+
+    async def _compute_and_store(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        size_of: Callable[[Any], int],
+    ) -> Any:
+        generation = self.invalidations
+        value = await compute()
+        self.put_if_current(key, value, size_of(value), generation)
+        return value
+
+    def join_or_reserve(self, key: str) -> Tuple[asyncio.Future, bool]:
+        """
+        배치 계산용 single-flight 등록
+
+        같은 키를 계산 중인 요청이 있으면 (그 future, False)를 돌려주고, 없으면 새
+        future를 계산 중으로 등록해 (future, True)를 돌려준다. True를 받은 호출자는
+        `resolve()` 또는 `future.set_exception()`으로 반드시 결과를 채워야 한다.
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return future, False
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        future.add_done_callback(lambda done, key=key: self._finish(key, done))
+        return future, True
+
+    def resolve(self, key: str, future: asyncio.Future, value: Any, size: int, generation: int) -> None:
+        """join_or_reserve로 등록한 계산 결과를 (세대가 같으면) 저장하고 기다리는 요청에 전달"""
+        self.put_if_current(key, value, size, generation)
+        if not future.done():
+            future.set_result(value)
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # 기다리는 요청이 모두 취소되어도 "exception was never retrieved" 경고가 나지 않도록 소비
+            task.exception()
+
+    def put_if_current(self, key: str, value: Any, size: int, generation: int) -> bool:
+        """
+        계산을 시작할 때의 무효화 세대(`invalidations`)가 그대로일 때만 저장
+
+        계산 도중 모델이 다시 로드되었다면 이전 모델의 결과이므로 버린다.
+        """
+        if generation != self.invalidations:
+            return False
+        self.put(key, value, size)
+        return True
+
+    def invalidate(self) -> None:
+        """전체 무효화 (모델 재로딩 시 호출)"""
+        self._entries.clear()
+        self.current_bytes = 0
+        self.invalidations += 1
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": ((self.hits + self.coalesced) / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "in_flight": len(self._in_flight),
+        }
+
+
+_result_cache_instance: Optional[DetectionResultCache] = None
+_segment_cache_instance: Optional[DetectionResultCache] = None
+
+
+def get_result_cache() -> DetectionResultCache:
+    """결과 캐시 싱글톤"""
+    global _result_cache_instance
+    if _result_cache_instance is None:
+        _result_cache_instance = DetectionResultCache(
+            max_entries=settings.PII_RESULT_CACHE_MAX_ENTRIES,
+            max_bytes=int(settings.PII_RESULT_CACHE_MAX_MB * 1024 * 1024),
+            ttl_seconds=settings.PII_RESULT_CACHE_TTL_SECONDS,
+        )
+    return _result_cache_instance
+
+
+def get_segment_cache() -> DetectionResultCache:
+    """대화 기록 세그먼트 단위 결과 캐시 싱글톤 (값: 세그먼트 기준 오프셋의 엔티티)"""
+    global _segment_cache_instance
+    if _segment_cache_instance is None:
+        _segment_cache_instance = DetectionResultCache(
+            max_entries=settings.PII_SEGMENT_CACHE_MAX_ENTRIES,
+            max_bytes=int(settings.PII_SEGMENT_CACHE_MAX_MB * 1024 * 1024),
+            ttl_seconds=settings.PII_RESULT_CACHE_TTL_SECONDS,
+        )
+    return _segment_cache_instance
+
+
+def invalidate_result_caches() -> None:
+    """모든 결과 캐시 무효화 (모델 재로딩 시)"""
+    get_result_cache().invalidate()
+    get_segment_cache().invalidate()
@@ -1,12 +1,33 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Request
-from fastapi.responses import JSONResponse
-from app.schemas.pii import PIIDetectionRequest, PIIDetectionResponse
+from fastapi import APIRouter, HTTPException, status, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from app.schemas.pii import (
+    PIIBatchDetectionRequest,
+    PIIBatchDetectionResponse,
+    PIIBatchItemResult,
+    PIIBatchTiming,
+    PIIBatchItem,
+    PIIDetectionRequest,
+    PIIDetectionResponse,
+    PIIStreamItemResult,
+)
 from app.services.pii_service import PIIDetectionService
+from app.services.pii_stream_session import PIIStreamSession
 from app.schemas.log import PIIDetectionLog, LogLevel
 from app.repositories.log_repository import get_log_repository
-from app.ai.model_manager import get_pii_detector
+from app.repositories.log_writer import get_log_writer
+from app.ai.admission import AdmissionRejected, get_admission_controller
+from app.ai.cascade import get_cascade_gate
+from app.ai.deadline import get_deadline_planner
+from app.ai.model_manager import get_loaded_pii_detector, get_model_readiness
+from app.ai.result_cache import get_result_cache, get_segment_cache
+from app.core.config import settings
 from app.core.dependencies import get_current_user
 from app.models.user import User
+from contextlib import asynccontextmanager
+import time
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,8 +37,116 @@ router = APIRouter()
 # 서비스 인스턴스 생성 (이제 모델은 싱글톤으로 관리됨)
 pii_service = PIIDetectionService()
 
+
+def _too_many_requests(e: AdmissionRejected) -> HTTPException:
+    """승인 거절을 429 + Retry-After 응답으로 변환"""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=f"요청이 많아 지금은 처리할 수 없습니다. 잠시 후 다시 시도해 주세요. ({e.reason})",
+        headers={"Retry-After": e.retry_after_header},
+    )
+
+
+@asynccontextmanager
+async def _admission(lane: str, request_obj: Request, cost: float = 1.0):
+    """승인 제어 슬롯을 얻은 동안 실행 (거절 시 429)"""
+    if not settings.PII_ADMISSION_ENABLED:
+        yield
+        return
+    client_ip = request_obj.client.host if request_obj.client else None
+    try:
+        async with get_admission_controller().admit(lane, client_ip, cost=cost):
+            yield
+    except AdmissionRejected as e:
+        logger.warning(f"PII detection rejected by admission control: lane={lane}, client={client_ip}, reason={e.reason}")
+        raise _too_many_requests(e)
+
+
+def _require_model_ready() -> None:
+    """모델 로딩/워밍업이 끝나기 전이면 503 + Retry-After"""
+    readiness = get_model_readiness()
+    if readiness.ready:
+        return
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"PII 탐지 모델을 준비하고 있습니다. 잠시 후 다시 시도해 주세요. ({readiness.state})",
+        headers={"Retry-After": "5"},
+    )
+
+
+def _resolve_deadline(request: PIIDetectionRequest, request_obj: Request) -> Optional[float]:
+    """요청 필드 또는 X-Deadline-Ms 헤더의 지연 예산을 마감 시각(time.monotonic 기준)으로 변환"""
+    budget_ms = request.deadline_ms
+    if budget_ms is None:
+        header = request_obj.headers.get("x-deadline-ms")
+        if header is None:
+            return None
+        try:
+            budget_ms = float(header)
+        except ValueError:
+            budget_ms = 0
+        if budget_ms <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="X-Deadline-Ms 헤더는 양수(ms)여야 합니다."
+            )
+    return time.monotonic() + budget_ms / 1000.0
+
+
+def _build_detection_log(
+    request_obj: Request,
+    text: str,
+    result: PIIDetectionResponse,
+    duration_ms: Optional[float],
+    extra_metadata: Optional[Dict[str, Any]] = None,
+) -> PIIDetectionLog:
+    """탐지 결과로 Elasticsearch 로그 문서 생성"""
+    client_ip = request_obj.client.host if request_obj.client else "unknown"
+    user_agent = request_obj.headers.get("user-agent")
+    entity_types = list({e.type for e in result.entities})
+    detected_entities = [e.model_dump() for e in result.entities]
+    # 메타데이터에 차단 액션 추가
+    log_metadata = {
+        "username": "anonymous", # 인증 임시 비활성화
+        "path": str(request_obj.url.path)
+    }
+    if result.detection_path:
+        log_metadata["detection_path"] = result.detection_path
+    if result.degraded:
+        log_metadata["degraded"] = True
+    if extra_metadata:
+        log_metadata.update(extra_metadata)
+    if result.has_pii:
+        log_metadata["action"] = "BLOCK"
+
+    return PIIDetectionLog(
+        level=LogLevel.INFO if not result.has_pii else LogLevel.WARNING, # PII 탐지 시 WARNING
+        client_ip=client_ip,
+        user_agent=user_agent,
+        request_id=request_obj.headers.get("x-request-id"),
+        input_text=text,
+        text_length=len(text),
+        has_pii=result.has_pii,
+        detected_entities=detected_entities,
+        entity_count=len(detected_entities),
+        entity_types=entity_types,
+        processing_time_ms=duration_ms,
+        reason=result.reason,
+        details=result.details,
+        metadata=log_metadata
+    )
+
+
+async def _write_detection_logs(logs: list[PIIDetectionLog]) -> None:
+    """탐지 로그 저장 - writer 사용 시 큐에 넣고 바로 반환 (ES 왕복은 백그라운드 bulk)"""
+    if settings.LOG_WRITER_ENABLED:
+        get_log_writer().enqueue_many(logs)
+    else:
+        await get_log_repository().save_logs_bulk(logs)
+
 @router.post("/detect",
              response_model=PIIDetectionResponse,
+             response_model_exclude_none=True,
              summary="PII 탐지 (인증 필요)",
              description="입력된 텍스트에서 개인정보를 탐지하고 결과를 반환합니다. JWT 토큰 필요.",
              status_code=status.HTTP_200_OK)
@@ -30,12 +159,15 @@ async def detect_pii(
     텍스트에서 개인정보 탐지 API
     
     - **text**: 분석할 텍스트 (1-10,000자)
+    - **debug**: true이면 같은 추론의 토큰별 원시 예측을 함께 반환
+    - **deadline_ms** (또는 X-Deadline-Ms 헤더): 지연 예산. 모델 추론이 예산을 넘길 것으로 예상되면 정규식 전용 경로로 응답
     
     반환값:
     - **has_pii**: 개인정보 탐지 여부 (boolean)
     - **reason**: 탐지 결과 이유
     - **details**: 구체적인 탐지 내용
     - **entities**: 탐지된 개인정보 엔티티 목록
+    - **detection_path** / **degraded**: 실행된 탐지 경로와 마감 시간으로 인한 경로 낮춤 여부
     """
     try:
         # 입력 검증
@@ -44,62 +176,44 @@ async def detect_pii(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="입력 텍스트가 비어있습니다."
             )
+        _require_model_ready()
         
         # PII 탐지 수행 + 처리 시간 측정
-        from time import perf_counter
         started_at = perf_counter()
+        deadline = _resolve_deadline(request, request_obj)
         # logger.info(f"PII detection started for user: {current_user.username}, text length: {len(request.text)}")
         logger.info(f"PII detection started for user: anonymous, text length: {len(request.text)}") # 인증 임시 비활성화
-        result = await pii_service.analyze_text(request.text.strip())
+        # 원시 예측은 같은 추론 결과에서 꺼내므로 추가 forward pass가 없다
+        include_raw = request.debug or settings.PII_DEBUG_RAW_PREDICTIONS
+        # 엔티티 start/end가 요청 원문 기준이 되도록 원문 그대로 전달
+        admission_wait_ms = (
+            get_admission_controller().estimated_wait_ms("interactive") if settings.PII_ADMISSION_ENABLED else 0.0
+        )
+        if deadline is not None and not pii_service.fits_deadline(len(request.text), deadline, admission_wait_ms):
+            # 대기열을 기다릴 예산도 없으면 슬롯 없이 정규식 전용 경로로 바로 응답
+            result = await pii_service.analyze_text(
+                request.text, include_raw_predictions=include_raw, deadline=deadline, regex_only=True
+            )
+        else:
+            async with _admission("interactive", request_obj):
+                result = await pii_service.analyze_text(
+                    request.text, include_raw_predictions=include_raw, deadline=deadline
+                )
         duration_ms = (perf_counter() - started_at) * 1000.0
-        logger.info(f"PII detection completed in {duration_ms:.1f} ms. Has PII: {result.has_pii}, Entities: {len(result.entities)}")
-        
-        # 디버깅을 위해 원시 예측 결과 로그 출력
-        from app.ai.model_manager import get_pii_detector
-        detector = get_pii_detector()
-        raw_predictions = await detector._predict_tokens(request.text.strip())
-        logger.info(f"Raw predictions sample: {raw_predictions[:20]}")
-        
-        # 임시: 디버깅을 위해 raw_predictions를 응답에 포함
-        response_dict = result.model_dump()
-        response_dict["debug_raw_predictions"] = raw_predictions[:20]  # 처음 20개만
+        logger.info(
+            f"PII detection completed in {duration_ms:.1f} ms. Has PII: {result.has_pii}, "
+            f"Entities: {len(result.entities)}, path: {result.detection_path}{' (degraded)' if result.degraded else ''}"
+        )
+        if result.debug_raw_predictions is not None:
+            logger.debug(f"Raw predictions sample: {result.debug_raw_predictions}")
         
-        # Elasticsearch에 로그 저장 (best-effort)
+        # Elasticsearch에 로그 저장 (best-effort, writer 사용 시 큐에 넣고 바로 반환)
         try:
-            client_ip = request_obj.client.host if request_obj.client else "unknown"
-            user_agent = request_obj.headers.get("user-agent")
-            entity_types = list({e.type for e in result.entities})
-            detected_entities = [e.model_dump() for e in result.entities]
-            # 메타데이터에 차단 액션 추가
-            log_metadata = {
-                "username": "anonymous", # 인증 임시 비활성화
-                "path": str(request_obj.url.path)
-            }
-            if result.has_pii:
-                log_metadata["action"] = "BLOCK"
-
-            log = PIIDetectionLog(
-                level=LogLevel.INFO if not result.has_pii else LogLevel.WARNING, # PII 탐지 시 WARNING
-                client_ip=client_ip,
-                user_agent=user_agent,
-                request_id=request_obj.headers.get("x-request-id"),
-                input_text=request.text,
-                text_length=len(request.text),
-                has_pii=result.has_pii,
-                detected_entities=detected_entities,
-                entity_count=len(detected_entities),
-                entity_types=entity_types,
-                processing_time_ms=duration_ms,
-                reason=result.reason,
-                details=result.details,
-                metadata=log_metadata
-            )
-            repo = get_log_repository()
-            await repo.save_log(log)
+            await _write_detection_logs([_build_detection_log(request_obj, request.text, result, duration_ms)])
         except Exception as log_err:
             logger.warning(f"Failed to write detection log to ES: {log_err}")
         
-        return response_dict
+        return result
         
     except HTTPException:
         raise
@@ -110,6 +224,275 @@ async def detect_pii(
             detail="PII 탐지 중 오류가 발생했습니다."
         )
 
+@router.post("/detect/batch",
+             response_model=PIIBatchDetectionResponse,
+             response_model_exclude_none=True,
+             summary="PII 일괄 탐지",
+             description="여러 텍스트를 한 번의 요청으로 탐지합니다. 텍스트를 모아 최소 횟수의 모델 추론으로 처리하고, 로그는 한 번의 bulk 요청으로 저장합니다.",
+             status_code=status.HTTP_200_OK)
+async def detect_pii_batch(
+    request: PIIBatchDetectionRequest,
+    request_obj: Request,
+) -> PIIBatchDetectionResponse:
+    """
+    여러 텍스트에서 개인정보 일괄 탐지 API
+    
+    - **items**: [{id?, text}] 목록 (최대 PII_DETECT_BATCH_MAX_ITEMS개)
+    
+    반환값:
+    - **items**: 입력 순서의 항목별 탐지 결과 (index, id, result)
+    - **timing**: 단계별 처리 시간 (ms)
+    """
+    if len(request.items) > settings.PII_DETECT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"한 번에 최대 {settings.PII_DETECT_BATCH_MAX_ITEMS}개 항목까지 요청할 수 있습니다."
+        )
+    _require_model_ready()
+    if any(not item.text.strip() for item in request.items):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="입력 텍스트가 비어있는 항목이 있습니다."
+        )
+    
+    try:
+        started_at = perf_counter()
+        logger.info(f"Batch PII detection started for user: anonymous, items: {len(request.items)}") # 인증 임시 비활성화
+        # 항목 수만큼 속도 제한 토큰을 차감 (배치 한 번으로 제한을 우회하지 못하도록)
+        async with _admission("bulk", request_obj, cost=len(request.items)):
+            results, timing = await pii_service.analyze_batch([item.text for item in request.items])
+        
+        # Elasticsearch에 로그 저장 (writer 큐 또는 한 번의 bulk 요청, best-effort)
+        log_started_at = perf_counter()
+        per_item_ms = timing["detection_ms"] / len(results)
+        try:
+            logs = [
+                _build_detection_log(
+                    request_obj, item.text, result, per_item_ms,
+                    extra_metadata={"batch_index": index, "batch_item_id": item.id, "batch_size": len(results)},
+                )
+                for index, (item, result) in enumerate(zip(request.items, results))
+            ]
+            await _write_detection_logs(logs)
+        except Exception as log_err:
+            logger.warning(f"Failed to write batch detection logs to ES: {log_err}")
+        finished_at = perf_counter()
+        
+        timing["log_ms"] = (finished_at - log_started_at) * 1000.0
+        timing["total_ms"] = (finished_at - started_at) * 1000.0
+        logger.info(
+            f"Batch PII detection completed in {timing['total_ms']:.1f} ms. "
+            f"Items: {timing['items']}, model: {timing['model_items']}, cache hits: {timing['cache_hits']}"
+        )
+        return PIIBatchDetectionResponse(
+            items=[
+                PIIBatchItemResult(index=index, id=item.id, result=result)
+                for index, (item, result) in enumerate(zip(request.items, results))
+            ],
+            timing=PIIBatchTiming(**timing),
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch PII detection failed: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="PII 일괄 탐지 중 오류가 발생했습니다."
+        )
+
+class _NDJSONStreamingResponse(StreamingResponse):
+    """
+    요청 본문을 읽으면서 응답을 보내는 스트리밍 응답
+
+    ASGI spec 2.4 미만에서 StreamingResponse가 띄우는 disconnect 감시 태스크는
+    receive()로 들어오는 요청 본문 메시지를 소비해 버리므로 사용하지 않는다.
+    연결 종료는 본문 읽기/응답 쓰기 중 예외로 드러난다.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+
+def _parse_stream_record(line: bytes) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """NDJSON 한 줄을 (id, text, error)로 변환"""
+    try:
+        item = PIIBatchItem.model_validate_json(line)
+    except ValidationError as e:
+        first = e.errors()[0]
+        location = ".".join(str(part) for part in first.get("loc", ())) or "record"
+        return None, None, f"레코드 형식이 올바르지 않습니다 ({location}: {first.get('msg')})"
+    return item.id, item.text, None
+
+
+async def _read_ndjson_records(request_obj: Request) -> AsyncIterator[Tuple[Optional[str], Optional[str], Optional[str]]]:
+    """요청 본문을 조금씩 읽어 NDJSON 레코드를 하나씩 돌려준다 (빈 줄은 무시)"""
+    max_line_bytes = settings.PII_STREAM_MAX_LINE_BYTES
+    too_long = (None, None, f"레코드가 최대 길이({max_line_bytes} bytes)를 초과했습니다.")
+    buffer = b""
+    discarding = False  # 최대 길이를 넘은 줄의 나머지를 버리는 중
+    async for data in request_obj.stream():
+        buffer += data
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                break
+            line, buffer = buffer[:newline], buffer[newline + 1:]
+            if discarding:
+                discarding = False
+                continue
+            if len(line) > max_line_bytes:
+                yield too_long
+            elif line.strip():
+                yield _parse_stream_record(line)
+        if not discarding and len(buffer) > max_line_bytes:
+            yield too_long
+            buffer = b""
+            discarding = True
+        elif discarding:
+            buffer = b""
+    if buffer.strip() and not discarding:
+        if len(buffer) > max_line_bytes:
+            yield too_long
+        else:
+            yield _parse_stream_record(buffer)
+
+
+@router.post("/detect/stream",
+             summary="PII 스트리밍 일괄 탐지 (NDJSON)",
+             description=(
+                 "요청 본문의 NDJSON 레코드({\"id\"?, \"text\"})를 순서대로 읽어 청크 단위로 일괄 탐지하고, "
+                 "결과를 입력 순서대로 NDJSON으로 스트리밍합니다. 대량 오프라인 감사용입니다."
+             ),
+             response_class=StreamingResponse,
+             status_code=status.HTTP_200_OK)
+async def detect_pii_stream(request_obj: Request):
+    """
+    NDJSON 스트리밍 탐지 API
+    
+    - 요청: 한 줄에 하나의 JSON 레코드 `{"id": "...", "text": "..."}` (Content-Type: application/x-ndjson)
+    - 응답: 레코드마다 한 줄 `{"index", "id", "result"}` 또는 `{"index", "id", "error"}`
+    
+    동시에 처리 중인 청크 수가 제한되어 있어 양쪽 모두 전체 데이터를 메모리에 올리지 않습니다.
+    """
+    _require_model_ready()
+    # 스트림은 시작 시점에만 속도 제한/과부하를 검사하고, 이후 청크는 bulk 슬롯을 기다림
+    lane = None
+    if settings.PII_ADMISSION_ENABLED:
+        controller = get_admission_controller()
+        try:
+            controller.check_rate(request_obj.client.host if request_obj.client else None)
+            controller.check_capacity("bulk")
+        except AdmissionRejected as e:
+            raise _too_many_requests(e)
+        lane = "bulk"
+    logger.info("Streaming PII detection started for user: anonymous") # 인증 임시 비활성화
+
+    async def generate() -> AsyncIterator[bytes]:
+        started_at = perf_counter()
+        index = 0
+        errors = 0
+        try:
+            chunks = pii_service.analyze_stream(
+                _read_ndjson_records(request_obj),
+                chunk_size=settings.PII_STREAM_CHUNK_SIZE,
+                max_in_flight=settings.PII_STREAM_MAX_IN_FLIGHT_CHUNKS,
+                lane=lane,
+            )
+            async for chunk in chunks:
+                lines = []
+                logs = []
+                for item_id, text, result, error in chunk:
+                    item = PIIStreamItemResult(index=index, id=item_id, result=result, error=error)
+                    lines.append(item.model_dump_json(exclude_none=True))
+                    if error is not None:
+                        errors += 1
+                    elif settings.PII_STREAM_LOG_TO_ES:
+                        logs.append(_build_detection_log(
+                            request_obj, text, result, None,
+                            extra_metadata={"stream_index": index, "stream_item_id": item_id},
+                        ))
+                    index += 1
+                yield ("\n".join(lines) + "\n").encode("utf-8")
+
+                # 청크 단위로 로그 저장 (writer 큐 또는 한 번의 bulk 요청, best-effort)
+                if logs:
+                    try:
+                        await _write_detection_logs(logs)
+                    except Exception as log_err:
+                        logger.warning(f"Failed to write stream detection logs to ES: {log_err}")
+        except Exception as e:
+            logger.error(f"Streaming PII detection failed after {index} records: {str(e)}", exc_info=True)
+            yield (PIIStreamItemResult(index=index, error="PII 탐지 중 오류가 발생했습니다.").model_dump_json(exclude_none=True) + "\n").encode("utf-8")
+        finally:
+            logger.info(
+                f"Streaming PII detection finished in {(perf_counter() - started_at) * 1000.0:.1f} ms. "
+                f"Records: {index}, errors: {errors}"
+            )
+
+    return _NDJSONStreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.websocket("/stream/ws")
+async def detect_pii_incremental(websocket: WebSocket):
+    """
+    증분 PII 탐지 세션 (LLM 응답 스트림)
+    
+    클라이언트 → 서버 (JSON 텍스트 프레임):
+    - `{"type": "delta", "text": "..."}`: 스트림에 이어 붙일 텍스트 조각
+    - `{"type": "end"}`: 스트림 종료 (남은 꼬리 확정 후 세션 종료)
+    
+    서버 → 클라이언트:
+    - `{"type": "entity", "entity": {...}}`: 확정된 엔티티 (start/end는 스트림 시작 기준)
+    - `{"type": "commit", "offset": n}`: n 글자까지 확정 (이후 탐지 결과가 바뀌지 않음)
+    - `{"type": "end", ...}`: 세션 요약
+    - `{"type": "error", "message": "..."}`: 잘못된 메시지
+    """
+    await websocket.accept()
+    if not get_model_readiness().ready:
+        # 1013 Try Again Later: 모델 준비 전
+        await websocket.close(code=1013)
+        return
+    # 세션은 시작 시점에만 속도 제한/과부하를 검사하고, 이후 탐지마다 interactive 슬롯을 기다림
+    lane = None
+    if settings.PII_ADMISSION_ENABLED:
+        controller = get_admission_controller()
+        try:
+            controller.check_rate(websocket.client.host if websocket.client else None)
+            controller.check_capacity("interactive")
+        except AdmissionRejected as e:
+            logger.warning(f"Incremental PII detection session rejected by admission control: reason={e.reason}")
+            await websocket.close(code=1013)
+            return
+        lane = "interactive"
+    session = PIIStreamSession(pii_service, lane=lane)
+    logger.info("Incremental PII detection session started for user: anonymous") # 인증 임시 비활성화
+    try:
+        while True:
+            message = await websocket.receive_json()
+            message_type = message.get("type") if isinstance(message, dict) else None
+            if message_type == "delta":
+                delta = message.get("text")
+                if not isinstance(delta, str):
+                    await websocket.send_json({"type": "error", "message": "delta 메시지에는 문자열 text가 필요합니다."})
+                    continue
+                for event in await session.feed(delta):
+                    await websocket.send_json(event)
+            elif message_type == "end":
+                for event in await session.finish():
+                    await websocket.send_json(event)
+                await websocket.close()
+                break
+            else:
+                await websocket.send_json({"type": "error", "message": "알 수 없는 메시지 유형입니다 (delta | end)."})
+    except WebSocketDisconnect:
+        logger.info(f"Incremental PII detection session disconnected: {session.stats()}")
+        return
+    except Exception as e:
+        logger.error(f"Incremental PII detection failed: {str(e)}", exc_info=True)
+        await websocket.close(code=1011)
+        return
+    logger.info(f"Incremental PII detection session finished: {session.stats()}")
+
 @router.get("/health",
             summary="PII 탐지 서비스 상태 확인 (인증 필요)",
             description="PII 탐지 모델이 정상적으로 로드되었는지 확인합니다. JWT 토큰 필요.")
@@ -119,8 +502,24 @@ async def health_check(
     """PII 탐지 서비스 헬스체크"""
     try:
         # 모델 인스턴스 상태 확인 (실제 추론 없이 빠른 체크)
-        detector = get_pii_detector()
-        model_loaded = detector.model is not None and detector.tokenizer is not None
+        detector = get_loaded_pii_detector()
+        if detector is None:
+            # 백그라운드 로딩 중 (로딩을 기다리지 않고 상태만 반환)
+            readiness = get_model_readiness()
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={
+                    "status": readiness.state,
+                    "message": "PII detection model is not loaded yet",
+                    "model_loaded": False,
+                    "readiness": readiness.stats(),
+                }
+            )
+        sidecar = detector.sidecar_stats() if hasattr(detector, "sidecar_stats") else None
+        # 사이드카 모드에서는 사이드카 연결 또는 프로세스 내 대체 모델이 있으면 추론 가능
+        model_loaded = detector.tokenizer is not None and (
+            detector.backend is not None or (sidecar is not None and sidecar["connected"])
+        )
         
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -129,6 +528,13 @@ async def health_check(
                 "message": "PII detection service is running",
                 "model_loaded": model_loaded,
                 "model_name": detector.model_name,
+                "backend": detector.backend.name if detector.backend is not None else None,
+                "precision": detector.backend.precision if detector.backend is not None else None,
+                "inference_executor": detector.executor.stats() if detector.executor is not None else None,
+                "inference_sidecar": sidecar,
+                "readiness": get_model_readiness().stats(),
+                # 로그 저장소 상태 (ES 장애는 탐지를 막지 않고 로그를 스풀로 돌림)
+                "elasticsearch": get_log_repository().health(),
                 "authenticated_user": current_user.username
             }
         )
@@ -142,4 +548,28 @@ async def health_check(
                 "model_loaded": False,
                 "error": str(e)
             }
-        )
\ No newline at end of file
+        )
+
+@router.get("/stats",
+            summary="PII 탐지 단계별 통계 (인증 필요)",
+            description="승인 제어 대기열 깊이/대기 시간, 탐지 경로별(degraded 포함) 건수, 결과 캐시 적중률, 캐스케이드 게이트 통과/건너뜀 카운터와 배처/추론 실행기/추론 사이드카/로그 writer/ES 서킷 브레이커 통계를 반환합니다. JWT 토큰 필요.")
+async def detection_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """탐지 파이프라인 단계별 통계"""
+    detector = get_loaded_pii_detector()
+    return {
+        "readiness": get_model_readiness().stats(),
+        "admission": get_admission_controller().stats(),
+        "cascade": get_cascade_gate().stats(),
+        "deadline": get_deadline_planner().stats(),
+        "result_cache": get_result_cache().stats(),
+        "segment_cache": get_segment_cache().stats(),
+        "batcher": detector.batcher.stats() if detector is not None and detector.batcher is not None else None,
+        "inference_executor": (
+            detector.executor.stats() if detector is not None and detector.executor is not None else None
+        ),
+        "inference_sidecar": detector.sidecar_stats() if hasattr(detector, "sidecar_stats") else None,
+        "log_writer": get_log_writer().stats() if settings.LOG_WRITER_ENABLED else None,
+        "elasticsearch": get_log_repository().health(),
+    }
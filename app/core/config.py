@@ -23,13 +23,133 @@ class Settings(BaseSettings):
     # AI Model
     PII_MODEL_NAME: str = "psh3333/roberta-large-korean-pii5"
     DEFAULT_PII_THRESHOLD: float = 0.59
-    MODEL_MODE: str = "LOCAL"
+    PII_DEBUG_RAW_PREDICTIONS: bool = False  # 모든 /detect 응답에 원시 토큰 예측 포함
+    REGEX_DETECTION_ENABLED: bool = True  # 정규식(체크섬 검증) 탐지 단계 사용
+    CASCADE_MODE: str = "strict"  # gate(의심 점수 미만이면 모델 생략) | strict(항상 모델 실행)
+    CASCADE_THRESHOLD: float = 1.0
+    MODEL_MODE: str = "LOCAL"  # LOCAL(PyTorch) | ONNX(onnxruntime CPU)
+    ONNX_CACHE_DIR: str = ".cache/onnx"
+    MODEL_PRECISION: str = "fp32"  # fp32 | int8(동적 양자화) | bf16(autocast, 지원 CPU만)
+    MODEL_MMAP_WEIGHTS: bool = True  # LOCAL 모드에서 safetensors 가중치를 복사 없이 mmap으로 사용
+    
+    # Cold start (백그라운드 모델 로딩 + 워밍업, 준비 상태는 GET /ready)
+    PII_BACKGROUND_MODEL_LOADING: bool = True  # False면 startup에서 모델 로딩이 끝날 때까지 대기
+    PII_WARMUP_TEXT_LENGTHS: list[int] = [32, 256, 1024, 4096]  # 워밍업 추론 입력 길이 (글자)
+    
+    # Inference batching (동시 요청 마이크로 배칭)
+    PII_BATCHING_ENABLED: bool = True
+    PII_BATCH_MAX_SIZE: int = 16
+    PII_BATCH_MAX_WAIT_MS: float = 5.0
+    PII_DETECT_BATCH_MAX_ITEMS: int = 256  # POST /detect/batch 요청당 최대 항목 수
+    
+    # NDJSON streaming detection (POST /detect/stream)
+    PII_STREAM_CHUNK_SIZE: int = 64  # 한 번에 일괄 탐지할 레코드 수
+    PII_STREAM_MAX_IN_FLIGHT_CHUNKS: int = 4  # 동시에 처리 중일 수 있는 청크 수 (메모리 상한)
+    PII_STREAM_MAX_LINE_BYTES: int = 131072
+    PII_STREAM_LOG_TO_ES: bool = True
+    
+    # Incremental stream session (WebSocket /stream/ws, LLM 응답 스트림)
+    PII_STREAM_SESSION_CONTEXT_CHARS: int = 256  # 확정 지점 앞으로 남겨 두는 왼쪽 문맥
+    PII_STREAM_SESSION_HOLDBACK_CHARS: int = 32  # 끝에서 이만큼은 확정 보류
+    PII_STREAM_SESSION_MIN_STEP_CHARS: int = 24  # 새 글자가 이만큼 쌓이면 다시 탐지
+    PII_STREAM_SESSION_MAX_PENDING_CHARS: int = 2048  # 미확정 꼬리 상한 (넘으면 강제 확정)
+    
+    # Long text (슬라이딩 윈도우 추론)
+    PII_MAX_SEQ_LENGTH: int = 512
+    PII_WINDOWED_INFERENCE: bool = True
+    PII_WINDOW_OVERLAP: int = 128
+    PII_MAX_WINDOWS_PER_PASS: int = 32
+    
+    # Inference executor (이벤트 루프 밖 추론 스레드 풀, 0이면 torch 기본값)
+    INFERENCE_WORKERS: int = 1
+    TORCH_NUM_THREADS: int = 0
+    TORCH_INTEROP_THREADS: int = 0
+    
+    # Inference sidecar (모델을 가진 단일 추론 프로세스를 여러 API 워커가 Unix 소켓으로 공유)
+    PII_INFERENCE_SIDECAR_ENABLED: bool = False  # True면 API 워커는 모델 없이 사이드카 클라이언트로 동작
+    PII_INFERENCE_SOCKET_PATH: str = "/tmp/dlp-inference.sock"
+    PII_INFERENCE_SIDECAR_TIMEOUT_MS: float = 5000.0
+    PII_INFERENCE_SIDECAR_FALLBACK: bool = False  # True면 사이드카를 쓸 수 없는 동안 프로세스 내 모델로 추론 (opt-in)
+    PII_INFERENCE_SIDECAR_RETRY_SECONDS: float = 5.0  # 연결 실패 후 재연결 시도까지의 간격
+    PII_INFERENCE_MAX_FRAME_BYTES: int = 16 * 1024 * 1024
+    
+    # Preload-then-fork launcher (python -m app.launcher, 모델을 한 번 로드한 뒤 워커 fork)
+    LAUNCHER_WORKERS: int = 2
+    LAUNCHER_MEMORY_REPORT_SECONDS: float = 60.0  # 워커별 USS 보고 주기 (0이면 시작 직후 한 번만)
+    
+    # Admission control (동시 실행 슬롯, 우선순위 레인 대기열, IP별 속도 제한)
+    PII_ADMISSION_ENABLED: bool = True
+    PII_ADMISSION_MAX_CONCURRENCY: int = 32  # 동시에 탐지 중일 수 있는 요청 수
+    PII_ADMISSION_BULK_MAX_CONCURRENCY: int = 8  # 그중 bulk 레인(배치/스트리밍)이 쓸 수 있는 최대 슬롯
+    PII_ADMISSION_INTERACTIVE_QUEUE_DEPTH: int = 128
+    PII_ADMISSION_INTERACTIVE_MAX_WAIT_MS: float = 1000.0
+    PII_ADMISSION_BULK_QUEUE_DEPTH: int = 16
+    PII_ADMISSION_BULK_MAX_WAIT_MS: float = 10000.0
+    PII_RATE_LIMIT_PER_SECOND: float = 50.0  # 클라이언트 IP별 초당 요청 수 (0이면 비활성)
+    PII_RATE_LIMIT_BURST: int = 100
+    
+    # Deadline-aware detection (예산 부족 시 정규식 전용 경로로 낮춤)
+    PII_DEADLINE_SAFETY_MARGIN_MS: float = 10.0
+    
+    # Detection result cache (정규화 텍스트 + 모델 버전/설정 해시 키, LRU + TTL)
+    PII_RESULT_CACHE_ENABLED: bool = True
+    PII_RESULT_CACHE_MAX_ENTRIES: int = 10000
+    PII_RESULT_CACHE_MAX_MB: float = 64.0
+    PII_RESULT_CACHE_TTL_SECONDS: float = 300.0
+    # 긴 대화 기록은 턴/문장 경계 세그먼트 단위로 캐시 (TTL은 위 값 공유)
+    PII_SEGMENT_CACHE_ENABLED: bool = True
+    PII_SEGMENT_MIN_TEXT_CHARS: int = 2000
+    PII_SEGMENT_TARGET_CHARS: int = 256
+    PII_SEGMENT_CACHE_MAX_ENTRIES: int = 50000
+    PII_SEGMENT_CACHE_MAX_MB: float = 64.0
     
     # Elasticsearch
     ELASTICSEARCH_URL: str = os.getenv("ELASTICSEARCH_URL", "http://localhost:9200")
     ELASTICSEARCH_USERNAME: str | None = os.getenv("ELASTICSEARCH_USERNAME")
     ELASTICSEARCH_PASSWORD: str | None = os.getenv("ELASTICSEARCH_PASSWORD")
     ELASTICSEARCH_INDEX_PREFIX: str = os.getenv("ELASTICSEARCH_INDEX_PREFIX", "dlp")
+    # 로그 인덱스 파티션 단위: daily(<prefix>-logs-YYYY.MM.DD) | monthly(<prefix>-logs-YYYY.MM)
+    ELASTICSEARCH_INDEX_PARTITION: str = "daily"
+    ELASTICSEARCH_REQUEST_TIMEOUT: float = 30.0
+    ELASTICSEARCH_CONNECTIONS_PER_NODE: int = 10  # 워커당 공유 커넥션 풀 크기 (노드별)
+    ELASTICSEARCH_MAX_RETRIES: int = 3
+    # 서킷 브레이커: 최근 호출의 오류율/지연이 높으면 open해 ES 호출 없이 즉시 실패
+    # (대시보드 조회는 빈 결과, 탐지 로그는 스풀로), open 시간이 지나면 half-open 시험 호출
+    ELASTICSEARCH_BREAKER_ENABLED: bool = True
+    ELASTICSEARCH_BREAKER_WINDOW_SECONDS: float = 30.0
+    ELASTICSEARCH_BREAKER_MIN_CALLS: int = 10
+    ELASTICSEARCH_BREAKER_ERROR_RATE: float = 0.5
+    ELASTICSEARCH_BREAKER_SLOW_CALL_MS: float = 2000.0
+    ELASTICSEARCH_BREAKER_SLOW_CALL_RATE: float = 0.8
+    ELASTICSEARCH_BREAKER_CONSECUTIVE_FAILURES: int = 5
+    ELASTICSEARCH_BREAKER_OPEN_SECONDS: float = 10.0
+    
+    # Log retention (시스템 설정 data_retention_days보다 오래된 파티션 인덱스 삭제)
+    LOG_RETENTION_ENABLED: bool = True
+    LOG_RETENTION_INTERVAL_HOURS: float = 6.0
+    LOG_RETENTION_LOCK_FILE: str = "data/log-retention.lock"  # 이 파일을 flock으로 점유한 워커 하나만 삭제 실행
+    
+    # Detection log writer (요청 경로 밖에서 큐 → bulk 저장, False면 요청마다 직접 저장)
+    LOG_WRITER_ENABLED: bool = True
+    LOG_WRITER_BATCH_SIZE: int = 500
+    LOG_WRITER_BATCH_MB: float = 5.0
+    LOG_WRITER_FLUSH_INTERVAL_MS: float = 1000.0
+    LOG_WRITER_MAX_QUEUE_ITEMS: int = 50000
+    LOG_WRITER_MAX_QUEUE_MB: float = 64.0  # 추정 바이트 기준 메모리 상한 (넘으면 새 로그를 버림)
+    LOG_WRITER_MAX_RETRIES: int = 5
+    LOG_WRITER_RETRY_BACKOFF_MS: float = 200.0  # 연속 실패마다 2배, 최대 LOG_WRITER_MAX_BACKOFF_MS
+    LOG_WRITER_MAX_BACKOFF_MS: float = 10000.0
+    LOG_WRITER_SHUTDOWN_TIMEOUT_SECONDS: float = 10.0
+    
+    # Detection log spool (ES 장애 시 로컬 디스크 WAL에 보관, 복구되면 bulk로 재전송)
+    LOG_SPOOL_ENABLED: bool = True
+    LOG_SPOOL_DIR: str = "data/log-spool"  # 워커별 worker-<n> 하위 디렉터리 사용
+    LOG_SPOOL_SEGMENT_MB: float = 64.0
+    LOG_SPOOL_MAX_MB: float = 2048.0  # 넘으면 새 로그를 받지 않음 (dropped)
+    LOG_SPOOL_FSYNC: str = "interval"  # always | interval | never
+    LOG_SPOOL_FSYNC_INTERVAL_MS: float = 1000.0
+    LOG_SPOOL_REPLAY_BATCH_SIZE: int = 500
+    LOG_SPOOL_REPLAY_INTERVAL_SECONDS: float = 5.0
     
     class Config:
         env_file = ".env"
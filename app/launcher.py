@@ -0,0 +1,186 @@
+# app/launcher.py
+"""
+Preload-then-fork 런처
+
+`uvicorn --workers N`은 워커를 spawn으로 띄우고 워커마다 startup 이벤트에서
+`preload_models()`를 실행하므로 모델이 N번 로드된다. 이 런처는 마스터에서
+앱과 모델을 한 번만 로드한 뒤(가중치는 safetensors mmap, 추론 전용으로 고정)
+`os.fork()`로 워커를 만든다. 워커는 가중치 페이지를 copy-on-write로 공유하며,
+startup 이벤트의 `preload_models()`는 이미 로드된 싱글톤을 그대로 사용한다.
+
+마스터는 죽은 워커를 다시 fork하고, 주기적으로 워커별 메모리(RSS/PSS/USS)를
+로그로 남긴다. USS(프로세스 전용 페이지)가 워커 하나를 더 띄울 때 실제로
+늘어나는 메모리다.
+
+    uv run python -m app.launcher --workers 4 --port 8000
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.launcher")
+
+
+def read_memory(pid: int) -> Optional[Dict[str, int]]:
+    """/proc/<pid>/smaps_rollup 기준 메모리 사용량 (kB)"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", encoding="utf-8") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])
+    except OSError:
+        return None
+    return {
+        "rss_kb": fields.get("Rss", 0),
+        "pss_kb": fields.get("Pss", 0),
+        "uss_kb": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        "shared_kb": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+    }
+
+
+def _mb(kb: int) -> str:
+    return f"{kb / 1024:.0f}MB"
+
+
+class PreforkLauncher:
+    """모델을 미리 로드한 마스터에서 uvicorn 워커를 fork하고 감독"""
+
+    def __init__(self, host: str, port: int, workers: int, report_seconds: float, log_level: str = "info"):
+        self.host = host
+        self.port = port
+        self.num_workers = max(1, workers)
+        self.report_seconds = report_seconds
+        self.log_level = log_level
+        self.workers: Dict[int, int] = {}  # pid -> 워커 번호
+        self._socket = None
+        self._stopping = False
+
+    def preload(self) -> None:
+        """앱 모듈과 모델을 마스터에서 로드 (fork 전에는 추론/스레드 풀을 시작하지 않음)"""
+        from app.ai.model_manager import preload_models
+        import app.main  # noqa: F401  라우터/스키마 모듈도 fork 전에 import 해 공유
+
+        preload_models()
+        # 이후 GC가 기존 객체 헤더를 건드려 공유 페이지가 복사되지 않도록 고정
+        gc.collect()
+        gc.freeze()
+        memory = read_memory(os.getpid())
+        if memory:
+            logger.info(f"Preloaded master pid={os.getpid()} rss={_mb(memory['rss_kb'])}")
+
+    def run(self) -> None:
+        self.preload()
+        self._socket = uvicorn.Config("app.main:app", host=self.host, port=self.port).bind_socket()
+        for slot in range(self.num_workers):
+            self._spawn(slot)
+
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        # 첫 보고는 워커 시작(앱 startup) 후
+        next_report = time.monotonic() + min(self.report_seconds or 10.0, 10.0)
+        while self.workers:
+            if self._stopping:
+                self._stop_workers()
+                break
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                slot = self.workers.pop(pid)
+                logger.warning(f"Worker {slot} (pid={pid}) exited with status {status}; restarting")
+                time.sleep(1.0)  # 시작 직후 죽는 경우 재시작 폭주 방지
+                self._spawn(slot)
+                continue
+            if next_report is not None and time.monotonic() >= next_report:
+                self.report()
+                next_report = time.monotonic() + self.report_seconds if self.report_seconds > 0 else None
+            time.sleep(0.5)
+        self._socket.close()
+
+    def _spawn(self, slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker(slot)
+        self.workers[pid] = slot
+        logger.info(f"Forked worker {slot} (pid={pid})")
+
+    def _run_worker(self, slot: int) -> None:
+        """fork된 자식에서 uvicorn 서버 실행 (반환하지 않음)"""
+        exit_code = 0
+        try:
+            # 마스터의 시그널 핸들러 대신 uvicorn이 자체 핸들러를 설치
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            self._configure_worker_threads()
+            from app.main import app
+
+            config = uvicorn.Config(app, host=self.host, port=self.port, log_level=self.log_level)
+            uvicorn.Server(config).run(sockets=[self._socket])
+        except BaseException:
+            logger.exception(f"Worker {slot} crashed")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _configure_worker_threads(self) -> None:
+        """워커들이 코어를 나눠 쓰도록 torch intra-op 스레드 수 조정 (TORCH_NUM_THREADS=0일 때)"""
+        if settings.PII_INFERENCE_SIDECAR_ENABLED:
+            return
+        import torch
+
+        threads = settings.TORCH_NUM_THREADS or max(1, (os.cpu_count() or 1) // self.num_workers)
+        torch.set_num_threads(threads)
+
+    def _request_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _stop_workers(self) -> None:
+        logger.info("Stopping workers...")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self.workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self.workers.pop(pid, None)
+
+    def report(self) -> Dict[int, Dict[str, int]]:
+        """워커별 메모리 사용량 로그 (USS = 워커 전용 메모리)"""
+        usage = {pid: read_memory(pid) for pid in self.workers}
+        usage = {pid: memory for pid, memory in usage.items() if memory}
+        for pid, memory in sorted(usage.items(), key=lambda item: self.workers[item[0]]):
+            logger.info(
+                f"worker {self.workers[pid]} pid={pid} rss={_mb(memory['rss_kb'])} pss={_mb(memory['pss_kb'])} "
+                f"uss={_mb(memory['uss_kb'])} shared={_mb(memory['shared_kb'])}"
+            )
+        if usage:
+            total_uss = sum(memory["uss_kb"] for memory in usage.values())
+            total_rss = sum(memory["rss_kb"] for memory in usage.values())
+            logger.info(f"workers={len(usage)} total_uss={_mb(total_uss)} sum_rss={_mb(total_rss)}")
+        return usage
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="모델을 한 번 로드한 뒤 uvicorn 워커를 fork하는 런처")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.LAUNCHER_WORKERS)
+    parser.add_argument("--report-seconds", type=float, default=settings.LAUNCHER_MEMORY_REPORT_SECONDS,
+                        help="워커별 메모리 보고 주기 (0이면 시작 직후 한 번만)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    PreforkLauncher(args.host, args.port, args.workers, args.report_seconds, args.log_level).run()
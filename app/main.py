@@ -1,6 +1,7 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api.routers.pii import router as pii_router
 from app.api.routers.auth import router as auth_router
 from app.api.routers.logs import router as logs_router
@@ -10,7 +11,11 @@ from app.api.routers import dashboard as dashboard_router
 from app.api.routers import detection_settings as detection_settings_router
 from app.api.routers import projects as projects_router
 from app.api.routers import system_settings as system_settings_router
-from app.ai.model_manager import preload_models, cleanup_models
+from app.ai.model_manager import cleanup_models, get_model_readiness, preload_models, start_model_loading
+from app.core.config import settings
+from app.repositories.log_repository import close_log_repository, get_log_repository, start_log_repository
+from app.repositories.log_writer import close_log_writer, start_log_writer
+from app.services.log_retention_service import start_log_retention_job, stop_log_retention_job
 import logging
 
 # 로깅 설정
@@ -50,7 +55,15 @@ app.include_router(system_settings_router.router)  # 시스템 설정 API
 async def startup_event():
     """애플리케이션 시작 시 실행"""
     logger.info("Starting AI-TLS-DLP Backend...")
-    preload_models()  # 모델 사전 로딩
+    await start_log_repository()  # ES 연결 확인 + 인덱스 템플릿/별칭 준비
+    start_log_retention_job()  # 보관 기간이 지난 로그 인덱스 주기 삭제
+    if settings.LOG_WRITER_ENABLED:
+        await start_log_writer()  # 탐지 로그 백그라운드 bulk writer (스풀 복구는 스레드에서)
+    if settings.PII_BACKGROUND_MODEL_LOADING:
+        # 모델 로딩/워밍업은 백그라운드에서 진행 (준비 상태는 GET /ready)
+        start_model_loading()
+    else:
+        preload_models()  # 모델 사전 로딩
     logger.info("AI-TLS-DLP Backend startup completed")
 
 @app.on_event("shutdown")
@@ -58,8 +71,25 @@ async def shutdown_event():
     """애플리케이션 종료 시 실행"""
     logger.info("Shutting down AI-TLS-DLP Backend...")
     cleanup_models()  # 모델 메모리 정리
+    stop_log_retention_job()
+    await close_log_writer()  # 큐에 남은 탐지 로그 flush
+    await close_log_repository()  # ES 커넥션 풀 정리
     logger.info("AI-TLS-DLP Backend shutdown completed")
 
+@app.get("/ready", summary="모델 준비 상태 확인 (readiness probe)")
+async def ready():
+    """
+    PII 탐지 모델 준비 상태 - ready일 때만 200, loading/warming/failed는 503
+
+    ES 상태(서킷 브레이커)도 함께 반환하지만 준비 여부에는 반영하지 않는다.
+    ES 장애 중에도 탐지는 계속하고 로그는 디스크 스풀에 보관한다.
+    """
+    readiness = get_model_readiness()
+    return JSONResponse(
+        status_code=200 if readiness.ready else 503,
+        content={**readiness.stats(), "elasticsearch": get_log_repository().health()},
+    )
+
 @app.get("/", summary="API 상태 확인")
 async def root():
     """루트 엔드포인트 - API 상태 확인"""
@@ -79,7 +109,8 @@ async def root():
             "login": "/api/v1/auth/login",
             "me": "/api/v1/auth/me",
             "detect": "/api/v1/pii/detect",
-            "health": "/api/v1/pii/health"
+            "health": "/api/v1/pii/health",
+            "ready": "/ready"
         },
         "note": "PII API requires JWT authentication (Bearer token)"
     }
\ No newline at end of file
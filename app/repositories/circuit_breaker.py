@@ -0,0 +1,185 @@
+# app/repositories/circuit_breaker.py
+"""
+외부 저장소 호출용 서킷 브레이커
+
+ES가 느리거나 죽으면 호출마다 request_timeout까지 기다리게 되어, 탐지 요청과
+대시보드가 모두 같은 지연을 떠안는다. 브레이커는 최근 호출의 오류율/지연을 보고
+회로를 열어(open) 호출 없이 즉시 `CircuitOpenError`로 실패시키고, open_seconds가
+지나면 half-open 상태에서 소수의 시험 호출만 보내 복구 여부를 확인한다.
+
+- closed: 모든 호출 허용. window_seconds 동안의 호출이 min_calls 이상이고
+  오류율 ≥ error_rate 또는 느린 호출 비율 ≥ slow_call_rate이면 open.
+  연속 실패가 consecutive_failures에 도달해도 open.
+- open: 호출을 보내지 않고 즉시 실패 (retry_after 초 포함)
+- half_open: half_open_max_calls개까지만 시험 호출, 성공하면 closed, 실패하면 다시 open
+
+단일 이벤트 루프에서 사용한다.
+"""
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """회로가 열려 호출하지 않고 실패"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open (retry after {retry_after:.1f}s)")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """오류율/지연 기반 서킷 브레이커"""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = 30.0,
+        min_calls: int = 10,
+        error_rate: float = 0.5,
+        slow_call_ms: float = 2000.0,
+        slow_call_rate: float = 0.8,
+        consecutive_failures: int = 5,
+        open_seconds: float = 10.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = max(1, min_calls)
+        self.error_rate = error_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_call_rate = slow_call_rate
+        self.consecutive_failures_threshold = max(1, consecutive_failures)
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self.state = CLOSED
+        self._state_since = time.monotonic()
+        self._opened_at = 0.0
+        self._window: Deque[Tuple[float, bool, bool]] = deque()  # (시각, 실패, 느림)
+        self._consecutive_failures = 0
+        self._half_open_in_flight = 0
+
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.trips = 0
+        self.last_error: Optional[str] = None
+        self.last_latency_ms: Optional[float] = None
+
+    @property
+    def retry_after(self) -> float:
+        """open 상태에서 다음 시험 호출까지 남은 초"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    def before_call(self) -> bool:
+        """
+        호출 전 허용 여부 확인 (허용하지 않으면 CircuitOpenError)
+
+        half-open 시험 호출이면 True를 반환하며, 호출자는 결과를 record_success/
+        record_failure로, 결과 없이 끝나면(취소) release로 알려야 한다.
+        """
+        if self.state == OPEN:
+            if self.retry_after > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self.retry_after)
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self.open_seconds)
+            self._half_open_in_flight += 1
+            return True
+        return False
+
+    def release(self, probe: bool) -> None:
+        """결과 없이 끝난 호출(취소)의 half-open 슬롯 반환"""
+        if probe:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def record_success(self, latency_ms: float, probe: bool = False) -> None:
+        self._record(False, latency_ms)
+        self._consecutive_failures = 0
+        if probe:
+            self.release(probe)
+            if self.state == HALF_OPEN:
+                self._transition(CLOSED)
+                return
+        self._check_trip()
+
+    def record_failure(self, latency_ms: float, error: BaseException, probe: bool = False) -> None:
+        self._record(True, latency_ms)
+        self.failures += 1
+        self._consecutive_failures += 1
+        self.last_error = repr(error)
+        if probe:
+            self.release(probe)
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+        self._check_trip()
+
+    def _record(self, failed: bool, latency_ms: float) -> None:
+        now = time.monotonic()
+        self.calls += 1
+        self.last_latency_ms = latency_ms
+        self._window.append((now, failed, latency_ms >= self.slow_call_ms))
+        self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    def _rates(self) -> Tuple[int, float, float]:
+        calls = len(self._window)
+        if not calls:
+            return 0, 0.0, 0.0
+        failed = sum(1 for _, is_failure, _ in self._window if is_failure)
+        slow = sum(1 for _, _, is_slow in self._window if is_slow)
+        return calls, failed / calls, slow / calls
+
+    def _check_trip(self) -> None:
+        if self.state != CLOSED:
+            return
+        calls, error_rate, slow_rate = self._rates()
+        if self._consecutive_failures >= self.consecutive_failures_threshold or (
+            calls >= self.min_calls and (error_rate >= self.error_rate or slow_rate >= self.slow_call_rate)
+        ):
+            self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        self._state_since = time.monotonic()
+        if state == OPEN:
+            self._opened_at = self._state_since
+            self.trips += 1
+        elif state == CLOSED:
+            self._window.clear()
+            self._consecutive_failures = 0
+            self._half_open_in_flight = 0
+
+    def stats(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        calls, error_rate, slow_rate = self._rates()
+        return {
+            "state": self.state,
+            "state_seconds": round(time.monotonic() - self._state_since, 1),
+            "retry_after_seconds": round(self.retry_after, 1),
+            "window_calls": calls,
+            "window_error_rate": round(error_rate, 3),
+            "window_slow_rate": round(slow_rate, 3),
+            "consecutive_failures": self._consecutive_failures,
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "trips": self.trips,
+            "last_latency_ms": self.last_latency_ms,
+            "last_error": self.last_error,
+        }
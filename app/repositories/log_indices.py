@@ -0,0 +1,87 @@
+# app/repositories/log_indices.py
+"""
+탐지 로그 시간 파티션 인덱스 이름 규칙
+
+로그는 기간별 인덱스(`<prefix>-logs-YYYY.MM.DD` 또는 `<prefix>-logs-YYYY.MM`)에 저장하고
+다음 별칭으로 접근한다.
+
+- 쓰기 별칭 `<prefix>-logs-write`: 현재 파티션 하나를 가리킴 (is_write_index)
+- 읽기 별칭 `<prefix>-logs-read`: 모든 파티션 (인덱스 템플릿이 새 파티션에 자동으로 붙임)
+
+기간이 주어진 조회는 겹치는 파티션만 대상으로 하고, 보관 기간이 지난 파티션은
+인덱스 단위로 삭제한다. 시각은 로그 timestamp와 같은 서버 로컬 시간 기준이다.
+"""
+import re
+from datetime import datetime
+from typing import List, Optional
+
+PARTITIONS = ("daily", "monthly")
+# 기간 조회에서 인덱스 이름을 나열할 최대 개수 (넘으면 읽기 별칭 전체를 조회)
+_MAX_EXPLICIT_INDICES = 100
+
+
+def _local_naive(value: datetime) -> datetime:
+    """timezone이 있는 값은 서버 로컬 시간으로 바꿔 timestamp와 비교 가능하게 함"""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+class LogIndexLayout:
+    """파티션 인덱스/별칭/템플릿 이름과 기간 계산"""
+
+    def __init__(self, base: str, partition: str = "daily"):
+        if partition not in PARTITIONS:
+            raise ValueError(f"partition must be one of {PARTITIONS}: {partition}")
+        self.base = base
+        self.partition = partition
+        self.write_alias = f"{base}-write"
+        self.read_alias = f"{base}-read"
+        self.pattern = f"{base}-*"
+        self.template_name = base
+        # 파티션 도입 전 단일 인덱스 (있으면 읽기 별칭에 포함)
+        self.legacy_index = base
+        suffix = r"\d{4}\.\d{2}\.\d{2}" if partition == "daily" else r"\d{4}\.\d{2}"
+        self._name_re = re.compile(rf"^{re.escape(base)}-({suffix})$")
+
+    def partition_start(self, value: datetime) -> datetime:
+        value = _local_naive(value)
+        if self.partition == "daily":
+            return value.replace(hour=0, minute=0, second=0, microsecond=0)
+        return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    def next_partition_start(self, start: datetime) -> datetime:
+        if self.partition == "daily":
+            return datetime.fromordinal(start.toordinal() + 1)
+        return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+    def index_for(self, value: datetime) -> str:
+        start = self.partition_start(value)
+        return f"{self.base}-{start.strftime('%Y.%m.%d' if self.partition == 'daily' else '%Y.%m')}"
+
+    def parse(self, index_name: str) -> Optional[datetime]:
+        """파티션 인덱스 이름이면 파티션 시작 시각, 아니면 None"""
+        match = self._name_re.match(index_name)
+        if match is None:
+            return None
+        fmt = "%Y.%m.%d" if self.partition == "daily" else "%Y.%m"
+        return datetime.strptime(match.group(1), fmt)
+
+    def indices_for_range(self, start: Optional[datetime], end: Optional[datetime]) -> Optional[List[str]]:
+        """[start, end]와 겹치는 파티션 인덱스 목록 (시작 시각이 없거나 너무 많으면 None = 읽기 별칭)"""
+        if start is None:
+            return None
+        end = _local_naive(end) if end is not None else datetime.now()
+        current = self.partition_start(start)
+        indices: List[str] = []
+        while current <= end:
+            indices.append(self.index_for(current))
+            if len(indices) > _MAX_EXPLICIT_INDICES:
+                return None
+            current = self.next_partition_start(current)
+        return indices or [self.index_for(start)]
+
+    def expired(self, index_name: str, cutoff: datetime) -> bool:
+        """파티션의 모든 로그가 cutoff 이전이면 True"""
+        start = self.parse(index_name)
+        return start is not None and self.next_partition_start(start) <= _local_naive(cutoff)
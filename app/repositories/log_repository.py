@@ -1,9 +1,13 @@
-from typing import List, Optional, Dict, Any
+from typing import Awaitable, Callable, List, Optional, Dict, Any
 from datetime import datetime, timedelta
+from time import perf_counter
+import asyncio
 import uuid
 import logging
-from elasticsearch import Elasticsearch, NotFoundError
+from elasticsearch import ApiError, AsyncElasticsearch, BadRequestError, NotFoundError
 from app.core.config import settings
+from app.repositories.circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
+from app.repositories.log_indices import LogIndexLayout
 from app.schemas.log import PIIDetectionLog, LogSearchRequest, LogSearchResponse, LogStatsResponse
 
 logger = logging.getLogger(__name__)
@@ -12,85 +16,277 @@ class LogRepository:
     """Elasticsearch 기반 로그 저장소"""
     
     def __init__(self):
-        self.es_client: Optional[Elasticsearch] = None
-        self.index_name = f"{settings.ELASTICSEARCH_INDEX_PREFIX}-logs"
+        self.es_client: Optional[AsyncElasticsearch] = None
+        # 기간별 파티션 인덱스 + 쓰기/읽기 별칭 (app/repositories/log_indices.py)
+        self.layout = LogIndexLayout(f"{settings.ELASTICSEARCH_INDEX_PREFIX}-logs", settings.ELASTICSEARCH_INDEX_PARTITION)
+        self._index_ready = False
+        self._write_index: Optional[str] = None  # 쓰기 별칭이 가리키는 현재 파티션
+        self._legacy_index = False  # 파티션 도입 전 단일 인덱스 존재 여부
+        # 시스템 설정 data_retention_days (보관 작업이 주기적으로 갱신, 모르면 None)
+        self.retention_days: Optional[int] = None
+        self.expired_dropped = 0
+        self._roll_lock = asyncio.Lock()
+        self.breaker = CircuitBreaker(
+            "elasticsearch",
+            window_seconds=settings.ELASTICSEARCH_BREAKER_WINDOW_SECONDS,
+            min_calls=settings.ELASTICSEARCH_BREAKER_MIN_CALLS,
+            error_rate=settings.ELASTICSEARCH_BREAKER_ERROR_RATE,
+            slow_call_ms=settings.ELASTICSEARCH_BREAKER_SLOW_CALL_MS,
+            slow_call_rate=settings.ELASTICSEARCH_BREAKER_SLOW_CALL_RATE,
+            consecutive_failures=settings.ELASTICSEARCH_BREAKER_CONSECUTIVE_FAILURES,
+            open_seconds=settings.ELASTICSEARCH_BREAKER_OPEN_SECONDS,
+        )
+        self._probe_task: Optional[asyncio.Task] = None
         self._init_elasticsearch()
     
     def _init_elasticsearch(self):
-        """Elasticsearch 클라이언트 초기화"""
+        """
+        Elasticsearch 비동기 클라이언트 생성 (네트워크 I/O 없음)
+
+        연결 확인과 인덱스 생성은 앱 startup에서 `start()`로 수행한다.
+        모든 요청이 하나의 커넥션 풀을 공유하므로 ES 왕복 중에도 이벤트 루프가 멈추지 않는다.
+        """
+        es_config = {
+            "hosts": [settings.ELASTICSEARCH_URL],
+            "verify_certs": False,
+            "request_timeout": settings.ELASTICSEARCH_REQUEST_TIMEOUT,
+            "connections_per_node": settings.ELASTICSEARCH_CONNECTIONS_PER_NODE,
+            "max_retries": settings.ELASTICSEARCH_MAX_RETRIES,
+        }
+        
+        # 인증 정보가 있으면 추가
+        if settings.ELASTICSEARCH_USERNAME and settings.ELASTICSEARCH_PASSWORD:
+            es_config["basic_auth"] = (settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD)
+        
+        self.es_client = AsyncElasticsearch(**es_config)
+    
+    async def start(self):
+        """연결 확인 + 인덱스 준비 (FastAPI startup event에서 호출)"""
+        if settings.ELASTICSEARCH_BREAKER_ENABLED and self._probe_task is None:
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
         try:
-            es_config = {
-                "hosts": [settings.ELASTICSEARCH_URL],
-                "verify_certs": False,
-                "request_timeout": 30,
-            }
-            print(f"DEBUG: Attempting to connect to Elasticsearch at: {settings.ELASTICSEARCH_URL}") # DEBUG PRINT
-            
-            # 인증 정보가 있으면 추가
-            if settings.ELASTICSEARCH_USERNAME and settings.ELASTICSEARCH_PASSWORD:
-                es_config["basic_auth"] = (settings.ELASTICSEARCH_USERNAME, settings.ELASTICSEARCH_PASSWORD)
-            
-            self.es_client = Elasticsearch(**es_config)
-            
-            # 연결 테스트
-            if self.es_client.ping():
-                logger.info(f"Elasticsearch connected: {settings.ELASTICSEARCH_URL}")
-                self._create_index_if_not_exists()
+            await self._call(self.es_client.info)
+            logger.info(f"Elasticsearch connected: {settings.ELASTICSEARCH_URL}")
+            await self._prepare_indices()
+        except Exception as e:
+            # ES가 늦게 뜨더라도 앱은 시작하고, 첫 저장 시 인덱스를 다시 준비한다
+            logger.error(f"Failed to initialize Elasticsearch: {str(e)}")
+    
+    async def _call(self, method: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+        """
+        서킷 브레이커를 거쳐 ES API 호출
+
+        회로가 열려 있으면 요청을 보내지 않고 CircuitOpenError(ConnectionError)를 올린다.
+        연결 오류/타임아웃/429/5xx만 실패로 집계하고, 404·400 등은 ES가 응답한 것이므로 성공으로 본다.
+        """
+        if not settings.ELASTICSEARCH_BREAKER_ENABLED:
+            return await method(**kwargs)
+        probe = self.breaker.before_call()
+        started_at = perf_counter()
+        try:
+            result = await method(**kwargs)
+        except ApiError as e:
+            latency_ms = (perf_counter() - started_at) * 1000.0
+            if e.status_code == 429 or e.status_code >= 500:
+                self.breaker.record_failure(latency_ms, e, probe)
             else:
-                self.es_client = None
-                raise ConnectionError("Failed to connect to Elasticsearch. Please check the connection and settings.")
-                
+                self.breaker.record_success(latency_ms, probe)
+            raise
         except Exception as e:
+            self.breaker.record_failure((perf_counter() - started_at) * 1000.0, e, probe)
+            raise
+        except BaseException:
+            self.breaker.release(probe)  # 취소
+            raise
+        self.breaker.record_success((perf_counter() - started_at) * 1000.0, probe)
+        return result
+    
+    async def _probe_loop(self):
+        """회로가 열려 있으면 open 시간이 지날 때마다 가벼운 요청으로 복구 확인 (트래픽이 없어도 상태 갱신)"""
+        while True:
+            await asyncio.sleep(max(1.0, self.breaker.retry_after or settings.ELASTICSEARCH_BREAKER_OPEN_SECONDS))
+            if self.breaker.state != OPEN or self.breaker.retry_after > 0:
+                continue
+            try:
+                await self._call(self.es_client.info)
+                logger.info("Elasticsearch recovered; circuit closed")
+            except CircuitOpenError:
+                pass
+            except Exception as e:
+                logger.debug(f"Elasticsearch probe failed: {e!r}")
+    
+    def health(self) -> Dict[str, Any]:
+        """ES 호출 없이 서킷 브레이커 상태로 판단한 헬스 (readiness/헬스체크 공용)"""
+        breaker = self.breaker.stats()
+        if self.es_client is None:
+            status = "down"
+        elif not settings.ELASTICSEARCH_BREAKER_ENABLED:
+            status = "unknown"
+        else:
+            status = {"closed": "up", "half_open": "degraded"}.get(breaker["state"], "down")
+        return {
+            "status": status,
+            "write_alias": self.layout.write_alias,
+            "write_index": self._write_index,
+            "read_alias": self.layout.read_alias,
+            "index_ready": self._index_ready,
+            "retention_days": self.retention_days,
+            "expired_dropped": self.expired_dropped,
+            "circuit_breaker": breaker,
+        }
+    
+    async def close(self):
+        """커넥션 풀 정리 (FastAPI shutdown event에서 호출)"""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+        if self.es_client is not None:
+            await self.es_client.close()
             self.es_client = None
-            raise ConnectionError(f"Failed to initialize Elasticsearch: {str(e)}")
     
-    def _create_index_if_not_exists(self):
-        """인덱스가 없으면 생성"""
-        try:
-            if not self.es_client.indices.exists(index=self.index_name):
-                mapping = {
-                    "mappings": {
+    def _index_template(self) -> Dict[str, Any]:
+        """새 파티션 인덱스에 적용할 매핑/설정 + 읽기 별칭"""
+        return {
+            "mappings": {
+                "properties": {
+                    "timestamp": {"type": "date"},
+                    "client_ip": {"type": "ip"},
+                    "input_text": {
+                        "type": "text",
+                        "analyzer": "korean"
+                    },
+                    "has_pii": {"type": "boolean"},
+                    "entity_types": {"type": "keyword"},
+                    "processing_time_ms": {"type": "float"},
+                    "level": {"type": "keyword"},
+                    "request_id": {"type": "keyword"},
+                    "user_agent": {"type": "text"},
+                    "detected_entities": {
+                        "type": "nested",
                         "properties": {
-                            "timestamp": {"type": "date"},
-                            "client_ip": {"type": "ip"},
-                            "input_text": {
-                                "type": "text",
-                                "analyzer": "korean"
-                            },
-                            "has_pii": {"type": "boolean"},
-                            "entity_types": {"type": "keyword"},
-                            "processing_time_ms": {"type": "float"},
-                            "level": {"type": "keyword"},
-                            "request_id": {"type": "keyword"},
-                            "user_agent": {"type": "text"},
-                            "detected_entities": {
-                                "type": "nested",
-                                "properties": {
-                                    "type": {"type": "keyword"},
-                                    "value": {"type": "text"},
-                                    "confidence": {"type": "float"}
-                                }
-                            }
+                            "type": {"type": "keyword"},
+                            "value": {"type": "text"},
+                            "confidence": {"type": "float"}
                         }
-                    },
-                    "settings": {
-                        "number_of_shards": 1,
-                        "number_of_replicas": 0,
-                        "analysis": {
-                            "analyzer": {
-                                "korean": {
-                                    "type": "standard"
-                                }
-                            }
+                    }
+                }
+            },
+            "settings": {
+                "number_of_shards": 1,
+                "number_of_replicas": 0,
+                "analysis": {
+                    "analyzer": {
+                        "korean": {
+                            "type": "standard"
                         }
                     }
                 }
-                
-                self.es_client.indices.create(index=self.index_name, body=mapping)
-                logger.info(f"Created Elasticsearch index: {self.index_name}")
-                
+            },
+            "aliases": {self.layout.read_alias: {}},
+        }
+    
+    async def _prepare_indices(self):
+        """인덱스 템플릿 등록 + 쓰기 별칭을 현재 파티션으로 (기존 단일 인덱스는 읽기 별칭에 포함)"""
+        try:
+            await self._call(self.es_client.indices.put_index_template,
+                name=self.layout.template_name,
+                index_patterns=[self.layout.pattern],
+                template=self._index_template(),
+                priority=100,
+            )
+            self._legacy_index = bool(await self._call(self.es_client.indices.exists, index=self.layout.legacy_index))
+            if self._legacy_index:
+                await self._call(self.es_client.indices.update_aliases, actions=[
+                    {"add": {"index": self.layout.legacy_index, "alias": self.layout.read_alias}}
+                ])
+            await self._roll_write_alias(datetime.now())
+            self._index_ready = True
+            logger.info(
+                f"Elasticsearch log indices ready: template={self.layout.template_name}, "
+                f"write={self.layout.write_alias}->{self._write_index}, read={self.layout.read_alias}"
+            )
         except Exception as e:
-            logger.error(f"Failed to create index: {str(e)}")
+            logger.error(f"Failed to prepare log indices: {str(e)}")
+    
+    async def _roll_write_alias(self, now: datetime):
+        """쓰기 별칭을 now가 속한 파티션으로 이동 (파티션이 바뀔 때만 ES 호출)"""
+        index = self.layout.index_for(now)
+        if index == self._write_index:
+            return
+        async with self._roll_lock:
+            if index == self._write_index:
+                return
+            try:
+                await self._call(self.es_client.indices.create, index=index)
+                logger.info(f"Created log partition index: {index}")
+            except BadRequestError as e:
+                if e.error != "resource_already_exists_exception":
+                    raise
+            # 다른 워커가 동시에 옮겨도 결과가 같도록 한 번의 원자적 요청으로 교체
+            await self._call(self.es_client.indices.update_aliases, actions=[
+                {"remove": {"index": self.layout.pattern, "alias": self.layout.write_alias, "must_exist": False}},
+                {"add": {"index": index, "alias": self.layout.write_alias, "is_write_index": True}},
+            ])
+            self._write_index = index
+    
+    async def _ensure_writable(self):
+        """저장 전 템플릿/별칭 준비 (준비되지 않으면 동적 매핑 인덱스가 생기지 않도록 저장하지 않음)"""
+        if not self._index_ready:
+            await self._prepare_indices()
+            if not self._index_ready:
+                raise ConnectionError("Elasticsearch log indices are not ready")
+        else:
+            await self._roll_write_alias(datetime.now())
+    
+    def _is_expired(self, log: PIIDetectionLog) -> bool:
+        """
+        보관 기간이 이미 지난 파티션의 로그인지
+
+        스풀 재전송 등으로 늦게 도착한 오래된 로그를 쓰면 삭제된 파티션 인덱스가
+        다시 생기므로 저장하지 않는다.
+        """
+        if self.retention_days is None:
+            return False
+        cutoff = datetime.now() - timedelta(days=self.retention_days)
+        return self.layout.expired(self.layout.index_for(log.timestamp), cutoff)
+
+    def _write_target(self, log: PIIDetectionLog) -> str:
+        """현재 파티션 로그는 쓰기 별칭, 늦게 도착한 로그(스풀 재전송 등)는 timestamp의 파티션 인덱스"""
+        index = self.layout.index_for(log.timestamp)
+        return self.layout.write_alias if index == self._write_index else index
+    
+    def _read_target(self, start_time: Optional[datetime], end_time: Optional[datetime] = None) -> str:
+        """조회 기간과 겹치는 파티션만 대상으로 (기간이 없으면 읽기 별칭)"""
+        indices = self.layout.indices_for_range(start_time, end_time)
+        if indices is None:
+            return self.layout.read_alias
+        if self._legacy_index:
+            indices.append(self.layout.legacy_index)
+        return ",".join(indices)
+    
+    async def delete_expired_indices(self, retention_days: int) -> List[str]:
+        """보관 기간이 지난 파티션 인덱스를 통째로 삭제하고 삭제한 이름 반환"""
+        if not self.es_client:
+            raise ConnectionError("Elasticsearch client is not available.")
+        self.retention_days = retention_days
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        rows = await self._call(self.es_client.cat.indices, index=self.layout.pattern, format="json", h="index")
+        expired = sorted(
+            row["index"] for row in rows
+            if self.layout.expired(row["index"], cutoff) and row["index"] != self._write_index
+        )
+        if expired:
+            await self._call(self.es_client.indices.delete, index=",".join(expired), ignore_unavailable=True)
+            logger.info(f"Deleted {len(expired)} expired log indices (retention {retention_days}d): {expired}")
+        if self._legacy_index:
+            # 파티션 도입 전 단일 인덱스는 문서 단위로 정리 (백그라운드 작업)
+            await self._call(self.es_client.delete_by_query,
+                index=self.layout.legacy_index,
+                query={"range": {"timestamp": {"lt": cutoff.isoformat()}}},
+                conflicts="proceed",
+                wait_for_completion=False,
+            )
+        return expired
     
     async def save_log(self, log: PIIDetectionLog) -> bool:
         """로그를 Elasticsearch에 저장"""
@@ -98,14 +294,22 @@ class LogRepository:
             raise ConnectionError("Elasticsearch client is not available. Log was not saved.")
         
         try:
+            # startup 시점에 ES가 없었다면 동적 매핑으로 생성되지 않도록 먼저 템플릿/별칭 준비
+            await self._ensure_writable()
+            
+            if self._is_expired(log):
+                self.expired_dropped += 1
+                logger.warning(f"Skipping log older than the retention period: {log.timestamp.isoformat()}")
+                return False
+            
             # 고유 ID 생성
             if not log.id:
                 log.id = str(uuid.uuid4())
             
             # 문서 저장
             doc = log.model_dump()
-            response = self.es_client.index(
-                index=self.index_name,
+            response = await self._call(self.es_client.index,
+                index=self._write_target(log),
                 id=log.id,
                 body=doc
             )
@@ -117,6 +321,70 @@ class LogRepository:
             logger.error(f"Failed to save log to Elasticsearch: {str(e)}")
             return False
     
+    async def save_logs_bulk(self, logs: List[PIIDetectionLog]) -> int:
+        """여러 로그를 한 번의 bulk 요청으로 저장하고 저장된 건수를 반환"""
+        if not self.es_client:
+            raise ConnectionError("Elasticsearch client is not available. Logs were not saved.")
+        if not logs:
+            return 0
+        
+        try:
+            statuses = await self.bulk_index(logs)
+            saved = sum(1 for item_status in statuses if item_status is None)
+            if saved < len(logs):
+                logger.warning(f"Bulk log write partially failed: {saved}/{len(logs)} saved")
+            else:
+                logger.debug(f"Bulk saved {saved} logs to ES")
+            return saved
+            
+        except Exception as e:
+            logger.error(f"Failed to bulk save logs to Elasticsearch: {str(e)}")
+            return 0
+    
+    async def bulk_index(self, logs: List[PIIDetectionLog]) -> List[Optional[int]]:
+        """
+        한 번의 bulk 요청으로 색인하고 로그별 실패 HTTP 상태를 반환 (성공은 None)
+
+        요청 자체가 실패하면(연결 오류, 타임아웃) 예외를 그대로 올려
+        호출자(백그라운드 로그 writer)가 배치 전체를 재시도할 수 있게 한다.
+        """
+        if not self.es_client:
+            raise ConnectionError("Elasticsearch client is not available. Logs were not saved.")
+        if not logs:
+            return []
+        
+        # startup 시점에 ES가 없었다면 동적 매핑으로 생성되지 않도록 먼저 템플릿/별칭 준비
+        await self._ensure_writable()
+        
+        # 보관 기간이 지난 로그는 보내지 않고 410(재시도하지 않는 실패)으로 돌려줌
+        statuses: List[Optional[int]] = [None] * len(logs)
+        positions: List[int] = []
+        operations: List[Dict[str, Any]] = []
+        for position, log in enumerate(logs):
+            if self._is_expired(log):
+                statuses[position] = 410
+                continue
+            if not log.id:
+                log.id = str(uuid.uuid4())
+            positions.append(position)
+            operations.append({"index": {"_index": self._write_target(log), "_id": log.id}})
+            operations.append(log.model_dump())
+        if len(positions) < len(logs):
+            self.expired_dropped += len(logs) - len(positions)
+            logger.warning(f"Skipping {len(logs) - len(positions)} logs older than the retention period")
+        if not positions:
+            return statuses
+        
+        response = await self._call(self.es_client.bulk, operations=operations)
+        items = response.get("items", [])
+        if len(items) != len(positions):
+            raise RuntimeError(f"Unexpected bulk response: {len(items)} items for {len(positions)} logs")
+        for position, item in zip(positions, items):
+            result = item.get("index", {})
+            if result.get("result") not in ["created", "updated"]:
+                statuses[position] = int(result.get("status") or 500)
+        return statuses
+    
     async def get_log_by_id(self, log_id: str) -> Optional[PIIDetectionLog]:
         """ID로 단일 로그 조회"""
         if not self.es_client:
@@ -124,9 +392,19 @@ class LogRepository:
             return None
         
         try:
-            response = self.es_client.get(index=self.index_name, id=log_id)
-            source = response["_source"]
-            source["id"] = response["_id"]
+            # 어느 파티션에 있는지 모르므로 읽기 별칭에서 ID로 검색
+            response = await self._call(self.es_client.search,
+                index=self.layout.read_alias,
+                query={"ids": {"values": [log_id]}},
+                size=1,
+                ignore_unavailable=True,
+            )
+            hits = response.get("hits", {}).get("hits", [])
+            if not hits:
+                logger.warning(f"Log with id '{log_id}' not found.")
+                return None
+            source = hits[0]["_source"]
+            source["id"] = hits[0]["_id"]
             return PIIDetectionLog(**source)
         except NotFoundError:
             logger.warning(f"Log with id '{log_id}' not found.")
@@ -152,8 +430,10 @@ class LogRepository:
             from_index = (search_request.page - 1) * search_request.size
             
             # 검색 실행
-            response = self.es_client.search(
-                index=self.index_name,
+            response = await self._call(self.es_client.search,
+                index=self._read_target(search_request.start_time, search_request.end_time),
+                ignore_unavailable=True,
+                allow_no_indices=True,
                 body={
                     "query": query,
                     "from": from_index,
@@ -275,8 +555,10 @@ class LogRepository:
                 "size": 0
             }
             
-            response = self.es_client.search(
-                index=self.index_name,
+            response = await self._call(self.es_client.search,
+                index=self._read_target(search_request.start_time, search_request.end_time),
+                ignore_unavailable=True,
+                allow_no_indices=True,
                 body=agg_query
             )
             
@@ -363,8 +645,10 @@ class LogRepository:
                 "size": 0
             }
             
-            response = self.es_client.search(
-                index=self.index_name,
+            response = await self._call(self.es_client.search,
+                index=self._read_target(start_time, end_time),
+                ignore_unavailable=True,
+                allow_no_indices=True,
                 body=agg_query
             )
             
@@ -472,7 +756,12 @@ class LogRepository:
                 "size": 0,
             }
 
-            response = self.es_client.search(index=self.index_name, body=agg_query)
+            response = await self._call(self.es_client.search,
+                index=self._read_target(start_time, end_time),
+                ignore_unavailable=True,
+                allow_no_indices=True,
+                body=agg_query,
+            )
             return response.get("aggregations", {})
 
         except Exception as e:
@@ -503,8 +792,10 @@ class LogRepository:
 
             query = {"bool": {"must": must_conditions}}
 
-            response = self.es_client.search(
-                index=self.index_name,
+            response = await self._call(self.es_client.search,
+                index=self._read_target(since),
+                ignore_unavailable=True,
+                allow_no_indices=True,
                 body={
                     "query": query,
                     "sort": [{"timestamp": {"order": "desc"}}],
@@ -554,8 +845,10 @@ class LogRepository:
                 }
             }
             
-            response = self.es_client.count(
-                index=self.index_name,
+            response = await self._call(self.es_client.count, 
+                index=self._read_target(start_time),
+                ignore_unavailable=True,
+                allow_no_indices=True,
                 body={"query": query}
             )
             
@@ -576,4 +869,20 @@ def get_log_repository() -> LogRepository:
     return _log_repository_instance
 
 
+async def start_log_repository() -> None:
+    """앱 startup: ES 연결 확인 및 인덱스 준비 (실패해도 앱 시작은 막지 않음)"""
+    try:
+        await get_log_repository().start()
+    except Exception as e:
+        logger.error(f"Failed to start log repository: {str(e)}")
+
+
+async def close_log_repository() -> None:
+    """앱 shutdown: ES 커넥션 풀 정리"""
+    global _log_repository_instance
+    if _log_repository_instance is not None:
+        await _log_repository_instance.close()
+        _log_repository_instance = None
+
+
 
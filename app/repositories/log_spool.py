@@ -0,0 +1,363 @@
+# app/repositories/log_spool.py
+"""
+탐지 로그 디스크 스풀 (write-ahead log)
+
+ES에 저장하지 못한 탐지 로그는 감사 기록이므로 버리지 않고 로컬 디스크에
+추가 전용(append-only)으로 보관했다가, ES가 복구되면 bulk 색인으로 다시 보낸다.
+
+- 세그먼트 파일(`<seq>.seg`)에 레코드를 이어 쓴다.
+  레코드 = 헤더(8바이트, big-endian: payload_length u32 | crc32 u32) + JSON 페이로드
+- 세그먼트가 LOG_SPOOL_SEGMENT_MB를 넘으면 새 세그먼트로 교체(rotation)
+- fsync 정책: always(레코드 묶음마다) | interval(LOG_SPOOL_FSYNC_INTERVAL_MS마다) | never(OS에 맡김)
+- 재전송 위치는 `cursor` 파일(세그먼트 번호 + 오프셋)에 원자적으로 기록하고,
+  모두 재전송한 세그먼트는 삭제한다
+- 전체 크기가 LOG_SPOOL_MAX_MB를 넘으면 새 레코드를 받지 않는다 (rejected로 집계)
+- 시작 시 각 세그먼트를 검사해 쓰다 만 꼬리 레코드(길이/CRC 불일치)를 잘라내고,
+  항상 새 세그먼트에 이어 쓴다
+
+워커 프로세스마다 `worker-<n>` 하위 디렉터리 하나를 flock으로 점유한다.
+워커가 죽었다 다시 뜨면 비어 있는 디렉터리를 점유해 남은 로그를 이어서 재전송한다.
+
+파일 I/O는 블로킹이므로 이벤트 루프에서는 `asyncio.to_thread`로 호출한다.
+"""
+import fcntl
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+RECORD_HEADER = struct.Struct("!II")
+FSYNC_POLICIES = ("always", "interval", "never")
+# 한 스풀 디렉터리를 나눠 쓸 수 있는 최대 워커 수
+_MAX_SLOTS = 64
+_SEGMENT_SUFFIX = ".seg"
+_CURSOR_FILE = "cursor"
+_LOCK_FILE = "lock"
+
+
+class SpoolUnavailable(Exception):
+    """스풀 디렉터리를 열거나 점유할 수 없음"""
+
+
+def _segment_name(seq: int) -> str:
+    return f"{seq:012d}{_SEGMENT_SUFFIX}"
+
+
+def _scan_segment(path: str) -> Tuple[int, int]:
+    """세그먼트의 (정상 레코드 수, 정상 레코드 끝 오프셋)"""
+    records = 0
+    valid_end = 0
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                break
+            length, crc = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break
+            records += 1
+            valid_end += RECORD_HEADER.size + length
+    return records, valid_end
+
+
+class LogSpool:
+    """세그먼트 파일 기반 추가 전용 스풀 (스레드 안전)"""
+
+    def __init__(
+        self,
+        base_dir: str,
+        segment_bytes: int,
+        max_bytes: int,
+        fsync_policy: str = "interval",
+        fsync_interval_ms: float = 1000.0,
+    ):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"fsync policy must be one of {FSYNC_POLICIES}: {fsync_policy}")
+        self.segment_bytes = max(1, segment_bytes)
+        self.max_bytes = max(1, max_bytes)
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval_ms / 1000.0
+        self._lock = threading.Lock()
+
+        self.directory, self._lock_file = self._acquire_slot(base_dir)
+        # seq -> 파일 크기, 재전송 위치, 재전송할 레코드 수
+        self._segments: Dict[int, int] = {}
+        self._cursor: Tuple[int, int] = (0, 0)
+        self._backlog_records = 0
+        self._active = None
+        self._active_seq = 0
+        self._last_fsync = time.monotonic()
+
+        self.spooled = 0
+        self.replayed = 0
+        self.rejected = 0
+        self.corrupt = 0
+        self.recovered_records = 0
+        self.truncated_bytes = 0
+
+        self._recover()
+
+    @staticmethod
+    def _acquire_slot(base_dir: str):
+        """다른 워커가 점유하지 않은 worker-<n> 디렉터리를 flock으로 점유"""
+        for slot in range(_MAX_SLOTS):
+            directory = os.path.join(base_dir, f"worker-{slot}")
+            os.makedirs(directory, exist_ok=True)
+            lock_file = open(os.path.join(directory, _LOCK_FILE), "a+b")
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            return directory, lock_file
+        raise SpoolUnavailable(f"all {_MAX_SLOTS} spool slots under {base_dir} are in use")
+
+    # ---- 복구 ----
+
+    def _recover(self) -> None:
+        """남은 세그먼트를 검사해 손상된 꼬리를 잘라내고 재전송 위치를 복원"""
+        seqs = sorted(
+            int(name[:-len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(_SEGMENT_SUFFIX) and name[:-len(_SEGMENT_SUFFIX)].isdigit()
+        )
+        cursor_seq, cursor_offset = self._load_cursor()
+        for seq in seqs:
+            path = self._path(seq)
+            if seq < cursor_seq:
+                os.unlink(path)  # 재전송을 마쳤지만 삭제 전에 종료된 세그먼트
+                continue
+            size = os.path.getsize(path)
+            records, valid_end = _scan_segment(path)
+            if valid_end < size:
+                # 쓰는 도중 종료되어 남은 불완전한 꼬리
+                logger.warning(f"Truncating {size - valid_end} bytes of incomplete spool records in {path}")
+                with open(path, "r+b") as f:
+                    f.truncate(valid_end)
+                self.truncated_bytes += size - valid_end
+            if seq == cursor_seq and cursor_offset:
+                if cursor_offset > valid_end:
+                    cursor_offset = valid_end
+                records -= self._count_records(path, cursor_offset)
+            self._segments[seq] = valid_end
+            self._backlog_records += records
+
+        if cursor_seq not in self._segments:
+            cursor_seq = min(self._segments) if self._segments else (max(seqs) + 1 if seqs else 0)
+            cursor_offset = 0
+        self._cursor = (cursor_seq, cursor_offset)
+        self.recovered_records = self._backlog_records
+        if self._backlog_records:
+            logger.warning(
+                f"Recovered {self._backlog_records} detection logs from spool {self.directory} "
+                f"({self.backlog_bytes} bytes, {len(self._segments)} segments)"
+            )
+        self._open_segment(max(self._segments) + 1 if self._segments else cursor_seq)
+        if cursor_seq not in self._segments:
+            self._cursor = (self._active_seq, 0)
+
+    def _load_cursor(self) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(self.directory, _CURSOR_FILE), encoding="utf-8") as f:
+                data = json.load(f)
+            return int(data["segment"]), int(data["offset"])
+        except (OSError, ValueError, KeyError):
+            return 0, 0
+
+    def _count_records(self, path: str, end: int) -> int:
+        count = 0
+        with open(path, "rb") as f:
+            position = 0
+            while position < end:
+                length, _ = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                f.seek(length, os.SEEK_CUR)
+                position += RECORD_HEADER.size + length
+                count += 1
+        return count
+
+    # ---- 쓰기 ----
+
+    def _path(self, seq: int) -> str:
+        return os.path.join(self.directory, _segment_name(seq))
+
+    def _open_segment(self, seq: int) -> None:
+        self._active = open(self._path(seq), "ab")
+        self._active_seq = seq
+        self._segments[seq] = 0
+        self._fsync_directory()
+
+    def _fsync_directory(self) -> None:
+        """세그먼트 생성/삭제, cursor 교체가 크래시 후에도 남도록 디렉터리 항목 동기화"""
+        if self.fsync_policy == "never":
+            return
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def append(self, payloads: List[bytes]) -> int:
+        """레코드를 추가하고 받아들인 개수 반환 (크기 상한을 넘는 나머지는 rejected)"""
+        with self._lock:
+            accepted = 0
+            buffer = []
+            size = 0
+            for payload in payloads:
+                record_size = RECORD_HEADER.size + len(payload)
+                if self.total_bytes + size + record_size > self.max_bytes:
+                    break
+                buffer.append(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+                buffer.append(payload)
+                size += record_size
+                accepted += 1
+            rejected = len(payloads) - accepted
+            if rejected:
+                self.rejected += rejected
+                logger.error(
+                    f"Detection log spool is full ({self.total_bytes}/{self.max_bytes} bytes); "
+                    f"rejected {rejected} logs"
+                )
+            if not accepted:
+                return 0
+
+            self._active.write(b"".join(buffer))
+            self._active.flush()
+            now = time.monotonic()
+            if self.fsync_policy == "always" or (
+                self.fsync_policy == "interval" and now - self._last_fsync >= self.fsync_interval
+            ):
+                os.fsync(self._active.fileno())
+                self._last_fsync = now
+            self._segments[self._active_seq] += size
+            self._backlog_records += accepted
+            self.spooled += accepted
+
+            if self._segments[self._active_seq] >= self.segment_bytes:
+                self._rotate()
+            return accepted
+
+    def _rotate(self) -> None:
+        if self.fsync_policy != "never":
+            os.fsync(self._active.fileno())
+        self._active.close()
+        self._open_segment(self._active_seq + 1)
+
+    def sync(self) -> None:
+        """interval 정책에서 아직 fsync하지 않은 레코드 동기화 (종료 시 호출)"""
+        with self._lock:
+            if self._active is not None and self.fsync_policy != "never":
+                os.fsync(self._active.fileno())
+                self._last_fsync = time.monotonic()
+
+    # ---- 재전송 ----
+
+    def read_batch(self, max_records: int) -> Tuple[List[bytes], Tuple[int, int]]:
+        """재전송 위치부터 최대 max_records개를 읽어 (페이로드 목록, 다음 위치) 반환 (위치는 commit 전까지 유지)"""
+        with self._lock:
+            seq, offset = self._cursor
+            payloads: List[bytes] = []
+            while len(payloads) < max_records and seq in self._segments:
+                end = self._segments[seq]
+                if offset < end:
+                    offset = self._read_segment(seq, offset, end, max_records - len(payloads), payloads)
+                if offset < end or seq == self._active_seq:
+                    break
+                seq, offset = seq + 1, 0
+            return payloads, (seq, offset)
+
+    def _read_segment(self, seq: int, offset: int, end: int, limit: int, payloads: List[bytes]) -> int:
+        with open(self._path(seq), "rb") as f:
+            f.seek(offset)
+            while offset < end and limit > 0:
+                length, crc = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                payload = f.read(length)
+                offset += RECORD_HEADER.size + length
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    # 복구 후에는 생기지 않아야 함 - 세그먼트 나머지를 건너뜀
+                    logger.error(f"Corrupt spool record in {self._path(seq)} at {offset}; skipping rest of segment")
+                    self.corrupt += 1
+                    return end
+                payloads.append(payload)
+                limit -= 1
+        return offset
+
+    def commit(self, cursor: Tuple[int, int], records: int) -> None:
+        """read_batch로 읽은 레코드의 재전송 완료를 기록하고 다 보낸 세그먼트 삭제"""
+        with self._lock:
+            self._write_cursor(cursor)
+            self._cursor = cursor
+            self._backlog_records = max(0, self._backlog_records - records)
+            self.replayed += records
+            removed = False
+            for seq in [seq for seq in self._segments if seq < cursor[0]]:
+                del self._segments[seq]
+                try:
+                    os.unlink(self._path(seq))
+                except FileNotFoundError:
+                    pass
+                removed = True
+            if removed:
+                self._fsync_directory()
+
+    def _write_cursor(self, cursor: Tuple[int, int]) -> None:
+        path = os.path.join(self.directory, _CURSOR_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"segment": cursor[0], "offset": cursor[1]}, f)
+            f.flush()
+            if self.fsync_policy != "never":
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    # ---- 통계 ----
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._segments.values())
+
+    @property
+    def backlog_records(self) -> int:
+        return self._backlog_records
+
+    @property
+    def backlog_bytes(self) -> int:
+        seq, offset = self._cursor
+        return sum(size for s, size in self._segments.items() if s >= seq) - (offset if seq in self._segments else 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "backlog_records": self._backlog_records,
+                "backlog_bytes": self.backlog_bytes,
+                "disk_bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "segments": len(self._segments),
+                "fsync_policy": self.fsync_policy,
+                "spooled": self.spooled,
+                "replayed": self.replayed,
+                "rejected": self.rejected,
+                "corrupt": self.corrupt,
+                "recovered_records": self.recovered_records,
+                "truncated_bytes": self.truncated_bytes,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._active is not None:
+                if self.fsync_policy != "never":
+                    os.fsync(self._active.fileno())
+                self._active.close()
+                self._active = None
+            # 빈 활성 세그먼트는 남기지 않음
+            if self._segments.get(self._active_seq) == 0 and self._cursor[0] != self._active_seq:
+                del self._segments[self._active_seq]
+                os.unlink(self._path(self._active_seq))
+            self._lock_file.close()
@@ -0,0 +1,490 @@
+# app/repositories/log_writer.py
+"""
+탐지 로그 백그라운드 bulk writer
+
+/detect 응답 경로에서 ES 색인(직렬화 + 왕복)을 기다리지 않도록, 라우터는 로그를
+메모리 큐에 넣고 바로 반환한다. 백그라운드 태스크가 큐를 모아 `_bulk` 요청으로
+저장한다.
+
+- 배치 건수 / 추정 바이트 / flush 간격 중 먼저 도달하는 조건에서 flush
+- 429·5xx로 실패한 항목과 요청 자체가 실패한 배치는 큐 앞에 되돌려 지수 백오프 후
+  다시 보냄 (LOG_WRITER_MAX_RETRIES 초과 시 failed), 매핑 오류 등 4xx는 재시도하지 않음
+- 큐가 건수/추정 바이트 상한을 넘으면 새 로그를 버리고 dropped로 집계
+- shutdown 시 남은 로그를 LOG_WRITER_SHUTDOWN_TIMEOUT_SECONDS 안에서 모두 flush
+
+디스크 스풀(app/repositories/log_spool.py)을 켜면 bulk 요청 자체가 실패하거나 재시도를
+다 쓴 로그는 버리지 않고 스풀에 기록한다. ES 장애(sink unhealthy) 동안에는 새 배치도
+ES를 거치지 않고 바로 스풀로 가며, 재전송 태스크가 LOG_SPOOL_REPLAY_INTERVAL_SECONDS마다
+스풀의 가장 오래된 로그부터 bulk 색인을 시도해 성공하면 정상 경로로 되돌린다.
+shutdown timeout 안에 보내지 못한 로그도 스풀에 남겨 다음 기동 때 재전송한다.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.repositories.log_repository import LogRepository, get_log_repository
+from app.repositories.log_spool import LogSpool, SpoolUnavailable
+from app.schemas.log import PIIDetectionLog
+
+logger = logging.getLogger(__name__)
+
+# 입력 텍스트 외 필드(요청 정보, 메타데이터 등)와 엔티티 하나의 대략적 JSON 크기
+_LOG_OVERHEAD_BYTES = 512
+_ENTITY_BYTES = 160
+# 큐가 가득 찼을 때 경고 로그 간격 (초)
+_DROP_WARNING_INTERVAL = 10.0
+
+
+def estimate_log_bytes(log: PIIDetectionLog) -> int:
+    """bulk 본문에서 차지할 대략적 바이트 수 (직렬화 없이 추정, 한글은 UTF-8 3바이트)"""
+    return len(log.input_text) * 3 + len(log.detected_entities) * _ENTITY_BYTES + _LOG_OVERHEAD_BYTES
+
+
+class _Entry:
+    __slots__ = ("log", "size", "enqueued_at", "attempts")
+
+    def __init__(self, log: PIIDetectionLog, size: int):
+        self.log = log
+        self.size = size
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+
+
+def _retryable(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+class BulkLogWriter:
+    """메모리 큐 + 백그라운드 bulk flush (단일 이벤트 루프에서 사용)"""
+
+    def __init__(
+        self,
+        repository: LogRepository,
+        batch_size: int,
+        batch_bytes: int,
+        flush_interval_ms: float,
+        max_queue_items: int,
+        max_queue_bytes: int,
+        max_retries: int,
+        retry_backoff_ms: float,
+        max_backoff_ms: float,
+        spool: Optional[LogSpool] = None,
+        replay_batch_size: int = 500,
+        replay_interval_seconds: float = 5.0,
+    ):
+        self.repository = repository
+        self.batch_size = max(1, batch_size)
+        self.batch_bytes = max(1, batch_bytes)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_queue_items = max(1, max_queue_items)
+        self.max_queue_bytes = max(1, max_queue_bytes)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff_ms / 1000.0
+        self.max_backoff = max_backoff_ms / 1000.0
+        self.spool = spool
+        self.replay_batch_size = max(1, replay_batch_size)
+        self.replay_interval = replay_interval_seconds
+        # 마지막 bulk 요청이 성공했는지 (False면 새 배치를 바로 스풀로 보냄)
+        self.sink_healthy = True
+
+        self._queue: Deque[_Entry] = deque()
+        self._queued_bytes = 0
+        self._in_flight: List[_Entry] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._replay_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._consecutive_failures = 0
+        self._last_drop_warning = 0.0
+
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retried = 0
+        self.spooled = 0
+        self.flushes = 0
+        self.flush_ms_total = 0.0
+        self.last_flush_ms: Optional[float] = None
+        self.max_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """현재 이벤트 루프에서 flush 태스크 시작 (startup event, 또는 첫 enqueue 시)"""
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run())
+        self._task.add_done_callback(self._on_task_done)
+        if self.spool is not None and (self._replay_task is None or self._replay_task.done()):
+            self._replay_task = loop.create_task(self._replay_loop())
+            self._replay_task.add_done_callback(self._on_task_done)
+
+    def enqueue(self, log: PIIDetectionLog) -> bool:
+        """로그를 큐에 넣고 바로 반환 (상한 초과/종료 중이면 버리고 False)"""
+        if self._closing:
+            self._drop(1, "writer is closing")
+            return False
+        size = estimate_log_bytes(log)
+        if len(self._queue) >= self.max_queue_items or self._queued_bytes + size > self.max_queue_bytes:
+            self._drop(1, "queue full")
+            return False
+
+        if not log.id:
+            # 재시도/스풀 재전송이 같은 문서를 덮어쓰도록 큐에 넣을 때 ID 확정
+            log.id = str(uuid.uuid4())
+        self.start()
+        was_empty = not self._queue
+        self._queue.append(_Entry(log, size))
+        self._queued_bytes += size
+        self.enqueued += 1
+        # 비어 있던 큐면 flush 간격 타이머 시작, 배치가 찼으면 바로 flush
+        if was_empty or self._batch_ready():
+            self._wakeup.set()
+        return True
+
+    def enqueue_many(self, logs: List[PIIDetectionLog]) -> int:
+        """여러 로그를 큐에 넣고 들어간 건수 반환"""
+        return sum(1 for log in logs if self.enqueue(log))
+
+    def _batch_ready(self) -> bool:
+        return len(self._queue) >= self.batch_size or self._queued_bytes >= self.batch_bytes
+
+    def _drop(self, count: int, reason: str) -> None:
+        self.dropped += count
+        now = time.monotonic()
+        if now - self._last_drop_warning >= _DROP_WARNING_INTERVAL:
+            self._last_drop_warning = now
+            logger.warning(
+                f"Dropping detection logs ({reason}): dropped={self.dropped}, "
+                f"queue={len(self._queue)}/{self.max_queue_items}, "
+                f"bytes={self._queued_bytes}/{self.max_queue_bytes}"
+            )
+
+    async def _run(self) -> None:
+        while True:
+            await self._wait_for_batch()
+            if not self._queue:
+                if self._closing:
+                    return
+                continue
+            batch = self._take_batch()
+            if self.spool is not None and not self.sink_healthy:
+                # ES 장애 중에는 바로 스풀에 기록 (복구 확인은 재전송 태스크가 함)
+                if await self._spool_entries(batch):
+                    continue
+                self._requeue(batch)
+                await asyncio.sleep(self._backoff_seconds())
+            elif not await self._flush(batch):
+                await asyncio.sleep(self._backoff_seconds())
+
+    async def _wait_for_batch(self) -> None:
+        """배치가 차거나 가장 오래된 로그의 flush 간격이 지날 때까지 대기 (종료 중이면 즉시 반환)"""
+        while not self._closing and not self._batch_ready():
+            timeout = None
+            if self._queue:
+                timeout = self._queue[0].enqueued_at + self.flush_interval - time.monotonic()
+                if timeout <= 0:
+                    return
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return
+
+    def _take_batch(self) -> List[_Entry]:
+        batch: List[_Entry] = []
+        batch_bytes = 0
+        while self._queue and len(batch) < self.batch_size and (not batch or batch_bytes < self.batch_bytes):
+            entry = self._queue.popleft()
+            batch.append(entry)
+            batch_bytes += entry.size
+        self._queued_bytes -= batch_bytes
+        return batch
+
+    async def _flush(self, batch: List[_Entry]) -> bool:
+        """배치 하나를 bulk로 저장 (메모리에서 재시도할 항목이 남으면 False)"""
+        self._in_flight = batch
+        started_at = time.perf_counter()
+        try:
+            statuses = await self.repository.bulk_index([entry.log for entry in batch])
+            error = None
+        except Exception as e:
+            # 연결 오류/타임아웃 등 요청 자체가 실패하면 배치 전체를 재시도 대상으로
+            statuses = [503] * len(batch)
+            error = e
+        # 취소(shutdown timeout)되면 in_flight가 남아 close()에서 스풀/dropped로 처리된다
+        self._in_flight = []
+        elapsed_ms = (time.perf_counter() - started_at) * 1000.0
+        self.flushes += 1
+        self.flush_ms_total += elapsed_ms
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+
+        if error is not None and self.spool is not None:
+            # ES 장애: 메모리에서 재시도하지 않고 스풀에 보관, 재전송 태스크가 복구를 확인
+            self.sink_healthy = False
+            logger.warning(f"Detection log bulk write failed ({error!r}); spooling {len(batch)} logs to disk")
+            if await self._spool_entries(batch):
+                return True
+            self._requeue(batch)
+            self._consecutive_failures += 1
+            return False
+        self.sink_healthy = error is None
+
+        retry: List[_Entry] = []
+        exhausted: List[_Entry] = []
+        rejected = 0
+        for entry, status in zip(batch, statuses):
+            if status is None:
+                self.written += 1
+            elif not _retryable(status):
+                rejected += 1
+            elif entry.attempts < self.max_retries:
+                entry.attempts += 1
+                retry.append(entry)
+            else:
+                exhausted.append(entry)
+        if exhausted and self.spool is not None and await self._spool_entries(exhausted):
+            exhausted = []
+        rejected += len(exhausted)
+        self.failed += rejected
+        if rejected:
+            logger.error(f"Detection log bulk write gave up on {rejected}/{len(batch)} logs (rejected or retries exhausted)")
+
+        if not retry:
+            self._consecutive_failures = 0
+            return True
+        self._requeue(retry)
+        self.retried += len(retry)
+        self._consecutive_failures += 1
+        logger.warning(
+            f"Detection log bulk write failed for {len(retry)}/{len(batch)} logs"
+            f"{f' ({error!r})' if error is not None else ''}; retrying in {self._backoff_seconds() * 1000:.0f}ms"
+        )
+        return False
+
+    def _requeue(self, entries: List[_Entry]) -> None:
+        """순서를 유지하도록 큐 앞에 되돌림 (이미 큐에 있던 로그라 상한 검사는 하지 않음)"""
+        self._queue.extendleft(reversed(entries))
+        self._queued_bytes += sum(entry.size for entry in entries)
+
+    async def _spool_entries(self, entries: List[_Entry]) -> bool:
+        """로그를 디스크 스풀에 기록 (스풀 쓰기 자체가 실패하면 False)"""
+        self._in_flight = entries
+        try:
+            await asyncio.to_thread(self._write_spool, [entry.log for entry in entries])
+        except Exception as e:
+            self._in_flight = []
+            logger.error(f"Failed to write detection logs to spool: {e!r}")
+            return False
+        self._in_flight = []
+        return True
+
+    def _write_spool(self, logs: List[PIIDetectionLog]) -> int:
+        """직렬화 + 스풀 추가 (블로킹, 상한 초과분은 dropped로 집계)"""
+        accepted = self.spool.append([log.model_dump_json().encode("utf-8") for log in logs])
+        self.spooled += accepted
+        if accepted < len(logs):
+            self._drop(len(logs) - accepted, "spool full")
+        return accepted
+
+    async def _replay_loop(self) -> None:
+        """스풀에 쌓인 로그를 ES로 재전송 (진행이 있으면 바로 다음 배치)"""
+        progressed = False
+        while True:
+            if not progressed:
+                await asyncio.sleep(self.replay_interval)
+            if self.spool.backlog_records == 0:
+                # 재전송할 것이 없으면 정상 경로(ES 직접 저장)로 다시 시도
+                self.sink_healthy = True
+                progressed = False
+                continue
+            progressed = await self._replay_batch()
+
+    async def _replay_batch(self) -> bool:
+        payloads, cursor = await asyncio.to_thread(self.spool.read_batch, self.replay_batch_size)
+        logs: List[PIIDetectionLog] = []
+        for payload in payloads:
+            try:
+                logs.append(PIIDetectionLog.model_validate_json(payload))
+            except ValueError as e:
+                self.failed += 1
+                logger.error(f"Discarding unreadable spooled detection log: {e}")
+        if logs:
+            try:
+                statuses = await self.repository.bulk_index(logs)
+            except Exception as e:
+                self.sink_healthy = False
+                logger.info(f"Elasticsearch still unavailable; {self.spool.backlog_records} logs spooled ({e!r})")
+                return False
+            self.sink_healthy = True
+            retry = [log for log, status in zip(logs, statuses) if status is not None and _retryable(status)]
+            rejected = sum(1 for status in statuses if status is not None and not _retryable(status))
+            self.written += len(logs) - len(retry) - rejected
+            self.failed += rejected
+            if retry:
+                # 일시적 실패는 스풀 끝에 다시 기록해 위치를 넘길 수 있게 함
+                await asyncio.to_thread(self._write_spool, retry)
+        await asyncio.to_thread(self.spool.commit, cursor, len(payloads))
+        if payloads:
+            logger.info(
+                f"Replayed {len(payloads)} spooled detection logs "
+                f"({self.spool.backlog_records} remaining)"
+            )
+        return bool(payloads)
+
+    def _backoff_seconds(self) -> float:
+        return min(self.max_backoff, self.retry_backoff * (2 ** max(0, self._consecutive_failures - 1)))
+
+    def _on_task_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            # 다음 enqueue가 태스크를 다시 시작한다
+            logger.error("Detection log writer stopped unexpectedly", exc_info=task.exception())
+
+    async def close(self, timeout: float) -> None:
+        """
+        새 로그를 받지 않고 남은 로그를 flush
+
+        timeout 안에 보내지 못한 로그는 스풀이 있으면 스풀에 남기고, 없으면 dropped로 집계한다.
+        """
+        self._closing = True
+        if self._queue and not self.running:
+            self.start()
+        if self._replay_task is not None:
+            self._replay_task.cancel()
+        if self._task is not None:
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), timeout)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+            except Exception:
+                pass  # _on_task_done에서 기록
+
+        remaining = self._in_flight + list(self._queue)
+        self._in_flight = []
+        self._queue.clear()
+        self._queued_bytes = 0
+        if remaining:
+            self._last_drop_warning = 0.0
+            if self.spool is not None:
+                try:
+                    self._write_spool([entry.log for entry in remaining])
+                    remaining = []
+                except Exception as e:
+                    logger.error(f"Failed to spool detection logs at shutdown: {e!r}")
+            if remaining:
+                self._drop(len(remaining), f"not flushed within {timeout:.0f}s shutdown timeout")
+        if self.spool is not None:
+            self.spool.close()
+        logger.info(
+            f"Detection log writer closed: written={self.written}, failed={self.failed}, "
+            f"dropped={self.dropped}, spool_backlog={self.spool.backlog_records if self.spool is not None else 0}"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": len(self._queue),
+            "queue_bytes": self._queued_bytes,
+            "max_queue_items": self.max_queue_items,
+            "max_queue_bytes": self.max_queue_bytes,
+            "in_flight": len(self._in_flight),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retried": self.retried,
+            "spooled": self.spooled,
+            "sink_healthy": self.sink_healthy,
+            "consecutive_failures": self._consecutive_failures,
+            "flushes": self.flushes,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": self.flush_ms_total / self.flushes if self.flushes else None,
+            "max_flush_ms": self.max_flush_ms,
+            "spool": self.spool.stats() if self.spool is not None else None,
+        }
+
+
+_log_writer_instance: Optional[BulkLogWriter] = None
+
+
+def _open_spool() -> Optional[LogSpool]:
+    """설정에 따라 디스크 스풀을 열고 남은 로그를 복구 (실패하면 스풀 없이 동작)"""
+    if not settings.LOG_SPOOL_ENABLED:
+        return None
+    try:
+        return LogSpool(
+            settings.LOG_SPOOL_DIR,
+            segment_bytes=int(settings.LOG_SPOOL_SEGMENT_MB * 1024 * 1024),
+            max_bytes=int(settings.LOG_SPOOL_MAX_MB * 1024 * 1024),
+            fsync_policy=settings.LOG_SPOOL_FSYNC,
+            fsync_interval_ms=settings.LOG_SPOOL_FSYNC_INTERVAL_MS,
+        )
+    except (OSError, SpoolUnavailable, ValueError) as e:
+        logger.error(f"Detection log spool unavailable; logs will be dropped while Elasticsearch is down: {e}")
+        return None
+
+
+def _create_log_writer(spool: Optional[LogSpool]) -> BulkLogWriter:
+    return BulkLogWriter(
+        get_log_repository(),
+        batch_size=settings.LOG_WRITER_BATCH_SIZE,
+        batch_bytes=int(settings.LOG_WRITER_BATCH_MB * 1024 * 1024),
+        flush_interval_ms=settings.LOG_WRITER_FLUSH_INTERVAL_MS,
+        max_queue_items=settings.LOG_WRITER_MAX_QUEUE_ITEMS,
+        max_queue_bytes=int(settings.LOG_WRITER_MAX_QUEUE_MB * 1024 * 1024),
+        max_retries=settings.LOG_WRITER_MAX_RETRIES,
+        retry_backoff_ms=settings.LOG_WRITER_RETRY_BACKOFF_MS,
+        max_backoff_ms=settings.LOG_WRITER_MAX_BACKOFF_MS,
+        spool=spool,
+        replay_batch_size=settings.LOG_SPOOL_REPLAY_BATCH_SIZE,
+        replay_interval_seconds=settings.LOG_SPOOL_REPLAY_INTERVAL_SECONDS,
+    )
+
+
+def get_log_writer() -> BulkLogWriter:
+    """탐지 로그 writer 싱글톤 (보통 start_log_writer()가 startup에서 미리 만듦)"""
+    global _log_writer_instance
+    if _log_writer_instance is None:
+        _log_writer_instance = _create_log_writer(_open_spool())
+    return _log_writer_instance
+
+
+async def start_log_writer() -> BulkLogWriter:
+    """
+    writer를 만들고 flush/재전송 태스크 시작 (FastAPI startup event에서 호출)
+
+    스풀 열기는 세그먼트 전체 CRC 검사(복구)를 포함해 백로그가 크면 오래 걸리므로
+    이벤트 루프 밖에서 수행한다.
+    """
+    global _log_writer_instance
+    if _log_writer_instance is None:
+        spool = await asyncio.to_thread(_open_spool)
+        if _log_writer_instance is None:
+            _log_writer_instance = _create_log_writer(spool)
+        elif spool is not None:
+            spool.close()  # 기다리는 동안 다른 경로에서 이미 만들어짐
+    _log_writer_instance.start()
+    return _log_writer_instance
+
+
+async def close_log_writer() -> None:
+    """남은 로그 flush 후 종료 (FastAPI shutdown event에서 ES 클라이언트를 닫기 전에 호출)"""
+    global _log_writer_instance
+    if _log_writer_instance is not None:
+        await _log_writer_instance.close(settings.LOG_WRITER_SHUTDOWN_TIMEOUT_SECONDS)
+        _log_writer_instance = None
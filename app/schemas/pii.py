@@ -1,19 +1,35 @@
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 
 class PIIDetectionRequest(BaseModel):
     text: str = Field(..., description="분석할 텍스트", min_length=1, max_length=10000)
+    debug: bool = Field(False, description="응답에 모델 원시 토큰 예측(debug_raw_predictions) 포함 여부")
+    deadline_ms: Optional[int] = Field(
+        None, description="응답 지연 시간 예산 (ms). 모델 추론이 예산을 넘길 것으로 예상되면 정규식 전용 경로로 응답 (X-Deadline-Ms 헤더로도 지정 가능)",
+        ge=1, le=60000,
+    )
 
 class DetectedEntity(BaseModel):
     type: str = Field(..., description="PII 타입 (예: PERSON, PHONE, EMAIL 등)")
     value: str = Field(..., description="탐지된 개인정보 값")
     confidence: float = Field(..., description="탐지 신뢰도 (0.0 ~ 1.0)", ge=0.0, le=1.0)
     token_count: int = Field(..., description="해당 엔티티의 토큰 개수", gt=0)
+    start: Optional[int] = Field(None, description="원본 텍스트 내 시작 문자 위치 (포함)", ge=0)
+    end: Optional[int] = Field(None, description="원본 텍스트 내 끝 문자 위치 (미포함)", ge=0)
+    source: Optional[str] = Field(None, description="탐지 단계 (regex | ner)")
 
 class PIIDetectionResponse(BaseModel):
     has_pii: bool = Field(..., description="개인정보 탐지 여부")
     reason: str = Field(..., description="탐지 결과에 대한 이유")
     details: str = Field(..., description="구체적인 설명 및 탐지된 데이터")
     entities: list[DetectedEntity] = Field(default_factory=list, description="탐지된 개인정보 엔티티 목록")
+    detection_path: Optional[str] = Field(
+        None, description="실행된 탐지 경로 (model | cascade_skip | segmented | regex_only)"
+    )
+    degraded: bool = Field(False, description="마감 시간 때문에 모델을 생략하고 정규식 전용 경로로 응답했는지 여부")
+    debug_raw_predictions: Optional[List[Dict[str, Any]]] = Field(
+        None, description="디버그용 토큰별 원시 예측 (debug 요청 또는 PII_DEBUG_RAW_PREDICTIONS 설정 시에만 포함)"
+    )
     
     model_config = {
         "json_schema_extra": {
@@ -27,16 +43,55 @@ class PIIDetectionResponse(BaseModel):
                             "type": "PERSON",
                             "value": "홍길동",
                             "confidence": 0.95,
-                            "token_count": 2
+                            "token_count": 2,
+                            "start": 6,
+                            "end": 9
                         },
                         {
                             "type": "PHONE", 
                             "value": "010-1234-5678",
                             "confidence": 0.89,
-                            "token_count": 3
+                            "token_count": 3,
+                            "start": 18,
+                            "end": 31
                         }
                     ]
                 }
             ]
         }
-    }
\ No newline at end of file
+    }
+
+
+class PIIBatchItem(BaseModel):
+    id: Optional[str] = Field(None, description="클라이언트가 지정한 항목 ID (응답에 그대로 반환)", max_length=256)
+    text: str = Field(..., description="분석할 텍스트", min_length=1, max_length=10000)
+
+class PIIBatchDetectionRequest(BaseModel):
+    items: List[PIIBatchItem] = Field(..., description="분석할 항목 목록", min_length=1)
+
+class PIIBatchItemResult(BaseModel):
+    index: int = Field(..., description="요청 items 내 위치")
+    id: Optional[str] = Field(None, description="요청 항목 ID")
+    result: PIIDetectionResponse = Field(..., description="항목별 탐지 결과")
+
+class PIIBatchTiming(BaseModel):
+    items: int = Field(..., description="전체 항목 수")
+    cache_hits: int = Field(..., description="결과 캐시에서 재사용한 항목 수")
+    model_items: int = Field(..., description="모델 추론을 수행한 항목 수")
+    cache_ms: float = Field(..., description="결과 캐시 조회 시간 (ms)")
+    regex_gate_ms: float = Field(..., description="정규식 + 캐스케이드 게이트 시간 (ms)")
+    model_ms: float = Field(..., description="토큰화 + 모델 추론 + 디코딩 시간 (ms)")
+    build_ms: float = Field(..., description="응답 생성 시간 (ms)")
+    detection_ms: float = Field(..., description="탐지 전체 시간 (ms)")
+    log_ms: float = Field(0.0, description="Elasticsearch bulk 로그 저장 시간 (ms)")
+    total_ms: float = Field(..., description="요청 처리 전체 시간 (ms)")
+
+class PIIBatchDetectionResponse(BaseModel):
+    items: List[PIIBatchItemResult] = Field(..., description="입력 순서의 항목별 결과")
+    timing: PIIBatchTiming = Field(..., description="배치 처리 시간 내역")
+
+class PIIStreamItemResult(BaseModel):
+    index: int = Field(..., description="입력 스트림 내 레코드 순번 (0부터)")
+    id: Optional[str] = Field(None, description="레코드 ID")
+    result: Optional[PIIDetectionResponse] = Field(None, description="탐지 결과 (오류 시 없음)")
+    error: Optional[str] = Field(None, description="레코드 처리 오류")
@@ -0,0 +1,122 @@
+"""
+탐지 로그 보관 기간 적용
+
+시스템 설정의 `data_retention_days`보다 오래된 로그 파티션 인덱스를 통째로 삭제한다.
+앱 startup에서 `start_log_retention_job()`으로 주기 작업을 시작하며,
+LOG_RETENTION_INTERVAL_HOURS마다 최신 설정 값을 다시 읽는다.
+
+워커가 여럿이어도 삭제는 LOG_RETENTION_LOCK_FILE을 flock으로 점유한 워커 하나만
+수행한다 (점유한 워커가 죽으면 다음 주기에 다른 워커가 이어받음). 나머지 워커는
+보관 기간 값만 읽어 저장소에 알려, 만료된 로그를 다시 쓰지 않게 한다.
+"""
+import asyncio
+import fcntl
+import logging
+import os
+from typing import IO, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories.log_repository import get_log_repository
+from app.services.system_settings_service import SystemSettingsService
+
+logger = logging.getLogger(__name__)
+
+# startup 직후 DB/ES 연결이 자리 잡을 때까지 첫 실행을 미룸 (초)
+_INITIAL_DELAY_SECONDS = 60.0
+
+
+class LogRetentionService:
+    """data_retention_days 설정에 따라 만료된 로그 인덱스를 삭제하는 서비스"""
+
+    def __init__(self, db: AsyncSession):
+        self.settings_service = SystemSettingsService(db)
+        self.log_repository = get_log_repository()
+
+    async def refresh_retention_days(self) -> int:
+        """최신 data_retention_days를 읽어 저장소에 알림 (만료된 로그 쓰기 방지용)"""
+        system_settings = await self.settings_service.get_settings()
+        self.log_repository.retention_days = system_settings.data_retention_days
+        return system_settings.data_retention_days
+
+    async def apply_retention(self) -> List[str]:
+        """보관 기간이 지난 파티션 인덱스를 삭제하고 삭제한 인덱스 이름 반환"""
+        retention_days = await self.refresh_retention_days()
+        return await self.log_repository.delete_expired_indices(retention_days)
+
+
+async def run_log_retention(delete_expired: bool = True) -> List[str]:
+    """새 DB 세션으로 보관 기간을 한 번 적용 (delete_expired=False면 설정 값만 갱신)"""
+    async with AsyncSessionLocal() as session:
+        service = LogRetentionService(session)
+        if not delete_expired:
+            await service.refresh_retention_days()
+            return []
+        return await service.apply_retention()
+
+
+def _try_acquire_runner_lock() -> bool:
+    """보관 작업 실행권(LOG_RETENTION_LOCK_FILE flock)을 점유했거나 이미 가지고 있으면 True"""
+    global _lock_file
+    if _lock_file is not None:
+        return True
+    path = settings.LOG_RETENTION_LOCK_FILE
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    lock_file = open(path, "a+b")
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _lock_file = lock_file
+    logger.info(f"This worker runs log retention (lock {path}, pid {os.getpid()})")
+    return True
+
+
+def _release_runner_lock() -> None:
+    global _lock_file
+    if _lock_file is not None:
+        _lock_file.close()  # 파일을 닫으면 flock도 풀림
+        _lock_file = None
+
+
+async def _retention_loop() -> None:
+    # 스풀 재전송이 만료된 파티션을 다시 만들지 않도록 보관 기간부터 읽어 둠
+    try:
+        await run_log_retention(delete_expired=False)
+    except Exception as e:
+        logger.warning(f"Failed to load log retention period: {str(e)}")
+    await asyncio.sleep(_INITIAL_DELAY_SECONDS)
+    while True:
+        try:
+            await run_log_retention(delete_expired=_try_acquire_runner_lock())
+        except Exception as e:
+            # ES/DB 장애 시 다음 주기에 다시 시도
+            logger.error(f"Log retention run failed: {str(e)}")
+        await asyncio.sleep(settings.LOG_RETENTION_INTERVAL_HOURS * 3600)
+
+
+_retention_task: Optional[asyncio.Task] = None
+_lock_file: Optional[IO[bytes]] = None
+
+
+def start_log_retention_job() -> Optional[asyncio.Task]:
+    """보관 기간 주기 작업 시작 (FastAPI startup event에서 호출)"""
+    global _retention_task
+    if not settings.LOG_RETENTION_ENABLED:
+        return None
+    if _retention_task is None or _retention_task.done():
+        _retention_task = asyncio.get_running_loop().create_task(_retention_loop())
+    return _retention_task
+
+
+def stop_log_retention_job() -> None:
+    global _retention_task
+    if _retention_task is not None:
+        _retention_task.cancel()
+        _retention_task = None
+    _release_runner_lock()
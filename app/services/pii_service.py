@@ -1,6 +1,22 @@
-from typing import Any, Dict, List
+import asyncio
+import json
+import time
+from collections import deque
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.ai.admission import get_admission_controller
+from app.ai.cascade import get_cascade_gate
+from app.ai.deadline import get_deadline_planner
 from app.ai.model_manager import get_pii_detector
+from app.ai.regex_detector import get_regex_detector
+from app.ai.result_cache import get_result_cache, get_segment_cache, make_cache_key
+from app.core.config import settings
 from app.schemas.pii import PIIDetectionResponse, DetectedEntity
+from app.utils.entity_extractor import merge_entities
+from app.utils.text_segmenter import split_segments
+
+# 디버그 응답에 포함할 원시 예측 토큰 수
+DEBUG_RAW_PREDICTION_LIMIT = 20
 
 class PIIDetectionService:
     """PII 탐지 비즈니스 로직을 처리하는 서비스"""
@@ -8,31 +24,422 @@ class PIIDetectionService:
     def __init__(self):
         pass  # detector는 필요할 때 get_pii_detector()로 획득
 
-    async def analyze_text(self, text: str) -> PIIDetectionResponse:
-        """텍스트에서 개인정보를 탐지하고 결과를 반환"""
+    async def analyze_text(
+        self,
+        text: str,
+        include_raw_predictions: bool = False,
+        deadline: Optional[float] = None,
+        regex_only: bool = False,
+    ) -> PIIDetectionResponse:
+        """
+        텍스트에서 개인정보를 탐지하고 결과를 반환
+
+        모델 추론은 한 번만 수행되며, include_raw_predictions가 True이면
+        같은 추론에서 나온 토큰별 원시 예측을 debug_raw_predictions에 담는다.
+
+        Args:
+            deadline: 응답 마감 시각 (time.monotonic() 기준). 남은 시간으로 모델 추론을
+                끝낼 수 없으면 정규식 전용 경로로 낮춘다(degraded).
+            regex_only: 호출자가 이미 마감 시간을 지킬 수 없다고 판단한 경우 바로 정규식 전용 경로 사용
+        """
         if not isinstance(text, str) or not text.strip():
             raise ValueError("text must be a non-empty string")
 
+        # 호출자가 정규식 전용을 지정한 경우도 마감 시간이 있는 요청으로 집계
+        with_deadline = deadline is not None or regex_only
+
+        # 디버그 응답(원시 예측)은 캐시하지 않음
+        if not settings.PII_RESULT_CACHE_ENABLED or include_raw_predictions:
+            degraded = self._must_degrade(text, deadline, regex_only)
+            return await self._analyze(text, include_raw_predictions, degraded, with_deadline)
+
+        cache = get_result_cache()
+        key = self._cache_key(text)
+        size_of = lambda response: len(key) + len(response.model_dump_json())
+        if not with_deadline:
+            return await cache.get_or_compute(key, lambda: self._analyze(text, False), size_of=size_of)
+
+        # 마감 시간이 있는 요청: 캐시 적중은 그대로 쓰고, 낮춘(degraded) 결과는 캐시하지 않음
+        cached = cache.lookup(key)
+        if cached is not None:
+            get_deadline_planner().record("cache", degraded=False, with_deadline=True)
+            return cached
+        if self._must_degrade(text, deadline, regex_only):
+            cache.misses += 1
+            return await self._analyze(text, False, degraded=True, with_deadline=True)
+        # 모델을 돌릴 수 있으면 마감 시간이 없는 요청과 같은 single-flight 계산을 공유
+        return await cache.get_or_compute(
+            key,
+            lambda: self._analyze(text, False, degraded=False, with_deadline=True),
+            size_of=size_of,
+        )
+
+    def _must_degrade(self, text: str, deadline: Optional[float], regex_only: bool) -> bool:
+        """마감 시간 안에 모델을 돌릴 수 없어 정규식 전용 경로로 낮춰야 하는지"""
+        return regex_only or (deadline is not None and not self.fits_deadline(len(text), deadline))
+
+    def fits_deadline(self, text_length: int, deadline: float, queue_wait_ms: float = 0.0) -> bool:
+        """
+        마감 시각까지 모델 추론을 끝낼 수 있는지 판단
+
+        queue_wait_ms(예: 승인 제어 대기열 예상 대기)에 마이크로 배처 대기열과
+        입력 길이별 추론 시간 추정을 더해 남은 예산과 비교한다.
+        """
+        remaining_ms = (deadline - time.monotonic()) * 1000.0
+        planner = get_deadline_planner()
+        estimate_ms = planner.estimate_ms(text_length)
         detector = get_pii_detector()
-        if detector is None:
-            raise RuntimeError("PII detector is not initialized.")
+        batcher = getattr(detector, "batcher", None)
+        if batcher is not None:
+            # 앞에 쌓인 배치 수만큼 추가로 기다림
+            queue_wait_ms += batcher.stats()["queue_depth"] / batcher.max_batch_size * estimate_ms
+        return planner.fits(text_length, remaining_ms, queue_wait_ms)
+
+    def _cache_key(self, text: str) -> str:
+        """결과 캐시 키 (텍스트 + 모델 버전 + 탐지 설정)"""
+        return make_cache_key(
+            text,
+            get_pii_detector().model_version,
+            settings.DEFAULT_PII_THRESHOLD,
+            settings.REGEX_DETECTION_ENABLED,
+            settings.CASCADE_MODE,
+            settings.CASCADE_THRESHOLD,
+        )
+
+    async def _analyze(
+        self,
+        text: str,
+        include_raw_predictions: bool,
+        degraded: bool = False,
+        with_deadline: bool = False,
+    ) -> PIIDetectionResponse:
+        """
+        정규식 → 캐스케이드 게이트 → 모델 순서로 실제 탐지 수행
+
+        Args:
+            degraded: True이면 모델 없이 정규식 전용 경로로 탐지 (마감 시간 초과 대비)
+            with_deadline: 마감 시간이 있는 요청인지 (경로 통계용)
+        """
+        # 긴 대화 기록은 세그먼트 단위로 나눠 새로 바뀐 부분만 모델에 보냄
+        if (
+            settings.PII_SEGMENT_CACHE_ENABLED
+            and not degraded
+            and not include_raw_predictions
+            and len(text) >= settings.PII_SEGMENT_MIN_TEXT_CHARS
+        ):
+            raw_entities, has_pii = await self._detect_segmented(text)
+            get_deadline_planner().record("segmented", degraded=False, with_deadline=with_deadline)
+            return self._build_response(raw_entities, has_pii, detection_path="segmented")
+
+        raw_entities, has_pii, detector, detection_result, path = await self._detect(text, allow_model=not degraded)
+        get_deadline_planner().record(path, degraded=degraded, with_deadline=with_deadline)
+
+        raw_predictions = None
+        if include_raw_predictions:
+            raw_predictions = []
+            if detector is not None:
+                raw_predictions = detector.raw_prediction_dicts(
+                    detection_result["raw_predictions"], limit=DEBUG_RAW_PREDICTION_LIMIT
+                )
+
+        return self._build_response(raw_entities, has_pii, raw_predictions, detection_path=path, degraded=degraded)
+
+    async def detect_entities(self, text: str) -> List[Dict[str, Any]]:
+        """결과 캐시를 거치지 않고 병합된 엔티티 dict 목록만 반환 (증분 스트리밍 세션용)"""
+        raw_entities, _, _, _, _ = await self._detect(text)
+        return raw_entities
+
+    async def _detect(
+        self, text: str, allow_model: bool = True
+    ) -> Tuple[List[Dict[str, Any]], bool, Any, Dict[str, Any], str]:
+        """
+        한 텍스트 단위 탐지
+
+        Args:
+            allow_model: False이면 정규식 단계만 실행 (마감 시간 초과 대비 degraded 경로)
+
+        Returns:
+            (병합된 엔티티 dict 목록, has_pii, 사용한 detector 또는 None, 모델 탐지 결과,
+             탐지 경로 model | cascade_skip | regex_only)
+        """
+        # 1단계: 정규식 (마이크로초 단위)
+        regex_entities = get_regex_detector().detect(text) if settings.REGEX_DETECTION_ENABLED else []
+
+        detector = None
+        detection_result: Dict[str, Any] = {"has_pii": False, "entities": [], "raw_predictions": None}
+        if not allow_model:
+            raw_entities, has_pii = self._merge(regex_entities, detection_result)
+            return raw_entities, has_pii, detector, detection_result, "regex_only"
+
+        # 2단계: 캐스케이드 게이트가 통과시킨 경우에만 모델 실행
+        gate = get_cascade_gate()
+        decision = gate.evaluate(text, regex_entities)
+
+        path = "cascade_skip"
+        if decision.run_model:
+            detector = get_pii_detector()
+            if detector is None:
+                raise RuntimeError("PII detector is not initialized.")
 
-        try:
             # PII 탐지 수행 (단 한 번)
-            detection_result: Dict[str, Any] = await detector.detect_pii(text)
-        except Exception:
-            # 필요 시 로깅/예외 변환
-            raise
+            started_at = perf_counter()
+            detection_result = await detector.detect_pii(text)
+            elapsed_ms = (perf_counter() - started_at) * 1000.0
+            gate.record_model_latency(elapsed_ms)
+            get_deadline_planner().observe(len(text), elapsed_ms)
+            path = "model"
+
+        raw_entities, has_pii = self._merge(regex_entities, detection_result)
+        return raw_entities, has_pii, detector, detection_result, path
 
+    def _merge(
+        self, regex_entities: List[Dict[str, Any]], detection_result: Dict[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """정규식 단계 결과를 우선하고, 겹치지 않는 NER 결과를 합친다"""
         # 안전 접근(get) 사용: 키 누락/형식 차이 방지
-        has_pii: bool = bool(detection_result.get("has_pii", False))
-        raw_entities: List[Dict[str, Any]] = detection_result.get("entities", [])
+        raw_entities: List[Dict[str, Any]] = merge_entities(regex_entities, detection_result.get("entities", []))
+        has_pii: bool = bool(detection_result.get("has_pii", False)) or bool(regex_entities)
+        return raw_entities, has_pii
+
+    async def analyze_batch(self, texts: List[str]) -> Tuple[List[PIIDetectionResponse], Dict[str, Any]]:
+        """
+        여러 텍스트를 한 번에 탐지
+
+        결과 캐시에 있는 항목은 재사용하고, 정규식/캐스케이드 게이트를 통과한
+        나머지 텍스트는 모아서 `detect_pii_batch`로 한 번에 추론한다(길이
+        버킷팅된 최소 횟수의 forward pass). 배치 항목은 짧은 텍스트를 전제로
+        하므로 세그먼트 캐시 경로는 사용하지 않는다.
+
+        Returns:
+            (입력 순서의 응답 목록, 단계별 처리 시간 ms 및 건수)
+        """
+        for text in texts:
+            if not isinstance(text, str) or not text.strip():
+                raise ValueError("text must be a non-empty string")
+
+        started_at = perf_counter()
+        detector = get_pii_detector()
+        cache = get_result_cache() if settings.PII_RESULT_CACHE_ENABLED else None
+        responses: List[PIIDetectionResponse | None] = [None] * len(texts)
+        keys: List[str | None] = [None] * len(texts)
+        # 이 요청이 계산해 채울 항목 / 다른 요청이 계산 중이라 결과를 기다릴 항목
+        owned: Dict[int, Optional[asyncio.Future]] = {}
+        waiting: Dict[int, asyncio.Future] = {}
+        generation = cache.invalidations if cache is not None else 0
+
+        # 1단계: 결과 캐시 (같은 텍스트를 계산 중인 요청이 있으면 그 결과를 기다림)
+        for i, text in enumerate(texts):
+            if cache is None:
+                owned[i] = None
+                continue
+            keys[i] = self._cache_key(text)
+            responses[i] = cache.lookup(keys[i])
+            if responses[i] is None:
+                future, is_owner = cache.join_or_reserve(keys[i])
+                if is_owner:
+                    owned[i] = future
+                else:
+                    waiting[i] = future
+        cache_done = perf_counter()
+
+        # 2~3단계는 별도 태스크에서 실행: 이 요청이 취소되어도 같은 텍스트를 기다리는 요청은 결과를 받음
+        stage_ms: Dict[str, Any] = {"regex_gate_ms": 0.0, "model_ms": 0.0, "build_ms": 0.0, "model_items": 0}
+        if owned:
+            task = asyncio.get_running_loop().create_task(
+                self._detect_batch_items(texts, owned, keys, generation, detector, cache)
+            )
+            # 호출자가 먼저 취소되어도 태스크 예외가 "never retrieved" 경고로 남지 않도록 소비
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            computed, stage_ms = await asyncio.shield(task)
+            for i, response in computed.items():
+                responses[i] = response
+        for i, future in waiting.items():
+            responses[i] = await asyncio.shield(future)
+        finished_at = perf_counter()
+
+        timing = {
+            "items": len(texts),
+            "cache_hits": len(texts) - len(owned),
+            "model_items": stage_ms["model_items"],
+            "cache_ms": (cache_done - started_at) * 1000.0,
+            "regex_gate_ms": stage_ms["regex_gate_ms"],
+            "model_ms": stage_ms["model_ms"],
+            "build_ms": stage_ms["build_ms"],
+            "detection_ms": (finished_at - started_at) * 1000.0,
+        }
+        return responses, timing
+
+    async def _detect_batch_items(
+        self,
+        texts: List[str],
+        owned: Dict[int, Optional[asyncio.Future]],
+        keys: List[Optional[str]],
+        generation: int,
+        detector: Any,
+        cache: Any,
+    ) -> Tuple[Dict[int, PIIDetectionResponse], Dict[str, Any]]:
+        """
+        캐시에 없는 배치 항목을 정규식 → 캐스케이드 게이트 → 한 번의 모델 배치 추론으로 탐지
+
+        결과는 계산을 시작할 때의 캐시 세대가 그대로일 때만 저장하고, 실패하면
+        같은 텍스트를 기다리는 요청에도 예외를 전달한다.
+        """
+        try:
+            started_at = perf_counter()
+            # 2단계: 정규식 + 캐스케이드 게이트
+            gate = get_cascade_gate()
+            regex_entities: Dict[int, List[Dict[str, Any]]] = {}
+            model_items: List[int] = []
+            for i in owned:
+                regex_entities[i] = get_regex_detector().detect(texts[i]) if settings.REGEX_DETECTION_ENABLED else []
+                if gate.evaluate(texts[i], regex_entities[i]).run_model:
+                    model_items.append(i)
+            regex_done = perf_counter()
+
+            # 3단계: 남은 텍스트를 한 번에 모델 추론
+            # (배치 시간은 텍스트 한 건의 모델 시간이 아니므로 게이트 지연 통계에는 반영하지 않음)
+            detection_results: Dict[int, Dict[str, Any]] = {}
+            if model_items:
+                batch_results = await detector.detect_pii_batch([texts[i] for i in model_items])
+                detection_results = dict(zip(model_items, batch_results))
+            model_done = perf_counter()
+
+            empty_result: Dict[str, Any] = {"has_pii": False, "entities": []}
+            responses: Dict[int, PIIDetectionResponse] = {}
+            for i, future in owned.items():
+                raw_entities, has_pii = self._merge(regex_entities[i], detection_results.get(i, empty_result))
+                path = "model" if i in detection_results else "cascade_skip"
+                responses[i] = self._build_response(raw_entities, has_pii, detection_path=path)
+                if future is not None:
+                    cache.resolve(keys[i], future, responses[i], len(keys[i]) + len(responses[i].model_dump_json()), generation)
+            finished_at = perf_counter()
+        except BaseException as e:
+            for future in owned.values():
+                if future is not None and not future.done():
+                    future.set_exception(e if isinstance(e, Exception) else RuntimeError("batch detection was cancelled"))
+            raise
+
+        return responses, {
+            "regex_gate_ms": (regex_done - started_at) * 1000.0,
+            "model_ms": (model_done - regex_done) * 1000.0,
+            "build_ms": (finished_at - model_done) * 1000.0,
+            "model_items": len(model_items),
+        }
+
+    async def _detect_segmented(self, text: str) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        세그먼트 단위 탐지
+
+        세그먼트별 결과(세그먼트 기준 오프셋)를 캐시하고, 캐시에 없는 세그먼트만
+        동시에 탐지한다(마이크로 배처가 하나의 forward pass로 묶음). 결과는
+        원문 기준 오프셋으로 옮겨 합친다.
+        """
+        cache = get_segment_cache()
+        segments = split_segments(text, settings.PII_SEGMENT_TARGET_CHARS)
+
+        async def detect_segment(segment: str) -> Tuple[List[Dict[str, Any]], bool]:
+            raw_entities, has_pii, _, _, _ = await self._detect(segment)
+            return raw_entities, has_pii
+
+        results = await asyncio.gather(*(
+            cache.get_or_compute(
+                self._cache_key(segment),
+                lambda segment=segment: detect_segment(segment),
+                size_of=lambda result: 64 + len(json.dumps(result[0], ensure_ascii=False)),
+            )
+            for _, segment in segments
+        ))
+
+        raw_entities: List[Dict[str, Any]] = []
+        has_pii = False
+        for (offset, _), (segment_entities, segment_has_pii) in zip(segments, results):
+            has_pii = has_pii or segment_has_pii
+            for e in segment_entities:
+                # 캐시된 dict는 공유되므로 복사 후 오프셋 이동
+                shifted = dict(e)
+                if shifted.get("start") is not None:
+                    shifted["start"] += offset
+                    shifted["end"] += offset
+                raw_entities.append(shifted)
+        return raw_entities, has_pii
+
+    async def analyze_stream(
+        self,
+        records: AsyncIterator[Tuple[Optional[str], Optional[str], Optional[str]]],
+        chunk_size: int = 64,
+        max_in_flight: int = 4,
+        lane: Optional[str] = None,
+    ) -> AsyncIterator[List[Tuple[Optional[str], Optional[str], Optional[PIIDetectionResponse], Optional[str]]]]:
+        """
+        레코드 스트림을 청크 단위로 일괄 탐지하여 입력 순서대로 돌려준다
+
+        최대 max_in_flight개의 청크만 동시에 처리하고, 그 이상은 앞 청크의
+        결과를 내보낸 뒤에 읽으므로 메모리 사용량은 전체 데이터 크기와
+        무관하게 제한된다.
+
+        Args:
+            records: (id, text, error) 비동기 이터레이터. 파싱에 실패한 레코드는 error만 채운다.
+            lane: 지정하면 청크마다 승인 제어 레인의 슬롯을 기다린 뒤 탐지 (거절 없이 대기)
+
+        Yields:
+            청크별 [(id, text, 응답 또는 None, 오류 메시지 또는 None)] 목록
+        """
+        async def run(chunk):
+            valid = [i for i, (_, text, error) in enumerate(chunk) if error is None and text and text.strip()]
+            responses: Dict[int, PIIDetectionResponse] = {}
+            if valid:
+                if lane is not None:
+                    async with get_admission_controller().admit(lane, bounded=False):
+                        batch_responses, _ = await self.analyze_batch([chunk[i][1] for i in valid])
+                else:
+                    batch_responses, _ = await self.analyze_batch([chunk[i][1] for i in valid])
+                responses = dict(zip(valid, batch_responses))
+            results = []
+            for i, (item_id, text, error) in enumerate(chunk):
+                if error is None and i not in responses:
+                    error = "입력 텍스트가 비어있습니다."
+                results.append((item_id, text, responses.get(i), error))
+            return results
+
+        in_flight: deque = deque()
+        chunk = []
+        try:
+            async for record in records:
+                chunk.append(record)
+                if len(chunk) < chunk_size:
+                    continue
+                in_flight.append(asyncio.create_task(run(chunk)))
+                chunk = []
+                # 한도에 도달했거나 이미 끝난 앞 청크는 순서대로 내보냄
+                while in_flight and (len(in_flight) >= max_in_flight or in_flight[0].done()):
+                    yield await in_flight.popleft()
+            if chunk:
+                in_flight.append(asyncio.create_task(run(chunk)))
+            while in_flight:
+                yield await in_flight.popleft()
+        finally:
+            # 클라이언트 연결 종료 등으로 중단되면 남은 청크 취소
+            for task in in_flight:
+                task.cancel()
+
+    def _build_response(
+        self,
+        raw_entities: List[Dict[str, Any]],
+        has_pii: bool,
+        raw_predictions: List[Dict[str, Any]] | None = None,
+        detection_path: str | None = None,
+        degraded: bool = False,
+    ) -> PIIDetectionResponse:
+        """엔티티 dict 목록으로 응답 생성"""
         entities: List[DetectedEntity] = [
             DetectedEntity(
                 type=e.get("type", "UNKNOWN"),
                 value=e.get("value", ""),
                 confidence=float(e.get("confidence", 0.0)),
                 token_count=int(e.get("token_count", 0)),
+                start=e.get("start"),
+                end=e.get("end"),
+                source=e.get("source"),
             )
             for e in raw_entities
         ]
@@ -45,6 +452,9 @@ class PIIDetectionService:
             reason=reason,
             details=details,
             entities=entities,
+            detection_path=detection_path,
+            degraded=degraded,
+            debug_raw_predictions=raw_predictions,
         )
 
     def _generate_reason(self, has_pii: bool, entities: List[DetectedEntity]) -> str:
@@ -0,0 +1,143 @@
+"""
+증분 PII 탐지 세션 (LLM 응답 스트림용)
+
+텍스트 조각(delta)을 받을 때마다 전체 응답이 아니라 "왼쪽 문맥 + 아직
+확정되지 않은 꼬리"만 다시 탐지한다. 끝에서 holdback 글자 이상 떨어진
+위치까지는 뒤에 어떤 텍스트가 와도 결과가 바뀌지 않는다고 보고 확정하며,
+확정 구간 안의 엔티티는 즉시 이벤트로 내보낸다. 게이트웨이는 commit 오프셋
+까지의 텍스트를 (엔티티를 차단/마스킹한 뒤) 바로 흘려보낼 수 있다.
+
+오프셋은 모두 스트림 시작 기준 문자 위치다.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+from app.ai.admission import get_admission_controller
+from app.core.config import settings
+from app.schemas.pii import DetectedEntity
+from app.services.pii_service import PIIDetectionService
+
+logger = logging.getLogger(__name__)
+
+
+class PIIStreamSession:
+    """스트리밍 텍스트 한 건에 대한 증분 탐지 상태"""
+
+    def __init__(
+        self,
+        service: PIIDetectionService,
+        context_chars: Optional[int] = None,
+        holdback_chars: Optional[int] = None,
+        min_step_chars: Optional[int] = None,
+        max_pending_chars: Optional[int] = None,
+        lane: Optional[str] = None,
+    ):
+        self.service = service
+        # 지정하면 탐지마다 승인 제어 레인의 슬롯을 기다림 (거절 없이 대기)
+        self.lane = lane
+        self.context_chars = context_chars if context_chars is not None else settings.PII_STREAM_SESSION_CONTEXT_CHARS
+        self.holdback_chars = holdback_chars if holdback_chars is not None else settings.PII_STREAM_SESSION_HOLDBACK_CHARS
+        self.min_step_chars = min_step_chars if min_step_chars is not None else settings.PII_STREAM_SESSION_MIN_STEP_CHARS
+        self.max_pending_chars = (
+            max_pending_chars if max_pending_chars is not None else settings.PII_STREAM_SESSION_MAX_PENDING_CHARS
+        )
+
+        self.buffer = ""  # 왼쪽 문맥 + 미확정 꼬리
+        self.buffer_start = 0  # buffer[0]의 스트림 기준 오프셋
+        self.committed = 0  # 여기까지는 확정됨 (스트림 기준)
+        self.received = 0  # 지금까지 받은 전체 글자 수
+        self.detected_until = 0  # 마지막 탐지 시점의 received
+        self.entity_count = 0
+        self.entity_types: set[str] = set()
+        self.detection_runs = 0
+
+    async def feed(self, delta: str) -> List[Dict[str, Any]]:
+        """텍스트 조각을 추가하고, 새로 확정된 엔티티/commit 이벤트를 반환"""
+        if not delta:
+            return []
+        self.buffer += delta
+        self.received += len(delta)
+        if self.received - self.detected_until < self.min_step_chars:
+            return []
+        return await self._detect(final=False)
+
+    async def finish(self) -> List[Dict[str, Any]]:
+        """스트림 종료: 남은 꼬리를 모두 확정하고 end 이벤트까지 반환"""
+        events = await self._detect(final=True) if self.committed < self.received else []
+        events.append({
+            "type": "end",
+            "length": self.received,
+            "has_pii": self.entity_count > 0,
+            "entity_count": self.entity_count,
+            "entity_types": sorted(self.entity_types),
+            "detection_runs": self.detection_runs,
+        })
+        return events
+
+    async def _detect(self, final: bool) -> List[Dict[str, Any]]:
+        self.detected_until = self.received
+        self.detection_runs += 1
+        entities = await self._detect_entities() if self.buffer.strip() else []
+        entities = [e for e in entities if e.get("start") is not None]
+
+        # 끝에서 holdback 이내는 뒤에 오는 텍스트에 따라 엔티티가 늘어날 수 있으므로 보류
+        forced = len(self.buffer) - (self.committed - self.buffer_start) > self.max_pending_chars
+        safe = len(self.buffer) if final else max(0, len(self.buffer) - self.holdback_chars)
+        local_committed = self.committed - self.buffer_start
+
+        confirmed = []
+        for e in sorted(entities, key=lambda e: e["start"]):
+            if e["start"] < local_committed:
+                continue  # 이미 확정된 구간 (이전에 내보냄)
+            if e["end"] <= safe:
+                confirmed.append(e)
+            elif e["start"] < safe:
+                if forced:
+                    # 미확정 꼬리가 너무 길어지면 걸쳐 있는 엔티티도 확정
+                    confirmed.append(e)
+                    safe = e["end"]
+                else:
+                    # 확정 경계가 엔티티를 자르지 않도록 엔티티 앞에서 멈춤
+                    safe = e["start"]
+                break
+
+        events: List[Dict[str, Any]] = []
+        for e in confirmed:
+            entity = DetectedEntity(
+                type=e.get("type", "UNKNOWN"),
+                value=e.get("value", ""),
+                confidence=float(e.get("confidence", 0.0)),
+                token_count=int(e.get("token_count", 0)),
+                start=e["start"] + self.buffer_start,
+                end=e["end"] + self.buffer_start,
+                source=e.get("source"),
+            )
+            self.entity_count += 1
+            self.entity_types.add(entity.type)
+            events.append({"type": "entity", "entity": entity.model_dump(exclude_none=True)})
+
+        if safe > local_committed:
+            self.committed = self.buffer_start + safe
+            events.append({"type": "commit", "offset": self.committed})
+
+        # 확정 지점 앞으로 context_chars만 남기고 버퍼를 잘라 메모리/추론 길이를 제한
+        trim = max(0, (self.committed - self.buffer_start) - self.context_chars)
+        if trim:
+            self.buffer = self.buffer[trim:]
+            self.buffer_start += trim
+        return events
+
+    async def _detect_entities(self) -> List[Dict[str, Any]]:
+        if self.lane is None:
+            return await self.service.detect_entities(self.buffer)
+        async with get_admission_controller().admit(self.lane, bounded=False):
+            return await self.service.detect_entities(self.buffer)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "committed": self.committed,
+            "buffered": len(self.buffer),
+            "entity_count": self.entity_count,
+            "detection_runs": self.detection_runs,
+        }
@@ -1,35 +1,40 @@
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, List, Dict, Any, Optional
 import re
-from transformers import AutoTokenizer
+import numpy as np
+
+if TYPE_CHECKING:
+    # 타입 힌트 전용 (앱 import 시 transformers를 불러오지 않음)
+    from transformers import AutoTokenizer
 
 def extract_bio_entities(
     predictions: List[Dict[str, Any]], 
-    tokenizer: Optional[AutoTokenizer] = None,
+    tokenizer: Optional["AutoTokenizer"] = None,
     original_text: str = ""
 ) -> List[Dict[str, Any]]:
     """
     BIO 태그 예측 결과에서 엔티티를 추출
     
     Args:
-        predictions: 토큰별 예측 결과 [{"token": str, "label": str, "confidence": float}]
-        tokenizer: 토큰을 문자열로 변환하기 위한 토크나이저
-        original_text: 원본 텍스트 (위치 정보 계산용)
+        predictions: 토큰별 예측 결과 [{"token": str, "label": str, "confidence": float,
+                     "start": int, "end": int}] (start/end는 fast tokenizer offset_mapping 기준 문자 위치)
+        tokenizer: 토큰을 문자열로 변환하기 위한 토크나이저 (offset이 없을 때만 사용)
+        original_text: 원본 텍스트 (offset이 있으면 값을 원본에서 그대로 잘라냄)
     
     Returns:
-        List of entities: [{"type": str, "value": str, "confidence": float, "token_count": int}]
+        List of entities: [{"type": str, "value": str, "confidence": float, "token_count": int,
+                            "start": int | None, "end": int | None}]
     """
     entities = []
     current_entity = None
     
     for i, pred in enumerate(predictions):
         label = pred["label"]
-        token = pred["token"]
-        confidence = pred["confidence"]
         
         # O 태그나 UNKNOWN 태그는 무시
         if label in ["O", "UNKNOWN", "UNK"] or not label:
             if current_entity:
-                entities.append(_finalize_entity(current_entity, tokenizer))
+                entities.append(_finalize_entity(current_entity, tokenizer, original_text))
                 current_entity = None
             continue
         
@@ -42,21 +47,13 @@ def extract_bio_entities(
                 current_entity["type"] == entity_type and 
                 _is_consecutive_tokens(current_entity, pred, predictions, i)):
                 # 연속된 같은 타입이면 합치기
-                current_entity["tokens"].append(token)
-                current_entity["confidences"].append(confidence)
-                current_entity["positions"].append(pred.get("position", i))
+                _extend_entity(current_entity, pred, i)
             else:
                 # 다른 타입이거나 연속되지 않은 경우 새로운 엔티티 시작
                 if current_entity:
-                    entities.append(_finalize_entity(current_entity, tokenizer))
+                    entities.append(_finalize_entity(current_entity, tokenizer, original_text))
                 
-                current_entity = {
-                    "type": entity_type,
-                    "tokens": [token],
-                    "confidences": [confidence],
-                    "start_idx": i,
-                    "positions": [pred.get("position", i)]
-                }
+                current_entity = _new_entity(entity_type, pred, i)
             
         elif label.startswith("I-"):
             # 기존 엔티티 확장
@@ -64,41 +61,48 @@ def extract_bio_entities(
             
             if current_entity and current_entity["type"] == entity_type:
                 # 같은 타입의 엔티티라면 확장
-                current_entity["tokens"].append(token)
-                current_entity["confidences"].append(confidence)
-                current_entity["positions"].append(pred.get("position", i))
+                _extend_entity(current_entity, pred, i)
             else:
                 # 타입이 다르거나 current_entity가 없다면 새로 시작
                 if current_entity:
-                    entities.append(_finalize_entity(current_entity, tokenizer))
+                    entities.append(_finalize_entity(current_entity, tokenizer, original_text))
                 
-                current_entity = {
-                    "type": entity_type,
-                    "tokens": [token],
-                    "confidences": [confidence],
-                    "start_idx": i,
-                    "positions": [pred.get("position", i)]
-                }
+                current_entity = _new_entity(entity_type, pred, i)
         else:
             # 완전히 다른 형태의 태그 (BIO가 아닌 경우)
             if current_entity:
-                entities.append(_finalize_entity(current_entity, tokenizer))
+                entities.append(_finalize_entity(current_entity, tokenizer, original_text))
                 current_entity = None
             
             # 단독 엔티티로 처리
-            entities.append({
-                "type": label,
-                "value": _clean_token_value([token], tokenizer, label),
-                "confidence": confidence,
-                "token_count": 1
-            })
+            entities.append(_finalize_entity(_new_entity(label, pred, i), tokenizer, original_text))
     
     # 마지막 엔티티 처리
     if current_entity:
-        entities.append(_finalize_entity(current_entity, tokenizer))
+        entities.append(_finalize_entity(current_entity, tokenizer, original_text))
     
     return entities
 
+def _new_entity(entity_type: str, pred: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """토큰 하나로 새 엔티티 시작"""
+    return {
+        "type": entity_type,
+        "tokens": [pred["token"]],
+        "confidences": [pred["confidence"]],
+        "start_idx": index,
+        "positions": [pred.get("position", index)],
+        "start": pred.get("start"),
+        "end": pred.get("end"),
+    }
+
+def _extend_entity(entity: Dict[str, Any], pred: Dict[str, Any], index: int) -> None:
+    """엔티티에 토큰 추가 (문자 구간은 마지막 토큰의 끝까지 확장)"""
+    entity["tokens"].append(pred["token"])
+    entity["confidences"].append(pred["confidence"])
+    entity["positions"].append(pred.get("position", index))
+    if pred.get("end") is not None:
+        entity["end"] = pred["end"]
+
 def _is_consecutive_tokens(current_entity: Dict[str, Any], pred: Dict[str, Any], 
                           predictions: List[Dict[str, Any]], current_idx: int) -> bool:
     """
@@ -114,13 +118,24 @@ def _is_consecutive_tokens(current_entity: Dict[str, Any], pred: Dict[str, Any],
     # 위치가 연속되는지 확인 (1 차이)
     return current_position == last_position + 1
 
-def _finalize_entity(entity: Dict[str, Any], tokenizer: Optional[AutoTokenizer] = None) -> Dict[str, Any]:
+def _finalize_entity(
+    entity: Dict[str, Any],
+    tokenizer: Optional["AutoTokenizer"] = None,
+    original_text: str = ""
+) -> Dict[str, Any]:
     """엔티티 정보 완성"""
     tokens = entity["tokens"]
     entity_type = entity["type"]
+    start = entity.get("start")
+    end = entity.get("end")
     
-    # 토큰들을 문자열로 변환
-    value = _clean_token_value(tokens, tokenizer, entity_type)
+    if original_text and start is not None and end is not None:
+        # offset이 있으면 원본 텍스트에서 정확한 구간을 그대로 사용
+        value = original_text[start:end]
+    else:
+        # 토큰들을 문자열로 변환 (offset 없는 예측 결과 호환)
+        value = _clean_token_value(tokens, tokenizer, entity_type)
+        start = end = None
     
     # 평균 신뢰도 계산
     avg_confidence = sum(entity["confidences"]) / len(entity["confidences"])
@@ -129,10 +144,12 @@ def _finalize_entity(entity: Dict[str, Any], tokenizer: Optional[AutoTokenizer]
         "type": entity_type,
         "value": value,
         "confidence": avg_confidence,
-        "token_count": len(tokens)
+        "token_count": len(tokens),
+        "start": start,
+        "end": end,
     }
 
-def _clean_token_value(tokens: List[str], tokenizer: Optional[AutoTokenizer] = None, entity_type: str = "") -> str:
+def _clean_token_value(tokens: List[str], tokenizer: Optional["AutoTokenizer"] = None, entity_type: str = "") -> str:
     """
     토큰들을 깔끔한 문자열로 변환
     
@@ -201,6 +218,182 @@ def _post_process_by_type(value: str, entity_type: str) -> str:
     
     return value
 
+# ---------------------------------------------------------------------------
+# 배열 기반 BIO 디코더
+# ---------------------------------------------------------------------------
+
+@dataclass
+class TokenPredictions:
+    """
+    한 텍스트의 토큰별 예측 결과 (NumPy 배열)
+
+    - input_ids: 토큰 ID (n,)
+    - label_ids: argmax 라벨 ID (n,)
+    - confidences: 예측 라벨의 softmax 확률 (n,)
+    - offsets: 원본 텍스트 문자 구간 [start, end) (n, 2)
+    - valid: 예측이 존재하고 특수 토큰이 아닌 위치 (n,)
+    """
+    input_ids: np.ndarray
+    label_ids: np.ndarray
+    confidences: np.ndarray
+    offsets: np.ndarray
+    valid: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.valid.sum())
+
+    def to_dicts(
+        self,
+        convert_ids_to_tokens: Callable[[List[int]], List[str]],
+        id2label: Dict[int, str],
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """디버그/호환용 토큰별 dict 목록 (extract_bio_entities 입력 형식)"""
+        indices = np.flatnonzero(self.valid)
+        if limit is not None:
+            indices = indices[:limit]
+        tokens = convert_ids_to_tokens(self.input_ids[indices].tolist())
+        return [
+            {
+                "token": token,
+                "label": id2label[int(self.label_ids[i])],
+                "confidence": float(self.confidences[i]),
+                "position": int(i) + 1,
+                "start": int(self.offsets[i, 0]),
+                "end": int(self.offsets[i, 1]),
+            }
+            for token, i in zip(tokens, indices)
+        ]
+
+
+class BIOLabelTable:
+    """id2label을 배열 조회 테이블로 변환 (라벨 ID -> 엔티티 타입 인덱스)"""
+
+    def __init__(self, id2label: Dict[int, str]):
+        size = max(int(k) for k in id2label) + 1
+        self.type_names: List[str] = []
+        self.type_ids = np.full(size, -1, dtype=np.int64)
+        # BIO가 아닌 라벨은 토큰 하나가 곧 엔티티 하나
+        self.single = np.zeros(size, dtype=bool)
+
+        type_index: Dict[str, int] = {}
+        for label_id, label in id2label.items():
+            label_id = int(label_id)
+            if not label or label in ["O", "UNKNOWN", "UNK"]:
+                continue
+            if label.startswith(("B-", "I-")):
+                entity_type = label[2:]
+            else:
+                entity_type = label
+                self.single[label_id] = True
+            if entity_type not in type_index:
+                type_index[entity_type] = len(self.type_names)
+                self.type_names.append(entity_type)
+            self.type_ids[label_id] = type_index[entity_type]
+
+
+def decode_bio_spans(
+    predictions: List[TokenPredictions],
+    table: BIOLabelTable,
+) -> List[List[Dict[str, Any]]]:
+    """
+    배치 전체의 예측 배열에서 엔티티 구간을 배열 연산으로 추출
+
+    extract_bio_entities와 같은 규칙을 따른다: 같은 타입의 연속된 B/I 토큰은
+    하나의 엔티티로 합치고, O/유효하지 않은 위치/타입 변경에서 끊으며,
+    BIO가 아닌 라벨은 토큰 하나를 단독 엔티티로 만든다.
+
+    Returns:
+        텍스트별 span 목록 [{"type", "start", "end", "confidence", "token_count",
+                              "token_start", "token_end"}] (start/end는 문자 위치)
+    """
+    if not predictions:
+        return []
+
+    # 텍스트 사이에 -1(O)을 하나씩 끼워 넣어 배치를 한 배열로 이어 붙인다
+    lengths = np.array([len(p.label_ids) for p in predictions], dtype=np.int64)
+    row_starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+    separator = np.array([-1], dtype=np.int64)
+
+    types = np.concatenate([
+        part
+        for p in predictions
+        for part in (np.where(p.valid, table.type_ids[p.label_ids], -1), separator)
+    ])
+    single = np.concatenate([
+        part
+        for p in predictions
+        for part in (p.valid & table.single[p.label_ids], separator.astype(bool))
+    ])
+    confidences = np.concatenate([
+        part for p in predictions for part in (p.confidences.astype(np.float64), separator * 0.0)
+    ])
+
+    is_entity = types >= 0
+    prev_types = np.concatenate(([-1], types[:-1]))
+    prev_single = np.concatenate(([False], single[:-1]))
+    starts_mask = is_entity & ((types != prev_types) | single | prev_single)
+    next_start = np.concatenate((starts_mask[1:], [True]))
+    next_entity = np.concatenate((is_entity[1:], [False]))
+    ends_mask = is_entity & (next_start | ~next_entity)
+
+    span_starts = np.flatnonzero(starts_mask)
+    span_ends = np.flatnonzero(ends_mask)
+    cumulative = np.concatenate(([0.0], np.cumsum(confidences)))
+    token_counts = span_ends - span_starts + 1
+    mean_confidences = (cumulative[span_ends + 1] - cumulative[span_starts]) / token_counts
+    span_rows = np.searchsorted(row_starts, span_starts, side="right") - 1
+
+    results: List[List[Dict[str, Any]]] = [[] for _ in predictions]
+    for row, start, end, count, confidence in zip(
+        span_rows.tolist(), span_starts.tolist(), span_ends.tolist(),
+        token_counts.tolist(), mean_confidences.tolist(),
+    ):
+        offsets = predictions[row].offsets
+        local_start = start - int(row_starts[row])
+        local_end = end - int(row_starts[row])
+        results[row].append({
+            "type": table.type_names[types[start]],
+            "start": int(offsets[local_start, 0]),
+            "end": int(offsets[local_end, 1]),
+            "confidence": confidence,
+            "token_count": count,
+            "token_start": local_start,
+            "token_end": local_end,
+        })
+    return results
+
+def spans_to_entities(spans: List[Dict[str, Any]], original_text: str) -> List[Dict[str, Any]]:
+    """span 목록을 원본 텍스트에서 값을 잘라낸 엔티티 목록으로 변환"""
+    return [
+        {
+            "type": span["type"],
+            "value": original_text[span["start"]:span["end"]],
+            "confidence": span["confidence"],
+            "token_count": span["token_count"],
+            "start": span["start"],
+            "end": span["end"],
+            "source": "ner",
+        }
+        for span in spans
+    ]
+
+def merge_entities(primary: List[Dict[str, Any]], secondary: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    두 탐지 결과를 병합
+
+    primary 엔티티와 문자 구간이 겹치는 secondary 엔티티는 버리고,
+    결과는 시작 위치 순으로 정렬한다 (위치가 없는 엔티티는 뒤에 둔다).
+    """
+    taken = [(e["start"], e["end"]) for e in primary if e.get("start") is not None]
+    merged = list(primary)
+    for entity in secondary:
+        start, end = entity.get("start"), entity.get("end")
+        if start is not None and any(start < t_end and t_start < end for t_start, t_end in taken):
+            continue
+        merged.append(entity)
+    return sorted(merged, key=lambda e: (e.get("start") is None, e.get("start") or 0))
+
 # 역호환성을 위한 함수들
 def has_pii_entities(entities: List[Dict[str, Any]]) -> bool:
     """PII 엔티티가 존재하는지 확인"""
@@ -0,0 +1,33 @@
+# app/utils/text_segmenter.py
+"""
+대화 기록(transcript) 분할
+
+턴(줄바꿈)과 문장 경계에서 텍스트를 자른 뒤, 앞에서부터 순서대로 조각을
+묶어 목표 길이 이상의 세그먼트를 만든다. 앞부분이 같은 두 텍스트는 같은
+세그먼트 경계를 가지므로, 이전 호출과 겹치는 접두부는 세그먼트 해시가
+그대로 유지되고 새로 붙은 꼬리 부분만 달라진다.
+"""
+import re
+from typing import List, Tuple
+
+# 줄바꿈(턴 경계) 또는 문장 종결 부호 뒤의 공백
+_BOUNDARY = re.compile(r"\n+|(?<=[.!?。])[ \t]+")
+
+
+def split_segments(text: str, target_chars: int = 256) -> List[Tuple[int, str]]:
+    """
+    텍스트를 (원문 기준 시작 오프셋, 세그먼트) 목록으로 분할
+
+    세그먼트를 이어 붙이면 원문과 정확히 같다. 경계 문자(줄바꿈/공백)는
+    앞 세그먼트 끝에 포함된다.
+    """
+    segments: List[Tuple[int, str]] = []
+    segment_start = 0
+    for boundary in _BOUNDARY.finditer(text):
+        end = boundary.end()
+        if end - segment_start >= target_chars:
+            segments.append((segment_start, text[segment_start:end]))
+            segment_start = end
+    if segment_start < len(text):
+        segments.append((segment_start, text[segment_start:]))
+    return segments
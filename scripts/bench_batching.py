@@ -0,0 +1,84 @@
+"""
+마이크로 배칭 처리량 벤치마크
+
+동시 클라이언트 수(32/64/128)별로 배칭 on/off 상태의 처리량을 비교하고,
+배칭 결과가 단건 추론 결과와 동일한지 함께 검증한다.
+
+    uv run python scripts/bench_batching.py --requests 256
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai.batching import MicroBatcher  # noqa: E402
+from app.ai.pii_detector import RobertaKoreanPIIDetector  # noqa: E402
+
+SAMPLE_TEXTS = [
+    "제 이름은 홍길동이고 전화번호는 010-1234-5678입니다",
+    "회의는 내일 오전 10시에 3층 회의실에서 진행합니다.",
+    "김철수 고객님의 이메일 주소는 chulsoo.kim@example.com 입니다.",
+    "서울특별시 강남구 테헤란로 123, 101동 202호로 배송해 주세요.",
+    "이번 분기 매출 보고서를 첨부합니다. 검토 부탁드립니다.",
+    "계좌번호 110-123-456789 (신한은행, 예금주 이영희)로 입금 바랍니다.",
+]
+
+
+def _entities_key(result: dict) -> list:
+    return [(e["type"], e["value"], round(e["confidence"], 4)) for e in result["entities"]]
+
+
+async def _run_clients(detector: RobertaKoreanPIIDetector, clients: int, total: int) -> float:
+    """clients개의 동시 클라이언트가 total건을 나눠서 요청한 뒤 처리량(req/s)을 반환"""
+    counter = iter(range(total))
+
+    async def client():
+        for i in counter:
+            await detector.detect_pii(SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return total / (time.perf_counter() - started)
+
+
+async def main(args: argparse.Namespace) -> None:
+    detector = RobertaKoreanPIIDetector()
+    batcher = MicroBatcher(
+        detector._predict_batch,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        runner=detector.executor.run,
+        max_in_flight=detector.executor.max_workers,
+    )
+
+    # 정합성 검증: 배칭 결과 == 단건 결과
+    detector.batcher = None
+    expected = [_entities_key(await detector.detect_pii(t)) for t in SAMPLE_TEXTS]
+    detector.batcher = batcher
+    actual = [_entities_key(r) for r in await asyncio.gather(*(detector.detect_pii(t) for t in SAMPLE_TEXTS))]
+    print(f"parity: {'OK' if expected == actual else 'MISMATCH'}")
+
+    print(f"{'clients':>8} {'unbatched req/s':>16} {'batched req/s':>14} {'avg batch':>10}")
+    for clients in args.clients:
+        detector.batcher = None
+        unbatched = await _run_clients(detector, clients, args.requests)
+
+        batcher.batches_run = batcher.items_processed = 0
+        detector.batcher = batcher
+        batched = await _run_clients(detector, clients, args.requests)
+
+        print(f"{clients:>8} {unbatched:>16.1f} {batched:>14.1f} {batcher.stats()['avg_batch_size']:>10.1f}")
+
+    batcher.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--requests", type=int, default=256, help="동시성 단계별 총 요청 수")
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,82 @@
+"""
+콜드 스타트 벤치마크
+
+서버 프로세스를 새로 띄워 프로세스 시작부터 첫 응답(GET /)까지의 시간과
+모델 준비 완료(GET /ready가 200)까지의 시간을 잰다. 모델 로딩을 startup에서
+기다리는 모드(PII_BACKGROUND_MODEL_LOADING=False)와 백그라운드 로딩 모드를
+차례로 측정해 비교한다. `import app.main` 자체에 걸리는 시간도 함께 출력한다.
+
+    uv run python scripts/bench_cold_start.py --runs 3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def _import_seconds() -> float:
+    """새 인터프리터에서 app.main import 시간"""
+    code = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def _status(url: str) -> int | None:
+    try:
+        with urllib.request.urlopen(url, timeout=1.0) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return None
+
+
+def _measure(port: int, background: bool, timeout: float) -> tuple[float | None, float | None]:
+    """(첫 응답까지 초, 모델 준비까지 초)"""
+    env = dict(os.environ, PII_BACKGROUND_MODEL_LOADING=str(background))
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    first_response = ready = None
+    try:
+        while time.perf_counter() - started < timeout:
+            if first_response is None and _status(f"http://127.0.0.1:{port}/") == 200:
+                first_response = time.perf_counter() - started
+            if first_response is not None and _status(f"http://127.0.0.1:{port}/ready") == 200:
+                ready = time.perf_counter() - started
+                break
+            time.sleep(0.05)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+    return first_response, ready
+
+
+def _fmt(seconds: float | None) -> str:
+    return f"{seconds:.2f}s" if seconds is not None else "timeout"
+
+
+def main(args: argparse.Namespace) -> None:
+    print(f"import app.main: {_import_seconds():.2f}s")
+    print(f"{'mode':>12} {'run':>4} {'first response':>15} {'model ready':>12}")
+    for background in (False, True):
+        mode = "background" if background else "blocking"
+        for run in range(args.runs):
+            first_response, ready = _measure(args.port, background, args.timeout)
+            print(f"{mode:>12} {run + 1:>4} {_fmt(first_response):>15} {_fmt(ready):>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    main(parser.parse_args())
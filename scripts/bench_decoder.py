@@ -0,0 +1,107 @@
+"""
+BIO 디코더 마이크로벤치마크: dict 기반 경로 vs 배열 기반 경로
+
+모델 없이 합성 예측 배열을 만들어, 기존 경로(토큰별 dict 생성 +
+extract_bio_entities)와 배열 기반 decode_bio_spans의 처리 시간을 비교하고
+두 경로의 엔티티 구간이 같은지 확인한다.
+
+    uv run python scripts/bench_decoder.py --tokens 512 2048 8192 --batch 16
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.entity_extractor import (  # noqa: E402
+    BIOLabelTable,
+    TokenPredictions,
+    decode_bio_spans,
+    extract_bio_entities,
+)
+
+ID2LABEL = {0: "O", 1: "B-NAME", 2: "I-NAME", 3: "B-PHONE_NUM", 4: "I-PHONE_NUM", 5: "B-ADDRESS", 6: "I-ADDRESS"}
+
+
+def _synthetic(num_tokens: int, rng: np.random.Generator) -> TokenPredictions:
+    # 대부분 O, 가끔 2~6 토큰짜리 엔티티
+    label_ids = np.zeros(num_tokens, dtype=np.int64)
+    i = 0
+    while i < num_tokens:
+        if rng.random() < 0.05:
+            entity = int(rng.integers(0, 3))
+            length = int(rng.integers(2, 7))
+            label_ids[i] = 1 + entity * 2
+            label_ids[i + 1:i + length] = 2 + entity * 2
+            i += length
+        else:
+            i += 1
+    label_ids = label_ids[:num_tokens]
+    starts = np.arange(num_tokens, dtype=np.int64) * 2
+    return TokenPredictions(
+        input_ids=np.arange(num_tokens, dtype=np.int64),
+        label_ids=label_ids,
+        confidences=rng.uniform(0.5, 1.0, num_tokens).astype(np.float32),
+        offsets=np.stack([starts, starts + 1], axis=1),
+        valid=np.ones(num_tokens, dtype=bool),
+    )
+
+
+def _dict_path(batch: list[TokenPredictions]) -> list[list[tuple]]:
+    results = []
+    for p in batch:
+        # 기존 _predict_tokens와 동일하게 토큰마다 dict 생성
+        dicts = []
+        for i, (label_id, confidence) in enumerate(zip(p.label_ids.tolist(), p.confidences.tolist())):
+            dicts.append({
+                "token": f"t{i}",
+                "label": ID2LABEL[label_id],
+                "confidence": float(confidence),
+                "position": i + 1,
+                "start": int(p.offsets[i, 0]),
+                "end": int(p.offsets[i, 1]),
+            })
+        entities = extract_bio_entities(dicts, None, "x" * (2 * len(dicts)))
+        results.append([(e["type"], e["start"], e["end"], e["token_count"]) for e in entities])
+    return results
+
+
+def _array_path(batch: list[TokenPredictions], table: BIOLabelTable) -> list[list[tuple]]:
+    return [
+        [(s["type"], s["start"], s["end"], s["token_count"]) for s in spans]
+        for spans in decode_bio_spans(batch, table)
+    ]
+
+
+def _best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - started) * 1000.0)
+    return best
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = np.random.default_rng(0)
+    table = BIOLabelTable(ID2LABEL)
+
+    print(f"{'tokens':>7} {'batch':>6} {'dict ms':>9} {'array ms':>9} {'speedup':>8} {'parity':>7}")
+    for num_tokens in args.tokens:
+        batch = [_synthetic(num_tokens, rng) for _ in range(args.batch)]
+        same = _dict_path(batch) == _array_path(batch, table)
+        dict_ms = _best_ms(lambda: _dict_path(batch), args.repeat)
+        array_ms = _best_ms(lambda: _array_path(batch, table), args.repeat)
+        print(f"{num_tokens:>7} {args.batch:>6} {dict_ms:>9.2f} {array_ms:>9.2f} "
+              f"{dict_ms / array_ms:>7.1f}x {'OK' if same else 'DIFF':>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, nargs="+", default=[128, 512, 2048, 8192])
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,77 @@
+"""
+세그먼트 캐시 벤치마크
+
+대화 기록에 턴을 하나씩 덧붙이며 전체 기록을 매번 분석해, 세그먼트 캐시
+on/off 상태의 호출당 지연 시간을 비교한다. 캐시가 켜져 있으면 지연 시간은
+전체 길이가 아니라 새로 붙은 턴의 길이에 비례해야 한다. 마지막 호출에서
+두 경로의 엔티티가 같은지도 확인한다.
+
+    uv run python scripts/bench_segment_cache.py --turns 40
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai.model_manager import get_pii_detector  # noqa: E402
+from app.ai.result_cache import get_segment_cache  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.services.pii_service import PIIDetectionService  # noqa: E402
+
+SYSTEM_PROMPT = (
+    "시스템: 당신은 고객 상담을 돕는 어시스턴트입니다. 고객의 개인정보는 절대 외부로 전달하지 않습니다. "
+    "답변은 항상 정중하고 간결하게 작성합니다. 확인되지 않은 정보는 추측하지 않습니다.\n"
+) * 4
+TURNS = [
+    "사용자: 안녕하세요, 지난주에 주문한 상품 배송 상태를 확인하고 싶습니다.\n",
+    "어시스턴트: 네, 주문하신 분의 성함과 연락처를 알려 주시겠어요?\n",
+    "사용자: 홍길동이고 전화번호는 010-1234-5678입니다.\n",
+    "어시스턴트: 확인했습니다. 상품은 현재 배송 중이며 내일 도착 예정입니다.\n",
+    "사용자: 배송지를 서울특별시 강남구 테헤란로 123으로 바꿀 수 있을까요?\n",
+    "어시스턴트: 변경 요청을 접수했습니다. 다른 도움이 필요하시면 말씀해 주세요.\n",
+]
+
+
+def _entities_key(response) -> list:
+    return [(e.type, e.value, e.start, e.end) for e in response.entities]
+
+
+async def _run(service: PIIDetectionService, turns: int) -> tuple[list[float], object]:
+    transcript = SYSTEM_PROMPT
+    latencies = []
+    response = None
+    for i in range(turns):
+        transcript += TURNS[i % len(TURNS)]
+        started = time.perf_counter()
+        response = await service._analyze(transcript, False)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+    return latencies, response
+
+
+async def main(args: argparse.Namespace) -> None:
+    get_pii_detector()
+    service = PIIDetectionService()
+    settings.PII_SEGMENT_MIN_TEXT_CHARS = args.min_chars
+
+    settings.PII_SEGMENT_CACHE_ENABLED = False
+    uncached, expected = await _run(service, args.turns)
+    settings.PII_SEGMENT_CACHE_ENABLED = True
+    get_segment_cache().invalidate()
+    cached, actual = await _run(service, args.turns)
+
+    print(f"{'turn':>5} {'no cache ms':>12} {'segment cache ms':>17}")
+    for i in range(0, args.turns, max(1, args.turns // 10)):
+        print(f"{i + 1:>5} {uncached[i]:>12.1f} {cached[i]:>17.1f}")
+    print(f"segment cache: {get_segment_cache().stats()}")
+    # 세그먼트 경계에서 문맥이 끊기므로 NER 결과가 드물게 달라질 수 있음
+    print(f"entities match: {_entities_key(expected) == _entities_key(actual)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--min-chars", type=int, default=0, help="세그먼트 경로를 사용할 최소 길이")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,79 @@
+"""
+PyTorch(LOCAL) vs ONNX Runtime 백엔드 정합성/속도 비교
+
+같은 입력에 대해 두 백엔드의 엔티티 결과가 일치하는지 확인하고,
+배치 크기별 평균 지연 시간을 비교한다. ONNX 그래프가 캐시에 없으면
+먼저 내보낸다.
+
+    uv run python scripts/compare_onnx.py --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai.pii_detector import RobertaKoreanPIIDetector  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+SAMPLE_TEXTS = [
+    "제 이름은 홍길동이고 전화번호는 010-1234-5678입니다",
+    "김철수 고객님의 이메일 주소는 chulsoo.kim@example.com 입니다.",
+    "서울특별시 강남구 테헤란로 123, 101동 202호로 배송해 주세요.",
+    "계좌번호 110-123-456789 (신한은행, 예금주 이영희)로 입금 바랍니다.",
+    "이번 분기 매출 보고서를 첨부합니다. 검토 부탁드립니다.",
+    "주민등록번호 900101-1234567, 여권번호 M12345678 확인 부탁드립니다.",
+]
+
+
+def _load(mode: str) -> RobertaKoreanPIIDetector:
+    settings.MODEL_MODE = mode
+    detector = RobertaKoreanPIIDetector()
+    detector.batcher = None
+    return detector
+
+
+def _latency_ms(detector: RobertaKoreanPIIDetector, texts: list[str], repeat: int) -> float:
+    detector._predict_batch(texts)  # warm-up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        detector._predict_batch(texts)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples)
+
+
+async def main(args: argparse.Namespace) -> None:
+    torch_detector = _load("LOCAL")
+    onnx_detector = _load("ONNX")
+
+    mismatches = 0
+    max_conf_diff = 0.0
+    for text in SAMPLE_TEXTS:
+        expected = (await torch_detector.detect_pii(text))["entities"]
+        actual = (await onnx_detector.detect_pii(text))["entities"]
+        same = [(e["type"], e["value"]) for e in expected] == [(e["type"], e["value"]) for e in actual]
+        if not same:
+            mismatches += 1
+            print(f"MISMATCH: {text!r}\n  torch={expected}\n  onnx ={actual}")
+        for e, a in zip(expected, actual):
+            max_conf_diff = max(max_conf_diff, abs(e["confidence"] - a["confidence"]))
+    print(f"parity: {len(SAMPLE_TEXTS) - mismatches}/{len(SAMPLE_TEXTS)} identical, "
+          f"max confidence diff={max_conf_diff:.2e}")
+
+    print(f"{'batch':>6} {'torch ms':>10} {'onnx ms':>10} {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        texts = (SAMPLE_TEXTS * (batch_size // len(SAMPLE_TEXTS) + 1))[:batch_size]
+        torch_ms = _latency_ms(torch_detector, texts, args.repeat)
+        onnx_ms = _latency_ms(onnx_detector, texts, args.repeat)
+        print(f"{batch_size:>6} {torch_ms:>10.1f} {onnx_ms:>10.1f} {torch_ms / onnx_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
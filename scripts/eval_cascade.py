@@ -0,0 +1,66 @@
+"""
+캐스케이드 게이트 평가
+
+라벨링된 JSONL 샘플에 게이트만 적용하여(모델 불필요) 임계값별로
+모델을 건너뛰는 비율과 그 대가(건너뛴 텍스트의 정답 엔티티 중 정규식
+단계가 잡지 못한 개수 = 잃는 recall 상한)를 보고한다.
+
+    uv run python scripts/eval_cascade.py --data scripts/data/pii_eval_sample.jsonl --thresholds 0.5 1.0 1.5
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai.cascade import CascadeGate  # noqa: E402
+from app.ai.regex_detector import get_regex_detector  # noqa: E402
+
+
+def _load_samples(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main(args: argparse.Namespace) -> None:
+    samples = _load_samples(args.data)
+    regex = get_regex_detector()
+    regex_results = [regex.detect(s["text"]) for s in samples]
+    gold_total = sum(len(s["entities"]) for s in samples)
+    clean_total = sum(1 for s in samples if not s["entities"])
+
+    print(f"samples: {len(samples)} (clean {clean_total}), gold entities: {gold_total}")
+    print(f"{'threshold':>9} {'skip rate':>10} {'clean skipped':>14} {'pii skipped':>12} {'lost entities':>14} {'recall cost':>12}")
+    for threshold in args.thresholds:
+        gate = CascadeGate(mode="gate", threshold=threshold)
+        lost = clean_skipped = pii_skipped = 0
+        for sample, regex_entities in zip(samples, regex_results):
+            if gate.evaluate(sample["text"], regex_entities).run_model:
+                continue
+            if not sample["entities"]:
+                clean_skipped += 1
+                continue
+            pii_skipped += 1
+            # 모델을 건너뛰면 정규식 단계가 잡은 값만 남는다
+            covered = {e["value"] for e in regex_entities}
+            lost += sum(1 for e in sample["entities"] if e["value"] not in covered)
+
+        stats = gate.stats()
+        recall_cost = lost / gold_total if gold_total else 0.0
+        print(f"{threshold:>9.2f} {stats['skip_rate']:>10.1%} {clean_skipped:>14} {pii_skipped:>12} "
+              f"{lost:>14} {recall_cost:>12.1%}")
+
+    if args.verbose:
+        gate = CascadeGate(mode="gate", threshold=args.thresholds[0])
+        for sample, regex_entities in zip(samples, regex_results):
+            decision = gate.score(sample["text"], regex_entities)
+            print(f"{decision.score:5.2f} {'RUN ' if decision.run_model else 'SKIP'} {sample['text'][:60]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=os.path.join(os.path.dirname(__file__), "data", "pii_eval_sample.jsonl"))
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 1.0, 1.5])
+    parser.add_argument("--verbose", action="store_true", help="첫 임계값 기준 샘플별 점수 출력")
+    main(parser.parse_args())
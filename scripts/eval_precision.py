@@ -0,0 +1,56 @@
+"""
+정밀도 모드(fp32/int8/bf16)별 정확도·지연·메모리 비교
+
+라벨링된 JSONL 샘플({"text", "entities": [{"type", "value"}]})로 각 모드의
+엔티티 F1을 측정하고 fp32 대비 변화량을 출력한다 (--modes에 fp32가 없어도
+기준으로 먼저 측정한다). 샘플의 type 값은 모델의
+id2label 라벨명과 같아야 한다.
+기본 샘플(scripts/data/pii_eval_sample.jsonl)은 scripts/make_eval_sample.py로 만든다.
+
+    uv run python scripts/eval_precision.py --samples scripts/data/pii_eval_sample.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ai.pii_detector import RobertaKoreanPIIDetector  # noqa: E402
+from app.ai.precision import PRECISION_MODES, evaluate_detector, model_size_mb  # noqa: E402
+from app.core.config import settings  # noqa: E402
+
+
+def _load_samples(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def main(args: argparse.Namespace) -> None:
+    samples = _load_samples(args.samples)
+    settings.MODEL_MODE = "LOCAL"
+
+    print(f"{'mode':>6} {'effective':>9} {'F1':>7} {'ΔF1':>7} {'P':>7} {'R':>7} {'ms/text':>8} {'MB':>8}")
+    # ΔF1 기준은 항상 fp32
+    modes = ["fp32"] + [mode for mode in args.modes if mode != "fp32"]
+    baseline_f1 = None
+    for mode in modes:
+        settings.MODEL_PRECISION = mode
+        detector = RobertaKoreanPIIDetector()
+        detector.batcher = None
+        scores = await evaluate_detector(detector, samples)
+        if baseline_f1 is None:
+            baseline_f1 = scores["f1"]
+        print(
+            f"{mode:>6} {detector.backend.precision:>9} {scores['f1']:>7.3f} {scores['f1'] - baseline_f1:>+7.3f} "
+            f"{scores['precision']:>7.3f} {scores['recall']:>7.3f} {scores['avg_latency_ms']:>8.1f} "
+            f"{model_size_mb(detector.model):>8.1f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", default=os.path.join(os.path.dirname(__file__), "data", "pii_eval_sample.jsonl"))
+    parser.add_argument("--modes", nargs="+", default=list(PRECISION_MODES), choices=PRECISION_MODES,
+                        help="비교할 모드 (fp32는 ΔF1 기준으로 항상 측정)")
+    asyncio.run(main(parser.parse_args()))
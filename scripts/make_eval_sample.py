@@ -0,0 +1,187 @@
+"""
+정밀도 평가용 라벨링 샘플 생성
+
+문장 템플릿에 이름/연락처/주소/식별번호 값을 채워 엔티티 타입마다 수십 건,
+PII가 없는 문장까지 합쳐 수백 건의 JSONL 샘플을 만든다. 체크섬이 있는 번호
+(주민/외국인등록번호, 사업자등록번호, 카드번호)는 유효한 값만 생성한다.
+같은 seed면 같은 파일이 나오므로 fp32/int8/bf16 비교를 반복 실행해도 기준이 같다.
+
+    uv run python scripts/make_eval_sample.py --per-type 40 --out scripts/data/pii_eval_sample.jsonl
+"""
+import argparse
+import json
+import os
+import random
+
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍"
+GIVEN = ["민준", "서연", "도윤", "하은", "지호", "수아", "예준", "지우", "현우", "서윤", "건우", "민서", "우진", "채원", "길동", "철수", "영희", "민수"]
+CITIES = [
+    ("서울특별시", ["강남구 테헤란로", "마포구 월드컵북로", "종로구 세종대로", "송파구 올림픽로"]),
+    ("부산광역시", ["해운대구 센텀중앙로", "부산진구 중앙대로"]),
+    ("대전광역시", ["유성구 대학로", "서구 둔산로"]),
+    ("경기도 성남시", ["분당구 판교역로", "수정구 성남대로"]),
+]
+DOMAINS = ["example.com", "mail.co.kr", "company.kr", "test.org"]
+BANKS = ["신한은행", "국민은행", "우리은행", "하나은행", "농협"]
+
+TEMPLATES = {
+    "NAME": [
+        "담당자는 {v} 과장입니다.",
+        "{v}님께 회의 자료를 전달해 주세요.",
+        "오늘 면접 대상자는 {v}입니다.",
+        "계약서에 {v} 대표의 서명이 필요합니다.",
+    ],
+    "PHONE_NUM": [
+        "연락처는 {v}입니다.",
+        "문의 사항은 {v}로 전화 주세요.",
+        "배송 기사님 번호가 {v}이에요.",
+    ],
+    "EMAIL": [
+        "자료는 {v}로 보내 주세요.",
+        "이메일 주소 {v} 확인 부탁드립니다.",
+        "회신은 {v} 계정으로 해 주세요.",
+    ],
+    "ADDRESS": [
+        "{v}로 배송해 주세요.",
+        "사무실 주소는 {v}입니다.",
+        "고객 거주지는 {v}로 등록되어 있습니다.",
+    ],
+    "ID_NUM": [
+        "주민등록번호는 {v}입니다.",
+        "본인 확인을 위해 주민번호 {v}를 입력했습니다.",
+    ],
+    "FOREIGNER_ID_NUM": [
+        "외국인등록번호 {v}로 조회해 주세요.",
+        "등록번호는 {v}입니다.",
+    ],
+    "BUSINESS_ID_NUM": [
+        "사업자등록번호는 {v}입니다.",
+        "세금계산서에 사업자번호 {v}를 기재해 주세요.",
+    ],
+    "CREDIT_CARD_INFO": [
+        "카드번호 {v}로 결제해 주세요.",
+        "등록된 카드는 {v}입니다.",
+    ],
+    "BANK_ACCOUNT": [
+        "계좌번호 {v}로 입금 바랍니다.",
+        "환불 계좌는 {bank} {v}입니다.",
+    ],
+    "PASSPORT_NUM": [
+        "여권번호는 {v}입니다.",
+        "출국 심사용 여권번호 {v}를 확인했습니다.",
+    ],
+}
+MIXED_TEMPLATES = [
+    ("{NAME} 고객님의 연락처는 {PHONE_NUM}입니다.", ("NAME", "PHONE_NUM")),
+    ("{NAME}님의 이메일은 {EMAIL}이고 주소는 {ADDRESS}입니다.", ("NAME", "EMAIL", "ADDRESS")),
+    ("{NAME}님의 주민등록번호는 {ID_NUM}, 카드번호는 {CREDIT_CARD_INFO}입니다.", ("NAME", "ID_NUM", "CREDIT_CARD_INFO")),
+]
+NEGATIVES = [
+    "이번 분기 매출 보고서를 첨부합니다. 검토 부탁드립니다.",
+    "회의는 내일 오전 10시에 3층 회의실에서 진행합니다.",
+    "다음 주 월요일까지 기획안을 제출해 주세요.",
+    "서버 점검은 새벽 2시부터 4시까지 진행됩니다.",
+    "신규 기능 배포 일정이 한 주 연기되었습니다.",
+    "점심 메뉴는 김치찌개와 된장찌개 중에서 골라 주세요.",
+    "프로젝트 진행률은 현재 75퍼센트입니다.",
+    "주문 수량은 총 120개이며 단가는 3,500원입니다.",
+    "오늘 날씨가 맑아서 야외 행사를 예정대로 진행합니다.",
+    "보안 교육은 온라인으로 30분간 진행됩니다.",
+]
+
+
+def _checksum_resident(front: list[int], weights_mod: int) -> int:
+    weights = (2, 3, 4, 5, 6, 7, 8, 9, 2, 3, 4, 5)
+    return (weights_mod - sum(d * w for d, w in zip(front, weights)) % 11) % 10
+
+
+def _resident_id(rng: random.Random, foreigner: bool) -> str:
+    birth = [rng.randint(6, 9), rng.randint(0, 9), 0, rng.randint(1, 9), rng.randint(1, 2), rng.randint(0, 8)]
+    gender = rng.choice((5, 6, 7, 8) if foreigner else (1, 2, 3, 4))
+    front = birth + [gender] + [rng.randint(0, 9) for _ in range(5)]
+    check = _checksum_resident(front, 13 if foreigner else 11)
+    digits = "".join(map(str, front + [check]))
+    return f"{digits[:6]}-{digits[6:]}"
+
+
+def _business_id(rng: random.Random) -> str:
+    digits = [rng.randint(1, 9)] + [rng.randint(0, 9) for _ in range(8)]
+    weights = (1, 3, 7, 1, 3, 7, 1, 3, 5)
+    total = sum(d * w for d, w in zip(digits, weights)) + (digits[8] * 5) // 10
+    value = "".join(map(str, digits + [(10 - total % 10) % 10]))
+    return f"{value[:3]}-{value[3:5]}-{value[5:]}"
+
+
+def _card(rng: random.Random) -> str:
+    digits = [rng.choice((4, 5))] + [rng.randint(0, 9) for _ in range(14)]
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    value = "".join(map(str, digits + [(10 - total % 10) % 10]))
+    return "-".join(value[i:i + 4] for i in range(0, 16, 4))
+
+
+def _value(entity_type: str, rng: random.Random) -> str:
+    if entity_type == "NAME":
+        return rng.choice(SURNAMES) + rng.choice(GIVEN)
+    if entity_type == "PHONE_NUM":
+        if rng.random() < 0.7:
+            return f"010-{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+        return f"0{rng.choice((2, 31, 51, 42))}-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}"
+    if entity_type == "EMAIL":
+        user = rng.choice(["kim", "lee", "park", "choi", "jung", "minsu", "yh"]) + str(rng.randint(1, 999))
+        return f"{user}@{rng.choice(DOMAINS)}"
+    if entity_type == "ADDRESS":
+        city, roads = rng.choice(CITIES)
+        return f"{city} {rng.choice(roads)} {rng.randint(1, 300)}"
+    if entity_type == "ID_NUM":
+        return _resident_id(rng, foreigner=False)
+    if entity_type == "FOREIGNER_ID_NUM":
+        return _resident_id(rng, foreigner=True)
+    if entity_type == "BUSINESS_ID_NUM":
+        return _business_id(rng)
+    if entity_type == "CREDIT_CARD_INFO":
+        return _card(rng)
+    if entity_type == "BANK_ACCOUNT":
+        return f"{rng.randint(100, 999)}-{rng.randint(100, 999)}-{rng.randint(100000, 999999)}"
+    if entity_type == "PASSPORT_NUM":
+        return f"M{rng.randint(10000000, 99999999)}"
+    raise ValueError(entity_type)
+
+
+def generate(per_type: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    samples = []
+    for entity_type, templates in TEMPLATES.items():
+        for _ in range(per_type):
+            value = _value(entity_type, rng)
+            text = rng.choice(templates).format(v=value, bank=rng.choice(BANKS))
+            samples.append({"text": text, "entities": [{"type": entity_type, "value": value}]})
+    for _ in range(per_type):
+        template, types = rng.choice(MIXED_TEMPLATES)
+        values = {t: _value(t, rng) for t in types}
+        samples.append({
+            "text": template.format(**values),
+            "entities": [{"type": t, "value": values[t]} for t in types],
+        })
+    for _ in range(per_type):
+        samples.append({"text": rng.choice(NEGATIVES), "entities": []})
+    rng.shuffle(samples)
+    return samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-type", type=int, default=40, help="엔티티 타입별 문장 수 (복합/음성 문장도 같은 수)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(__file__), "data", "pii_eval_sample.jsonl"))
+    args = parser.parse_args()
+    samples = generate(args.per_type, args.seed)
+    with open(args.out, "w", encoding="utf-8") as f:
+        for sample in samples:
+            f.write(json.dumps(sample, ensure_ascii=False) + "\n")
+    print(f"wrote {len(samples)} samples to {args.out}")